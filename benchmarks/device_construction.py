@@ -0,0 +1,56 @@
+"""Device construction benchmark (with and without pausing gc).
+
+Run from the repository root: python -m benchmarks.device_construction
+"""
+
+import random
+import time
+
+import utils.device
+
+DEVICES: int = 50_000
+"""Number of devices."""
+
+
+def records(seed: int = 0) -> list[tuple[int, dict]]:
+    """Create random device records like the ones of a world file.
+
+    Arguments:
+        - seed: the random seed.
+
+    Returns:
+        The addresses and records.
+    """
+    rng = random.Random(seed)
+    types: list[str] = [device_type.value for device_type in utils.device.DeviceType]
+    return [(address, {"name": f"host-{address:x}", "type": rng.choice(types),
+                       "ports": sorted(rng.sample(range(1, 1024), 3))})
+            for address in rng.sample(range(2**40), DEVICES)]
+
+
+def measure(devices: list[tuple[int, dict]], pause_gc: bool = True) -> float:
+    """Measure the construction of devices.
+
+    Arguments:
+        - devices: the addresses and records.
+        - pause_gc: whether the garbage collector is paused during the construction.
+
+    Returns:
+        The devices per second.
+    """
+    start: float = time.perf_counter()
+    utils.device.Device.from_records(devices, pause_gc)
+    return len(devices) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    devices: list[tuple[int, dict]] = records()
+    print(f"devices: {DEVICES}")
+    print(f"{'gc':<8}{'devices/s':>12}")
+    for pause_gc in (True, False):
+        print(f"{'paused' if pause_gc else 'running':<8}{measure(devices, pause_gc):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
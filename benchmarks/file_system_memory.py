@@ -0,0 +1,110 @@
+"""Memory benchmark for file system nodes (bytes per node, before and after slots).
+
+Run from the repository root: python -m benchmarks.file_system_memory
+"""
+
+import dataclasses
+import gc
+import tracemalloc
+import typing
+
+import utils.file_system
+
+NODES: int = 200_000
+"""Number of nodes to create per run."""
+FANOUT: int = 50
+"""Files per directory."""
+
+
+@dataclasses.dataclass
+class LegacyFile:
+    """File layout before the compact node store (per-instance __dict__)."""
+    name: str
+    parent: "LegacyDirectory | None"
+    filetype: utils.file_system.FileType
+    content: str
+    size: int = dataclasses.field(init=False)
+
+    def __post_init__(self) -> None:
+        """Initialize attributes dependent on other attributes."""
+        self.size = len(self.content)
+
+
+@dataclasses.dataclass
+class LegacyDirectory:
+    """Directory layout before the compact node store (per-instance __dict__)."""
+    name: str
+    parent: "LegacyDirectory | None"
+    children: list["LegacyDirectory"]
+    files: list[LegacyFile]
+
+
+def new_file(name: str, parent: utils.file_system.Directory) -> utils.file_system.File:
+    """Create a file with the current layout."""
+    file = utils.file_system.File.text(name, "")
+    file.parent = parent
+    return file
+
+
+def legacy_file(name: str, parent: LegacyDirectory) -> LegacyFile:
+    """Create a file with the legacy layout."""
+    return LegacyFile(name, parent, utils.file_system.FileType.TXT, "")
+
+
+def build(directory_cls: typing.Callable, file_cls: typing.Callable, nodes: int) -> list:
+    """Build a flat-ish tree with the given node classes.
+
+    Arguments:
+        - directory_cls: the directory class to use.
+        - file_cls: the function creating a file from name and parent.
+        - nodes: the number of nodes to create.
+
+    Returns:
+        The root directory (wrapped in a list to keep it alive).
+    """
+    root = directory_cls("", None, [], [])
+    created: int = 1
+    while created < nodes:
+        directory = directory_cls(f"dir{created % 97}", root, [], [])
+        root.children.append(directory)
+        created += 1
+        for i in range(min(FANOUT, nodes - created)):
+            # same names and content everywhere, like a generated world
+            file = file_cls(f"file{i}", directory)
+            directory.files.append(file)
+            created += 1
+    return [root]
+
+
+def measure(directory_cls: typing.Callable, file_cls: typing.Callable, nodes: int) -> float:
+    """Measure the bytes used per node.
+
+    Arguments:
+        - directory_cls: the directory class to use.
+        - file_cls: the function creating a file from name and parent.
+        - nodes: the number of nodes to create.
+
+    Returns:
+        The number of bytes per node.
+    """
+    gc.collect()
+    tracemalloc.start()
+    tree = build(directory_cls, file_cls, nodes)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tree
+    return current / nodes
+
+
+def main() -> None:
+    """Run the benchmark."""
+    before: float = measure(LegacyDirectory, legacy_file, NODES)
+    after: float = measure(utils.file_system.Directory, new_file, NODES)
+    print(f"nodes:  {NODES}")
+    print(f"before: {before:8.1f} bytes/node")
+    print(f"after:  {after:8.1f} bytes/node")
+    print(f"saved:  {1 - after / before:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
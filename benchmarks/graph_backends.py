@@ -0,0 +1,89 @@
+"""Memory and query benchmark for network graph backends (networkx vs CSR).
+
+Run from the repository root: python -m benchmarks.graph_backends
+"""
+
+import gc
+import random
+import time
+import tracemalloc
+
+import utils.graph
+
+NODES: int = 200_000
+"""Number of devices."""
+EDGES_PER_NODE: int = 3
+"""Average number of connections per device."""
+QUERIES: int = 100_000
+"""Number of neighbor queries."""
+
+
+def world(seed: int = 0) -> tuple[list[int], list[tuple[int, int]]]:
+    """Create random addresses and connections.
+
+    Arguments:
+        - seed: the random seed.
+
+    Returns:
+        The addresses and the connections.
+    """
+    rng = random.Random(seed)
+    addresses: list[int] = rng.sample(range(2**40), NODES)
+    edges: list[tuple[int, int]] = [(rng.choice(addresses), rng.choice(addresses))
+                                    for _ in range(NODES * EDGES_PER_NODE)]
+    return addresses, edges
+
+
+def build_graph(backend: str, addresses: list[int], edges: list[tuple[int, int]]) \
+        -> utils.graph.Graph:
+    """Build a graph with a backend (including the CSR build on first query)."""
+    graph = utils.graph.GRAPH_BACKENDS[backend]()
+    graph.add_nodes_from(addresses)
+    graph.add_edges_from(edges)
+    graph.number_of_edges()
+    return graph
+
+
+def measure(backend: str, addresses: list[int], edges: list[tuple[int, int]]) \
+        -> tuple[float, float, float, float]:
+    """Measure a backend.
+
+    Arguments:
+        - backend: the name of the backend.
+        - addresses: the addresses to add.
+        - edges: the connections to add.
+
+    Returns:
+        The bytes per node, the peak bytes per node while building, the build time and the time
+        per query (seconds).
+    """
+    start: float = time.perf_counter()
+    build_graph(backend, addresses, edges)
+    build: float = time.perf_counter() - start
+    # tracing slows down allocations, so memory is measured on a second build
+    gc.collect()
+    tracemalloc.start()
+    graph = build_graph(backend, addresses, edges)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    queries: list[int] = random.Random(1).choices(addresses, k=QUERIES)
+    start = time.perf_counter()
+    for address in queries:
+        list(graph.neighbors(address))
+    query: float = (time.perf_counter() - start) / QUERIES
+    return current / NODES, peak / NODES, build, query
+
+
+def main() -> None:
+    """Run the benchmark."""
+    addresses, edges = world()
+    print(f"nodes: {NODES}, edges: {len(edges)}")
+    print(f"{'backend':<10}{'bytes/node':>12}{'peak':>12}{'build (s)':>12}{'query (us)':>12}")
+    for backend in utils.graph.GRAPH_BACKENDS:
+        memory, peak, build, query = measure(backend, addresses, edges)
+        print(f"{backend:<10}{memory:>12.1f}{peak:>12.1f}{build:>12.2f}{query * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Throughput and memory benchmark for the procedural world generator.
+
+Run from the repository root: python -m benchmarks.world_generation [workers]
+"""
+
+import pathlib
+import resource
+import sys
+import tempfile
+import time
+
+import utils.world_generator
+
+SIZES: tuple[int, ...] = (100_000, 200_000, 400_000, 800_000)
+"""Numbers of devices to generate, growing to show the scaling."""
+
+
+def peak_memory() -> tuple[float, float]:
+    """Get the peak resident memory of this process and of the worker processes.
+
+    Returns:
+        The peak memory of both in MB (the peak so far, not per run).
+    """
+    own: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children: int = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return own / 1024, children / 1024
+
+
+def main() -> None:
+    """Run the benchmark."""
+    workers: int | None = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    print(f"workers: {workers or 'one per CPU'}")
+    print(f"{'devices':>10}{'time (s)':>10}{'devices/s':>12}{'file (MB)':>11}"
+          f"{'peak (MB)':>11}{'workers peak (MB)':>19}")
+    with tempfile.TemporaryDirectory() as directory:
+        path: pathlib.Path = pathlib.Path(directory) / "world.json"
+        for devices in SIZES:
+            start: float = time.perf_counter()
+            utils.world_generator.generate(path, devices, workers=workers)
+            elapsed: float = time.perf_counter() - start
+            own, children = peak_memory()
+            print(f"{devices:>10}{elapsed:>10.2f}{devices / elapsed:>12.0f}"
+                  f"{path.stat().st_size / 2**20:>11.1f}{own:>11.1f}{children:>19.1f}")
+
+
+if __name__ == "__main__":
+    main()
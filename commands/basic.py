@@ -1,9 +1,13 @@
 """Basic commands."""
 
+import itertools
+import typing
+
 import click
 
+import utils.autosave
 import utils.command
-import utils.device
+import utils.file_system
 import utils.network
 import utils.values
 import widgets.terminal
@@ -27,8 +31,9 @@ def help(command: str) -> None:  # pylint:disable=redefined-builtin
 
 def logout_save() -> None:
     """Do the logout and save data."""
+    # written in the background, a login before it is done gets the session's save
+    utils.autosave.AUTOSAVE.request()
     widgets.terminal.Terminal.TERMINAL.app.pop_screen()
-    # TODO: save data
 
 
 @click.command()
@@ -72,27 +77,58 @@ def pwd() -> None:
 
 
 @click.command()
+@click.argument("paths", type=click.STRING, nargs=-1)
 @click.option("-l", is_flag=True, help="Format as list.")
 @click.option("-a", "--all", is_flag=True, help="Show dot-prefixed files and directories.")
-def ls(l: bool, all: bool) -> None:  # pylint:disable=redefined-builtin
-    """List files and directories."""
-    # TODO: add option to list specific folder
-    # feels a bit cursed
-    directories: list[str] | None
-    files: list[str] | None
-    header: str = "[bold italic]type       size    name[/]\n"
-    output: str = ""
-    directories, files = utils.network.NETWORK.file_system.ls(l, all)
-    if directories is not None:
-        output += ("\n" if l else " ").join(directories)
-    if files is not None:
-        if output != "":
-            output += ("\n" if l else " ")
-        output += ("\n" if l else " ").join(files)
-    if l and output != "":
-        output = header + output
-    if output:
-        utils.command.print(output)
+@click.option("-h", "human", is_flag=True, help="Human readable sizes.")
+@click.option("-S", "by_size", is_flag=True, help="Sort by size, largest first.")
+@click.option("-R", "recursive", is_flag=True, help="List subdirectories recursively.")
+@click.option("--offset", type=click.IntRange(min=0), default=0,
+              help="Skip entries (of every listing).")
+@click.option("--limit", type=click.IntRange(min=0), default=None,
+              help="Maximum number of entries (of every listing).")
+async def ls(paths: tuple[str, ...], l: bool, all: bool,  # pylint:disable=redefined-builtin
+             human: bool, by_size: bool, recursive: bool, offset: int,
+             limit: int | None) -> None:
+    """List files and directories in PATHS."""
+    file_system = utils.network.NETWORK.file_system
+    if not paths:
+        paths = (".",)
+    # like ls, files are listed together first, then every directory with a header
+    files: list[str] = []
+    directories: list[str] = []
+    for path in paths:
+        try:
+            node = file_system.get(path)
+        except utils.file_system.FileSystem.NoSuchFileException as excp:
+            utils.command.print(f"No such file or directory '{excp}'.")
+            continue
+        (directories if isinstance(node, utils.file_system.Directory) else files).append(path)
+    listings: list[tuple[str | None, typing.Iterator[str]]] = []
+    if files:
+        listings.append((None, itertools.islice(itertools.chain.from_iterable(
+            file_system.ls(path, l, all, human) for path in files),
+            offset, None if limit is None else offset + limit)))
+    for path in directories:
+        listings.append((path if len(paths) > 1 and not recursive else None,
+                         file_system.ls(path, l, all, human, by_size, recursive, offset, limit)))
+    for index, (header, entries) in enumerate(listings):
+        first: str | None = next(entries, None)
+        if index > 0:
+            utils.command.print("")
+        if header is not None:
+            utils.command.print(f"{utils.command.escape(header)}:")
+        if first is None:
+            continue
+        page = itertools.chain([first], entries)
+        if l:
+            utils.command.print("[bold italic]type       size    name[/]")
+            await utils.command.stream(page)
+        elif recursive:
+            await utils.command.stream(page)
+        else:
+            # names on one line like before
+            utils.command.print(" ".join(page))
 
 
 @click.command()
@@ -116,20 +152,23 @@ async def login() -> None:
 
 
 @click.command()
-def scan() -> None:
+@click.option("--all", "all_", is_flag=True, default=False,
+              help="All reachable computers instead of directly connected ones.")
+async def scan(all_: bool) -> None:
     """Scan for connected computers."""
-    nodes = utils.network.NETWORK.scan()
+    network = utils.network.NETWORK
+    nodes = network.reachable() if all_ else network.scan()
     if len(nodes) == 0:
         utils.command.print("No connected devices found.")
     else:
-        utils.command.print("\n".join([str(node) for node in nodes]))
+        await utils.command.stream(map(str, nodes))
 
 
 @click.command()
-@click.argument("ip_address", type=click.STRING)
-def connect(ip_address: str) -> None:
-    """Connect to the computer with the IP_ADDRESS."""
-    if not utils.network.NETWORK.connect(utils.device.NPv5Address(ip_address)):
+@click.argument("target", type=click.STRING)
+def connect(target: str) -> None:
+    """Connect to the computer with the address or domain name TARGET."""
+    if not utils.network.NETWORK.connect(target):
         utils.command.print("Could not connect.")
 
 
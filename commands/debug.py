@@ -4,6 +4,7 @@ import asyncio
 
 import click
 
+import utils.blob_store
 import utils.command
 import widgets.chat
 import widgets.terminal
@@ -45,3 +46,14 @@ async def echo() -> None:
 async def wait() -> None:
     """Wait."""
     await asyncio.sleep(7)
+
+
+@click.command()
+def blobs() -> None:
+    """Show blob store statistics."""
+    stats = utils.blob_store.BLOBS.stats()
+    utils.command.print(f"blobs:        {stats.blobs}\n"
+                        f"references:   {stats.references}\n"
+                        f"stored size:  {stats.stored_size} kB\n"
+                        f"logical size: {stats.logical_size} kB\n"
+                        f"dedup ratio:  {stats.dedup_ratio:.2f}")
@@ -0,0 +1,226 @@
+"""File system commands."""
+
+import click
+
+import utils.command
+import utils.file_system
+import utils.network
+
+
+@click.command()
+@click.argument("paths", type=click.STRING, nargs=-1)
+@click.option("-name", "name", type=click.STRING, default=None,
+              help="Name or glob pattern to match.")
+@click.option("-type", "type_", type=click.Choice(["f", "d"]), default=None,
+              help="Only files (f) or directories (d).")
+@click.option("-size", "size", type=click.STRING, default=None,
+              help="File size in kB: N, +N (more than) or -N (less than).")
+def find(paths: tuple[str, ...], name: str | None, type_: str | None,
+         size: str | None) -> None:
+    """Find files and directories in PATHS."""
+    for path in paths or (".",):
+        try:
+            results: list[str] = sorted(utils.network.NETWORK.file_system.find(
+                path, name, type_, size))
+        except utils.file_system.FileSystem.NoSuchFileException as excp:
+            utils.command.print(f"No such file or directory '{excp}'.")
+            continue
+        if results:
+            utils.command.print(utils.command.escape("\n".join(results)))
+
+
+@click.command()
+@click.argument("pattern", type=click.STRING)
+@click.argument("paths", type=click.STRING, nargs=-1)
+@click.option("-r", "--recursive", is_flag=True, help="Search directories recursively.")
+@click.option("-i", "--ignore-case", is_flag=True, help="Ignore case.")
+@click.option("-n", "--line-number", is_flag=True, help="Show line numbers.")
+def grep(pattern: str, paths: tuple[str, ...], recursive: bool, ignore_case: bool,
+         line_number: bool) -> None:
+    """Search PATTERN (regex) in files."""
+    file_system = utils.network.NETWORK.file_system
+    if not paths:
+        paths = (".",)
+    results: list[str] = []
+    for path in paths:
+        try:
+            for file, number, line in file_system.grep(pattern, path, recursive, ignore_case):
+                prefix: str = file_system.path(file) + ":" \
+                    if recursive or len(paths) > 1 else ""
+                if line_number:
+                    prefix += f"{number}:"
+                results.append(utils.command.escape(prefix + line))
+        except utils.file_system.FileSystem.NoSuchFileException as excp:
+            results.append(f"grep: {utils.command.escape(str(excp))}")
+    if results:
+        utils.command.print("\n".join(results))
+
+
+@click.command()
+@click.argument("paths", type=click.STRING, nargs=-1)
+@click.option("-h", "human", is_flag=True, help="Human readable sizes.")
+@click.option("-s", "summarize", is_flag=True, help="Only show the total for PATH.")
+@click.option("-d", "--max-depth", type=click.INT, default=None,
+              help="Only show directories up to this depth.")
+def du(paths: tuple[str, ...], human: bool, summarize: bool, max_depth: int | None) -> None:
+    """Show disk usage of PATHS."""
+    for path in paths or (".",):
+        try:
+            usage = list(utils.network.NETWORK.file_system.du(
+                path, 0 if summarize else max_depth))
+        except utils.file_system.FileSystem.NoSuchFileException as excp:
+            utils.command.print(f"No such file or directory '{excp}'.")
+            continue
+        utils.command.print(utils.command.escape("\n".join(
+            f"{utils.file_system.format_size(size, human)}  {path}"
+            for size, _, path in usage)))
+
+
+@click.command()
+@click.option("-h", "human", is_flag=True, help="Human readable sizes.")
+def df(human: bool) -> None:
+    """Show disk usage of the file system."""
+    capacity, used, files = utils.network.NETWORK.file_system.df()
+    utils.command.print(
+        "[bold italic]size       used       available  use%  files[/]\n"
+        f"{utils.file_system.format_size(capacity, human)}    "
+        f"{utils.file_system.format_size(used, human)}    "
+        f"{utils.file_system.format_size(capacity - used, human)}    "
+        f"{used / capacity:>4.0%}  {files}")
+
+
+@click.command()
+@click.argument("paths", type=click.STRING, nargs=-1, required=True)
+@click.option("-r", "--recursive", is_flag=True, help="Remove directories recursively.")
+def rm(paths: tuple[str, ...], recursive: bool) -> None:
+    """Remove the files or directories PATHS."""
+    for path in paths:
+        if output := utils.network.NETWORK.file_system.rm(path, recursive):
+            utils.command.print(output)
+
+
+def _get_file(path: str) -> utils.file_system.File | None:
+    """Get a file by path, printing an error if it isn't one."""
+    try:
+        node = utils.network.NETWORK.file_system.get(path)
+    except utils.file_system.FileSystem.NoSuchFileException as excp:
+        utils.command.print(f"No such file or directory '{excp}'.")
+        return None
+    if isinstance(node, utils.file_system.Directory):
+        utils.command.print(f"'{path}' is a directory.")
+        return None
+    return node
+
+
+@click.command()
+@click.argument("paths", type=click.STRING, nargs=-1, required=True)
+async def cat(paths: tuple[str, ...]) -> None:
+    """Print the content of the files at PATHS."""
+    for path in paths:
+        if (file := _get_file(path)) is not None:
+            await utils.command.stream(map(utils.command.escape, file.iter_lines()))
+
+
+def _print_header(index: int, paths: tuple[str, ...]) -> None:
+    """Print the header of a file if several files are printed (like head and tail)."""
+    if len(paths) > 1:
+        if index > 0:
+            utils.command.print("")
+        utils.command.print(f"==> {utils.command.escape(paths[index])} <==")
+
+
+@click.command()
+@click.argument("paths", type=click.STRING, nargs=-1, required=True)
+@click.option("-n", "--lines", type=click.IntRange(min=0), default=10,
+              help="Number of lines.")
+def head(paths: tuple[str, ...], lines: int) -> None:
+    """Print the first lines of the files at PATHS."""
+    for index, path in enumerate(paths):
+        if (file := _get_file(path)) is not None:
+            _print_header(index, paths)
+            utils.command.print(utils.command.escape("\n".join(file.lines(0, lines))))
+
+
+@click.command()
+@click.argument("paths", type=click.STRING, nargs=-1, required=True)
+@click.option("-n", "--lines", type=click.IntRange(min=0), default=10,
+              help="Number of lines.")
+def tail(paths: tuple[str, ...], lines: int) -> None:
+    """Print the last lines of the files at PATHS."""
+    for index, path in enumerate(paths):
+        if (file := _get_file(path)) is not None:
+            _print_header(index, paths)
+            utils.command.print(utils.command.escape(
+                "\n".join(file.lines(max(file.line_count - lines, 0)))))
+
+
+async def _page(path: str, file: utils.file_system.File) -> bool:
+    """Page through a file.
+
+    Arguments:
+        - path: the path of the file (shown in the prompt).
+        - file: the file.
+
+    Returns:
+        False if the user quit, True if the end was reached.
+    """
+    # leave room for the prompt
+    page: int = max(utils.command.height() - 2, 1)
+    line_count: int = file.line_count
+    top: int = 0
+    while True:
+        lines: list[str] = file.lines(top, page)
+        utils.command.print(utils.command.escape("\n".join(lines)))
+        end: int = top + len(lines)
+        answer: str = (await utils.command.input(
+            f"[reverse]{path} {top + 1}-{end}/{line_count} "
+            "(enter: next, b: back, g/G: top/end, /text: search, q: quit)[/] ")).strip()
+        if answer == "q":
+            return False
+        if answer == "b":
+            top = max(top - page, 0)
+        elif answer == "g":
+            top = 0
+        elif answer == "G":
+            top = max(line_count - page, 0)
+        elif answer.startswith("/") and len(answer) > 1:
+            for number, line in enumerate(file.iter_lines(top + 1), start=top + 1):
+                if answer[1:] in line:
+                    top = number
+                    break
+            else:
+                utils.command.print("Pattern not found.")
+        elif answer.isdecimal():
+            top = min(max(int(answer) - 1, 0), line_count - 1)
+        elif end >= line_count:
+            return True
+        else:
+            top = end
+
+
+@click.command()
+@click.argument("paths", type=click.STRING, nargs=-1, required=True)
+async def less(paths: tuple[str, ...]) -> None:
+    """Page through the files at PATHS one after another (only reads the lines on screen)."""
+    for path in paths:
+        if (file := _get_file(path)) is not None and not await _page(path, file):
+            return
+
+
+@click.command()
+@click.argument("paths", type=click.STRING, nargs=-1)
+@click.option("-L", "max_depth", type=click.IntRange(min=1), default=None,
+              help="Maximum depth.")
+@click.option("-I", "ignore", type=click.STRING, multiple=True,
+              help="Glob pattern of names to leave out (can be repeated).")
+async def tree(paths: tuple[str, ...], max_depth: int | None, ignore: tuple[str, ...]) -> None:
+    """Show the directory trees of PATHS."""
+    for path in paths or (".",):
+        try:
+            lines = utils.network.NETWORK.file_system.tree(path, max_depth, ignore)
+            first: str = next(lines)
+        except utils.file_system.FileSystem.NoSuchFileException as excp:
+            utils.command.print(f"No such file or directory '{excp}'.")
+            continue
+        utils.command.print(first)
+        await utils.command.stream(lines)
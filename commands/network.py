@@ -0,0 +1,148 @@
+"""Network commands."""
+
+import time
+
+import click
+
+import utils.command
+import utils.device
+import utils.network
+import utils.scanner
+
+
+@click.command()
+@click.argument("target", type=click.STRING)
+def nslookup(target: str) -> None:
+    """Look up the address of the domain name TARGET or the names of the address TARGET."""
+    network = utils.network.NETWORK
+    if utils.device.NPv5Address.PATTERN.fullmatch(target):
+        names: list[str] = network.dns.reverse(utils.device.NPv5Address(target))
+        if not names:
+            utils.command.print(f"** server can't find {target}: NXDOMAIN")
+            return
+        utils.command.print(utils.command.escape(
+            "\n".join(f"{target}\tname = {name}." for name in names)))
+        return
+    answer: utils.network.Answer | None = network.resolver.resolve(target)
+    if answer is None:
+        utils.command.print(utils.command.escape(f"** server can't find {target}: NXDOMAIN"))
+        return
+    cached: str = "Non-authoritative answer:\n" if answer.cached else ""
+    utils.command.print(utils.command.escape(
+        f"{cached}Name:\t{answer.record.name}\nAddress: {answer.record.net_address}"))
+
+
+@click.command()
+@click.argument("target", type=click.STRING)
+@click.option("-x", "reverse", is_flag=True, default=False,
+              help="Reverse lookup of the address TARGET.")
+@click.option("--axfr", "zone", is_flag=True, default=False,
+              help="List all records of the zone TARGET.")
+async def dig(target: str, reverse: bool, zone: bool) -> None:
+    """Query the DNS for TARGET."""
+    network = utils.network.NETWORK
+    if reverse:
+        try:
+            net_address = utils.device.NPv5Address(target)
+        except TypeError:
+            utils.command.print(utils.command.escape(f"Invalid address '{target}'."))
+            return
+        lines: list[str] = [f"{net_address}.\tIN\tPTR\t{name}."
+                            for name in network.dns.reverse(net_address)]
+    elif zone:
+        lines = [f"{record.name}.\t{record.ttl}\tIN\tA\t{record.net_address}"
+                 for record in network.dns.zone(target)]
+    else:
+        answer: utils.network.Answer | None = network.resolver.resolve(target)
+        lines = [] if answer is None else \
+            [f"{answer.record.name}.\t{answer.ttl}\tIN\tA\t{answer.record.net_address}",
+             f";; {'cached' if answer.cached else 'authoritative'} answer"]
+    if not lines:
+        utils.command.print(utils.command.escape(f";; status: NXDOMAIN for {target}"))
+        return
+    await utils.command.stream(utils.command.escape(line) for line in lines)
+
+
+def _host(net_address: utils.device.NPv5Address) -> str:
+    """Get an address with its first domain name (if it has one)."""
+    names: list[str] = utils.network.NETWORK.dns.reverse(net_address)
+    return f"{net_address} ({names[0]})" if names else str(net_address)
+
+
+@click.command()
+@click.argument("target", type=click.STRING)
+@click.option("-m", "max_hops", type=click.IntRange(1), default=30,
+              help="Maximum number of hops.")
+async def traceroute(target: str, max_hops: int) -> None:
+    """Show the hops to the address or domain name TARGET."""
+    network = utils.network.NETWORK
+    route: list[utils.device.NPv5Address] | None = network.route(target)
+    if route is None:
+        utils.command.print(utils.command.escape(f"traceroute: no route to {target}"))
+        return
+    utils.command.print(utils.command.escape(
+        f"traceroute to {target} ({route[-1]}), {max_hops} hops max"))
+    latency: float = 0
+    lines: list[str] = []
+    for hop, (previous, net_address) in enumerate(zip(route, route[1:max_hops + 1]), 1):
+        latency += network.weight(previous, net_address)
+        lines.append(f"{hop:>2}  {_host(net_address)}  {latency:g} ms")
+    await utils.command.stream(utils.command.escape(line) for line in lines)
+
+
+@click.command()
+@click.argument("target", type=click.STRING)
+@click.option("-s", "source", type=click.STRING, default=None,
+              help="Address or domain name to start from instead of the current computer.")
+def route(target: str, source: str | None) -> None:
+    """Show the shortest route to the address or domain name TARGET."""
+    network = utils.network.NETWORK
+    nodes: list[utils.device.NPv5Address] | None = network.route(target, source)
+    if nodes is None:
+        utils.command.print(utils.command.escape(f"No route to {target}."))
+        return
+    latency: float = sum(map(network.weight, nodes, nodes[1:]))
+    utils.command.print(utils.command.escape(
+        "\n".join([*map(_host, nodes),
+                   f"{len(nodes) - 1} hop{'s' if len(nodes) != 2 else ''}, {latency:g} ms"])))
+
+
+@click.command()
+@click.argument("targets", type=click.STRING, nargs=-1, required=True)
+@click.option("-p", "ports", type=click.STRING, default=None,
+              help="Ports to scan, e.g. 22,80,100-200 (registered ports by default).")
+@click.option("-c", "concurrency", type=click.IntRange(1), default=256,
+              help="Maximum number of hosts probed at once.")
+async def nmap(targets: tuple[str, ...], ports: str | None, concurrency: int) -> None:
+    """Scan TARGETS (addresses, domain names, first-last ranges or address/bits blocks) for
+    hosts and open ports."""
+    network = utils.network.NETWORK
+    try:
+        ranges: list[range] = [utils.scanner.parse_targets(target, network)
+                               for target in targets]
+        port_list: list[int] = utils.scanner.parse_ports(ports) if ports is not None \
+            else list(utils.device.Port)
+    except (ValueError, TypeError) as excp:
+        utils.command.print(utils.command.escape(f"nmap: {excp}"))
+        return
+    total: int = sum(addresses.stop - addresses.start for addresses in ranges)
+    utils.command.print(f"Scanning {total} address{'es' if total != 1 else ''}, "
+                        f"{len(port_list)} port{'s' if len(port_list) != 1 else ''}...")
+    scanner = utils.scanner.Scanner(network, concurrency)
+    start: float = time.monotonic()
+    up: int = 0
+    async for result in scanner.scan(ranges, port_list):
+        up += 1
+        lines: list[str] = [f"{_host(result.net_address)}  up, {result.latency:g} ms"]
+        lines.extend(f"  {port}/tcp  open  {_service(port)}" for port in result.ports)
+        utils.command.print(utils.command.escape("\n".join(lines)))
+    utils.command.print(f"Done: {total} address{'es' if total != 1 else ''}, {up} host"
+                        f"{'s' if up != 1 else ''} up in {time.monotonic() - start:.2f}s")
+
+
+def _service(port: int) -> str:
+    """Get the service name of a port."""
+    try:
+        return utils.device.Port(port).name.lower()
+    except ValueError:
+        return "unknown"
@@ -41,11 +41,11 @@ class OracleApp(textual.app.App):
     def action_link(self, target: str) -> None:
         """Handle link action."""
         # taken from Website.switch_website
-        display: textual.widgets.ContentSwitcher = self.screen.query_one(
-            "#display_inner", textual.widgets.ContentSwitcher)
+        display: widgets.website.WebsiteSwitcher = self.screen.query_one(
+            "#display_inner", widgets.website.WebsiteSwitcher)
         widgets.website.Website.web_history.append(
             typing.cast(str, display.current))
-        display.current = target
+        display.switch(target)
         widgets.website.Website.website = target
 
     def add_notification(self, widget_id) -> None:
@@ -8,6 +8,7 @@ import textual.screen
 import textual.widgets
 
 import utils
+import utils.autosave
 import utils.command
 import utils.values
 import widgets.chat
@@ -22,8 +23,6 @@ class DesktopScreen(textual.screen.Screen):
     def __init__(self) -> None:
         """Initialize the desktop screen."""
         super().__init__(id="desktop")
-        self.websites: list[widgets.website.Website] \
-            = widgets.website.get_websites()
         self.active_id: str = "web_browser"
 
     def on_mount(self) -> None:
@@ -31,6 +30,7 @@ class DesktopScreen(textual.screen.Screen):
         # FIXME: whyyyyy?
         utils.command.COMMANDS = utils.command.get_commands()
         widgets.terminal.Terminal.TERMINAL.focus()
+        self.set_interval(utils.autosave.AUTOSAVE_INTERVAL, utils.autosave.AUTOSAVE.request)
 
     def compose(self) -> textual.app.ComposeResult:
         """Compose the ui."""
@@ -51,9 +51,9 @@ class DesktopScreen(textual.screen.Screen):
                         yield textual.widgets.Button("debug", id="debug_button",
                                                      classes="display_button")
                 # can't use two ContentSwitcher (directly together?), so this has to do
-                with textual.widgets.ContentSwitcher(initial="search", id="display_inner"):
-                    # cursed (like everything else), but it works
-                    yield from self.websites
+                with widgets.website.WebsiteSwitcher(initial="search", id="display_inner"):
+                    # other websites are mounted when navigated to
+                    yield widgets.website.REGISTRY.create("search")
                     yield textual.widgets.ListView(id="netmail")
                     yield widgets.chat.ChatWidget(id_="chat")
                     yield textual.widgets.ListView(id="news")
@@ -67,8 +67,7 @@ class DesktopScreen(textual.screen.Screen):
         """Handle button pressed event for display_button."""
         # cursed, like everything else
         event.stop()
-        display_inner = self.query_one(
-            "#display_inner", textual.widgets.ContentSwitcher)
+        display_inner = self.query_one("#display_inner", widgets.website.WebsiteSwitcher)
         # change active button
         self.query_one(".display_button_active", textual.widgets.Button
                        ).remove_class("display_button_active")
@@ -80,7 +79,7 @@ class DesktopScreen(textual.screen.Screen):
         self.active_id = str(event.button.id).removesuffix("_button")
         # change display
         if event.button.id == "web_browser_button":
-            display_inner.current = widgets.website.Website.website
+            display_inner.switch(widgets.website.Website.website)
         else:
             display_inner.current = self.active_id
 
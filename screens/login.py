@@ -1,6 +1,7 @@
 """Login screen."""
 
 import datetime
+import typing
 
 import textual.app
 import textual.containers
@@ -9,6 +10,7 @@ import textual.screen
 import textual.widgets
 
 import screens.desktop
+import utils.autosave
 import utils.save
 import utils.values
 
@@ -27,7 +29,7 @@ class ListUsersScreen(textual.screen.ModalScreen):
             yield textual.widgets.Rule(id="llist_rule")
             with textual.containers.Vertical(id="llist_ver"):
                 yield from [textual.widgets.Label(user, classes="llist_label")
-                            for user in utils.save.get_newest_saves()]
+                            for user in utils.save.get_users()]
             with textual.containers.Horizontal(id="llist_hor"):
                 yield textual.widgets.Button("close", id="llist_close", classes="login_button")
 
@@ -69,7 +71,7 @@ class CreateUserScreen(textual.screen.ModalScreen):
             self.notify("Username can't be empty.", severity="error")
         elif username == "zer0":
             self.notify("Sorry, that's taken ;)", severity="error")
-        elif username in utils.save.get_newest_saves():
+        elif username in utils.save.get_users():
             self.notify("Username already used.", severity="error")
         elif not username.isalnum():
             self.notify("Username may only contain alpanumeric characters.",
@@ -98,11 +100,14 @@ class LoginScreen(textual.screen.Screen):
 
     def login(self) -> bool:
         """Log in to computer."""
-        saves: dict[str, utils.save.Save] = utils.save.get_newest_saves()
         user = self.query_one("#login_user", textual.widgets.Input)
         pwd = self.query_one("#login_pwd", textual.widgets.Input)
-        if (save := saves.get(user.value.lower())) is not None:
-            if save.password == pwd.value.lower():
+        username: str = user.value.lower()
+        # only the profile is read until the password is right
+        if (profile := utils.save.load_profile(username)) is not None:
+            if profile.password == pwd.value.lower():
+                utils.autosave.AUTOSAVE.start(
+                    typing.cast(utils.save.Save, utils.autosave.AUTOSAVE.load(username)))
                 # add correct values to Values
                 utils.values.VALUES.player = user.value
                 user.clear()
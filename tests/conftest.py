@@ -0,0 +1,13 @@
+"""Shared fixtures of the tests."""
+
+import pytest
+
+import utils.blob_store
+
+
+@pytest.fixture(autouse=True)
+def fresh_blob_store(monkeypatch: pytest.MonkeyPatch) -> utils.blob_store.BlobStore:
+    """Give each test an empty blob store, so no content is shared between tests."""
+    store = utils.blob_store.BlobStore()
+    monkeypatch.setattr(utils.blob_store, "BLOBS", store)
+    return store
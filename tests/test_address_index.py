@@ -0,0 +1,55 @@
+"""Tests of the sorted address index and prefix ranges."""
+
+import random
+
+import pytest
+
+import utils.address_index
+
+
+def test_queries_match_brute_force() -> None:
+    rng = random.Random(0)
+    addresses: list[int] = [rng.randrange(1 << 20) for _ in range(500)]
+    index = utils.address_index.AddressIndex()
+    index.add_many(addresses[:400])
+    for address in addresses[400:]:
+        index.add(address)
+    expected: list[int] = sorted(set(addresses))
+    assert list(index) == expected
+    assert len(index) == len(expected)
+    for _ in range(50):
+        start: int = rng.randrange(1 << 20)
+        addresses_range = range(start, start + rng.randrange(1 << 16))
+        inside: list[int] = [address for address in expected if address in addresses_range]
+        assert list(index.query(addresses_range)) == inside
+        assert index.count(addresses_range) == len(inside)
+        assert index.bounds(addresses_range) == ((inside[0], inside[-1]) if inside else None)
+
+
+def test_add_and_remove() -> None:
+    index = utils.address_index.AddressIndex()
+    index.add_many([5, 1, 5])
+    index.add(3)
+    index.add(3)
+    assert list(index) == [1, 3, 5]
+    index.remove(3)
+    index.remove(4)
+    assert 3 not in index and 5 in index
+    assert list(index) == [1, 5]
+
+
+@pytest.mark.parametrize(("prefix", "expected"), [
+    ("", range(0, 1 << 64)),
+    ("1", range(0x1 << 60, 0x2 << 60)),
+    ("0A", range(0x0A << 56, 0x0B << 56)),
+    ("0A.", range(0x0A << 56, 0x0B << 56)),
+    ("0A.0", range(0x0A0 << 52, 0x0A1 << 52)),
+    ("00.00.00.00.00.00.00.0F", range(0x0F, 0x10)),
+])
+def test_text_prefix_range(prefix: str, expected: range) -> None:
+    assert utils.address_index.text_prefix_range(prefix) == expected
+
+
+@pytest.mark.parametrize("prefix", ["0A0", "0A..", "0G", "00.00.00.00.00.00.00.0F.0"])
+def test_invalid_text_prefix(prefix: str) -> None:
+    assert utils.address_index.text_prefix_range(prefix) is None
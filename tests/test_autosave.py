@@ -0,0 +1,124 @@
+"""Tests of the autosave worker."""
+
+import pathlib
+import threading
+import typing
+
+import pytest
+
+import utils.autosave
+import utils.save
+
+
+@pytest.fixture(autouse=True)
+def saves_path(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """Keep the saves in a temporary directory."""
+    monkeypatch.setattr(utils.save, "SAVES_PATH", tmp_path)
+    monkeypatch.setattr(utils.save, "INDEX_PATH", tmp_path / "index.json")
+    return tmp_path
+
+
+@pytest.fixture(name="autosave")
+def fixture_autosave() -> typing.Iterator[utils.autosave.Autosave]:
+    """Get an autosave that is closed after the test."""
+    autosave = utils.autosave.Autosave()
+    yield autosave
+    autosave.close()
+
+
+@pytest.fixture(name="gate")
+def fixture_gate(monkeypatch: pytest.MonkeyPatch) -> typing.Iterator[threading.Event]:
+    """Block writes of the worker until the returned event is set (always set after the test)."""
+    gate = threading.Event()
+    save = utils.save.Save.save
+
+    def blocked_save(self: utils.save.Save) -> None:
+        """Wait for the gate on the worker, then write."""
+        if threading.current_thread() is not threading.main_thread():
+            assert gate.wait(10)
+        save(self)
+
+    monkeypatch.setattr(utils.save.Save, "save", blocked_save)
+    yield gate
+    gate.set()
+
+
+def created(username: str) -> utils.save.Save:
+    """Create and write the save of a new user."""
+    save = utils.save.Save.create(username, "secret")
+    save.save()
+    return save
+
+
+def test_request_writes_in_the_background(autosave: utils.autosave.Autosave) -> None:
+    autosave.start(created("alice"))
+    autosave.save.money = 7
+    autosave.request()
+    assert autosave.flush(10)
+    assert utils.save.load_save("alice").money == 7
+    assert (autosave.requests, autosave.writes, autosave.error) == (1, 1, None)
+
+
+def test_requests_are_coalesced(autosave: utils.autosave.Autosave,
+                                gate: threading.Event) -> None:
+    autosave.start(created("alice"))
+    for money in range(1, 6):
+        autosave.save.money = money
+        autosave.request()
+    assert not autosave.flush(0.05)
+    gate.set()
+    assert autosave.flush(10)
+    assert utils.save.load_save("alice").money == 5
+    assert autosave.requests == 5
+    assert autosave.writes < 5
+
+
+def test_switching_players_does_not_wait(autosave: utils.autosave.Autosave,
+                                         gate: threading.Event) -> None:
+    alice: utils.save.Save = created("alice")
+    bob: utils.save.Save = created("bob")
+    autosave.start(alice)
+    alice.money = 1
+    autosave.request()
+    # alice's state is still waiting for the gate
+    autosave.start(bob)
+    bob.money = 2
+    autosave.request()
+    assert not autosave.flush(0.05)
+    gate.set()
+    assert autosave.flush(10)
+    assert utils.save.load_save("alice").money == 1
+    assert utils.save.load_save("bob").money == 2
+
+
+def test_loading_waits_for_queued_states(autosave: utils.autosave.Autosave,
+                                         gate: threading.Event) -> None:
+    alice: utils.save.Save = created("alice")
+    autosave.start(alice)
+    alice.money = 3
+    autosave.request()
+    autosave.start(created("bob"))
+    threading.Timer(0.05, gate.set).start()
+    assert autosave.load("alice").money == 3
+
+
+def test_failed_writes_do_not_stop_the_worker(autosave: utils.autosave.Autosave,
+                                              monkeypatch: pytest.MonkeyPatch) -> None:
+    autosave.start(created("alice"))
+    save = utils.save.Save.save
+
+    def failing_save(self: utils.save.Save) -> None:
+        """Fail like a full disk."""
+        raise OSError("disk full")
+
+    monkeypatch.setattr(utils.save.Save, "save", failing_save)
+    autosave.request()
+    assert autosave.flush(10)
+    assert isinstance(autosave.error, OSError)
+    monkeypatch.setattr(utils.save.Save, "save", save)
+    autosave.save.money = 9
+    autosave.request()
+    assert autosave.flush(10)
+    assert autosave.error is None
+    assert autosave.failures == 1
+    assert utils.save.load_save("alice").money == 9
@@ -0,0 +1,61 @@
+"""Tests of the shared blob store and the references file systems hold in it."""
+
+import json
+import pathlib
+
+import utils.blob_store
+import utils.device
+import utils.file_system
+import utils.network
+
+HOME: str = "00.00.00.00.00.00.00.01"
+SERVER: str = "00.00.00.00.00.00.00.02"
+OTHER: str = "00.00.01.00.00.00.00.03"
+
+
+def test_identical_content_is_stored_once(
+        fresh_blob_store: utils.blob_store.BlobStore) -> None:
+    first: bytes = fresh_blob_store.put("hello")
+    second: bytes = fresh_blob_store.put("hello")
+    assert first is second
+    stats: utils.blob_store.BlobStats = fresh_blob_store.stats()
+    assert (stats.blobs, stats.references, stats.stored_size, stats.logical_size) == (1, 2, 5, 10)
+    assert stats.dedup_ratio == 2.0
+    fresh_blob_store.release(first)
+    assert fresh_blob_store.get(second) == "hello"
+    fresh_blob_store.release(second)
+    assert first not in fresh_blob_store
+    assert fresh_blob_store.stats() == utils.blob_store.BlobStats(0, 0, 0, 0)
+
+
+def test_files_release_their_chunks(fresh_blob_store: utils.blob_store.BlobStore) -> None:
+    root = utils.file_system.Directory("", None, [], [])
+    text = utils.file_system.File.text("a", "x" * (utils.file_system.CHUNK_SIZE + 1))
+    root.add_child(text)
+    text.append("yz")
+    assert text.content == "x" * (utils.file_system.CHUNK_SIZE + 1) + "yz"
+    assert fresh_blob_store.stats().logical_size == text.size
+    text.content = "short"
+    assert fresh_blob_store.stats().logical_size == 5
+    root.remove_child(text)
+    assert not fresh_blob_store
+
+
+def test_evicted_devices_release_their_chunks(
+        tmp_path: pathlib.Path, fresh_blob_store: utils.blob_store.BlobStore) -> None:
+    path: pathlib.Path = tmp_path / "world.json"
+    path.write_text(json.dumps({
+        "home": HOME, "dns": {},
+        "devices": {HOME: {"name": "home"}, SERVER: {"name": "server"}, OTHER: {"name": "x"}},
+        "edges": [[HOME, SERVER], [HOME, OTHER]]}))
+    network = utils.network.Network.load(path, capacity=1)
+    assert network.connect(SERVER)
+    network.file_system.root.add_child(utils.file_system.File.text("notes", "remember"))
+    network.disconnect()
+    baseline: int = fresh_blob_store.stats().references
+    network.devices([utils.device.NPv5Address(OTHER)])
+    # the modified server went to its region shard and gave up its content
+    assert fresh_blob_store.stats().references < baseline
+    assert fresh_blob_store.key("remember") not in fresh_blob_store
+    assert network.connect(SERVER)
+    assert network.file_system.root.file("notes.txt").content == "remember"
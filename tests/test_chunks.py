@@ -0,0 +1,91 @@
+"""Tests of chunked file contents, reading by line and the less pager."""
+
+import asyncio
+import typing
+
+import pytest
+
+import commands.files
+import utils.blob_store
+import utils.command
+import utils.file_system
+
+TEXT: str = "\n".join(f"line {number}" for number in range(40))
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Use chunks of a few characters so lines span several chunks."""
+    monkeypatch.setattr(utils.file_system, "CHUNK_SIZE", 8)
+
+
+def test_content_is_chunked(fresh_blob_store: utils.blob_store.BlobStore) -> None:
+    file = utils.file_system.File.text("log", TEXT)
+    assert file.content == TEXT
+    assert len(file.chunks) == -(-len(TEXT) // 8)
+    assert all(len(fresh_blob_store.get(chunk)) <= 8 for chunk in file.chunks)
+    assert file.line_count == len(TEXT.split("\n"))
+
+
+@pytest.mark.parametrize("start", [0, 1, 7, 38, 39, 40, 50])
+@pytest.mark.parametrize("count", [None, 0, 1, 3])
+def test_lines(start: int, count: int | None) -> None:
+    file = utils.file_system.File.text("log", TEXT)
+    expected: list[str] = TEXT.split("\n")[start:]
+    assert file.lines(start, count) == (expected if count is None else expected[:count])
+
+
+def test_append_fills_the_last_chunk() -> None:
+    file = utils.file_system.File.text("log", "abc")
+    first: bytes = file.chunks[0]
+    file.append("de\nfghijk\n")
+    assert file.content == "abcde\nfghijk\n"
+    assert file.chunks[0] is not first
+    assert file.lines(1) == ["fghijk", ""]
+    assert file.line_count == 3
+    assert file.size == len(file.content)
+
+
+def test_empty_file() -> None:
+    file = utils.file_system.File.text("empty", "")
+    assert (file.content, file.line_count, file.lines()) == ("", 1, [""])
+
+
+def page(monkeypatch: pytest.MonkeyPatch, answers: list[str], height: int = 7) \
+        -> tuple[bool, list[str]]:
+    """Page through TEXT with answers to the prompt.
+
+    Returns:
+        The result of the pager and the printed pages.
+    """
+    printed: list[str] = []
+    pending: typing.Iterator[str] = iter(answers)
+
+    async def answer(prompt: str) -> str:
+        """Answer the prompt."""
+        return next(pending)
+
+    monkeypatch.setattr(utils.command, "print", printed.append)
+    monkeypatch.setattr(utils.command, "input", answer)
+    monkeypatch.setattr(utils.command, "height", lambda: height)
+    file = utils.file_system.File.text("log", TEXT)
+    # pylint:disable=protected-access
+    return asyncio.run(commands.files._page("log", file)), printed
+
+
+def first_lines(printed: list[str]) -> list[str]:
+    """Get the first line of each printed page."""
+    return [text.split("\n")[0] for text in printed]
+
+
+def test_pager_pages_to_the_end(monkeypatch: pytest.MonkeyPatch) -> None:
+    reached, printed = page(monkeypatch, [""] * 10)
+    assert reached
+    assert first_lines(printed) == [f"line {number}" for number in range(0, 40, 5)]
+
+
+def test_pager_moves_and_searches(monkeypatch: pytest.MonkeyPatch) -> None:
+    reached, printed = page(monkeypatch, ["", "b", "G", "g", "12", "/line 30", "/nothing", "q"])
+    assert not reached
+    assert first_lines(printed) == ["line 0", "line 5", "line 0", "line 35", "line 0", "line 11",
+                                    "line 30", "Pattern not found.", "line 30"]
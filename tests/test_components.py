@@ -0,0 +1,52 @@
+"""Tests of the incremental connected components against networkx."""
+
+import random
+
+import networkx
+import pytest
+
+import utils.components
+import utils.graph
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("backend", list(utils.graph.GRAPH_BACKENDS))
+def test_matches_networkx(seed: int, backend: str) -> None:
+    rng = random.Random(seed)
+    graph = utils.graph.GRAPH_BACKENDS[backend]()
+    expected = networkx.Graph()
+    nodes: list[int] = rng.sample(range(10 ** 9), 30)
+    graph.add_nodes_from(nodes)
+    expected.add_nodes_from(nodes)
+    components = utils.components.Components(graph)
+    for _ in range(200):
+        if rng.random() < 0.6 or not expected.number_of_edges():
+            first_node, second_node = rng.sample(nodes, 2)
+            graph.add_edge(first_node, second_node)
+            expected.add_edge(first_node, second_node)
+            components.added(first_node, second_node)
+        else:
+            first_node, second_node = rng.choice(list(expected.edges()))
+            graph.remove_edge(first_node, second_node)
+            expected.remove_edge(first_node, second_node)
+            components.removed()
+        first_node, second_node = rng.sample(nodes, 2)
+        assert components.connected(first_node, second_node) \
+            == networkx.has_path(expected, first_node, second_node)
+        node: int = rng.choice(nodes)
+        assert sorted(components.component(node)) \
+            == sorted(networkx.node_connected_component(expected, node))
+    assert len(components) == sum(
+        1 for component in networkx.connected_components(expected) if len(component) > 1)
+
+
+def test_isolated_nodes() -> None:
+    graph = networkx.Graph()
+    graph.add_nodes_from([1, 2])
+    components = utils.components.Components(graph)
+    assert components.connected(1, 1)
+    assert not components.connected(1, 2)
+    assert components.component(1) == [1]
+    assert len(components) == 0
+    # nodes the graph doesn't know are isolated as well
+    assert components.component(3) == [3]
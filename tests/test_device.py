@@ -0,0 +1,111 @@
+"""Tests of devices and their records."""
+
+import gc
+import pickle
+
+import pydantic
+import pytest
+
+import utils.device
+
+
+def test_record_defaults() -> None:
+    """Missing values of a record are the defaults (ports by device type)."""
+    device, server = utils.device.Device.from_records([(1, {}), (2, {"type": "server"})])
+    assert device.name == "00.00.00.00.00.00.00.01"
+    assert device.type == utils.device.DeviceType.TERMINAL
+    assert device.ports == utils.device.DEFAULT_PORTS[utils.device.DeviceType.TERMINAL]
+    assert device.prompt == utils.device.DEFAULT_PROMPT
+    assert server.ports == utils.device.DEFAULT_PORTS[utils.device.DeviceType.SERVER]
+
+
+def test_record_values() -> None:
+    """Values of a record are used (the seed and template give the file system)."""
+    device: utils.device.Device = utils.device.Device.from_record(
+        "00.00.00.00.00.00.00.05", {"name": "box", "type": "vehicle", "ports": [80],
+                                    "username": "root", "seed": 7})
+    assert (device.name, device.type, device.ports, device.username) == (
+        "box", utils.device.DeviceType.VEHICLE, (80,), "root")
+    other: utils.device.Device = utils.device.Device.from_record(9, {"seed": 7})
+    assert device.file_system.root.to_record() == other.file_system.root.to_record()
+
+
+@pytest.mark.parametrize("record", [
+    {"colour": "red"},
+    {"type": "toaster"},
+    {"ports": [70000]},
+    {"template": "nowhere"},
+])
+def test_invalid_records(record: dict) -> None:
+    """Invalid records are refused."""
+    with pytest.raises(pydantic.ValidationError):
+        utils.device.Device.from_record(1, record)
+
+
+def test_shard_record_round_trip() -> None:
+    """A record with the file system (region shards) restores the device."""
+    device: utils.device.Device = utils.device.Device.from_record(3, {"name": "x", "ports": []})
+    assert device.file_system.root.children
+    restored: utils.device.Device = utils.device.Device.from_record(3, device.to_record())
+    assert restored.to_record() == device.to_record()
+    assert restored.ports == ()
+
+
+@pytest.mark.parametrize("pause_gc", [True, False])
+@pytest.mark.parametrize("enabled", [True, False])
+def test_gc_state_is_restored(pause_gc: bool, enabled: bool) -> None:
+    """The construction leaves the garbage collector as it was."""
+    was_enabled: bool = gc.isenabled()
+    try:
+        if enabled:
+            gc.enable()
+        else:
+            gc.disable()
+        utils.device.Device.from_records([(1, {})], pause_gc)
+        assert gc.isenabled() == enabled
+    finally:
+        if was_enabled:
+            gc.enable()
+        else:
+            gc.disable()
+
+
+def test_addresses() -> None:
+    """Addresses are parsed and formatted in bulk like one by one."""
+    addresses: list[str] = ["00.00.00.00.00.00.00.01", "FF.00.00.00.00.00.00.0A",
+                            "00.00.00.00.01.28.E3.48"]
+    values: list[int] = utils.device.NPv5Address.values_many(addresses)
+    assert values == [utils.device.NPv5Address(address).address for address in addresses]
+    assert utils.device.NPv5Address.parse_many(addresses) == [
+        utils.device.NPv5Address(address) for address in addresses]
+    assert utils.device.NPv5Address.format_many(values) == addresses
+    assert utils.device.NPv5Address.values_many([addresses[0], 10, values[2]]) \
+        == [1, 10, values[2]]
+
+
+def test_addresses_are_interned_ints() -> None:
+    """Addresses parsed in any form are the same object and behave like their int."""
+    address = utils.device.NPv5Address("00.00.00.00.00.00.01.0a")
+    assert address is utils.device.NPv5Address(0x10A)
+    assert address is utils.device.NPv5Address(address)
+    assert address is pickle.loads(pickle.dumps(address))
+    assert address == 0x10A and hash(address) == hash(0x10A)
+    assert repr(address) == "NPv5Address(266)"
+    for value in ("0.0.0.0.0.0.1", "00.00.00.00.00.00.01.0G", -1, 2**64, 1.0):
+        with pytest.raises(TypeError):
+            utils.device.NPv5Address(value)
+
+
+@pytest.mark.parametrize(("format_spec", "expected"), [
+    ("", "00.00.00.00.00.00.01.0A"),
+    (">25", "  00.00.00.00.00.00.01.0A"),
+    ("<24s", "00.00.00.00.00.00.01.0A "),
+    ("^27", "  00.00.00.00.00.00.01.0A  "),
+    ("d", "266"),
+    ("x", "10a"),
+    ("016X", "000000000000010A"),
+    (">6d", "   266"),
+])
+def test_address_format(format_spec: str, expected: str) -> None:
+    """String specs format the dotted form, numeric presentation types the int."""
+    assert format(utils.device.NPv5Address(0x10A), format_spec) == expected
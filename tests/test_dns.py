@@ -0,0 +1,111 @@
+"""Tests of the DNS trie, reverse lookups and caching resolvers."""
+
+import utils.device
+import utils.network
+
+
+def dns() -> utils.network.DNS:
+    """Create a DNS with a few zones."""
+    result = utils.network.DNS()
+    result.add("zer0", 1)
+    result.add("www.zer0", 2, ttl=10)
+    result.add("mail.zer0", 2)
+    result.add("deep.www.zer0", 3)
+    result.add("other.net", 4)
+    return result
+
+
+def names(records: list[utils.network.Record]) -> list[str]:
+    """Get the names of records."""
+    return [record.name for record in records]
+
+
+def test_get_normalizes_names() -> None:
+    records = dns()
+    assert records.get("WWW.Zer0.").net_address is utils.device.NPv5Address(2)
+    assert records.get("missing.zer0") is None
+    assert len(records) == 5
+
+
+def test_zones() -> None:
+    records = dns()
+    assert names(records.zone("zer0")) == ["deep.www.zer0", "mail.zer0", "www.zer0", "zer0"]
+    assert names(records.zone("*.zer0")) == ["deep.www.zer0", "mail.zer0", "www.zer0"]
+    assert names(records.zone("www.zer0")) == ["deep.www.zer0", "www.zer0"]
+    assert records.zone("nowhere.zer0") == []
+    assert records.zone("a.b.c") == []
+
+
+def test_reverse_lookup() -> None:
+    records = dns()
+    assert sorted(records.reverse(2)) == ["mail.zer0", "www.zer0"]
+    records.add("www.zer0", 5)
+    assert records.reverse(2) == ["mail.zer0"]
+    assert records.reverse(5) == ["www.zer0"]
+    records.remove("mail.zer0")
+    assert records.reverse(2) == []
+
+
+def test_removing_prunes_the_trie() -> None:
+    records = dns()
+    records.remove("deep.www.zer0")
+    records.remove("www.zer0")
+    assert names(records.zone("zer0")) == ["mail.zer0", "zer0"]
+    records.remove("other.net")
+    records.remove("other.net")
+    assert records.zone("net") == []
+    assert not records._zones.children.get("net")  # pylint:disable=protected-access
+
+
+def test_add_many() -> None:
+    records = utils.network.DNS()
+    records.add_many([("a.zer0", "00.00.00.00.00.00.00.0A", 60), ("b.zer0", 11, 5)])
+    assert (records.get("a.zer0").net_address, records.get("a.zer0").ttl) == (10, 60)
+    assert records.get("b.zer0").net_address == 11
+
+
+class Clock:
+    """Clock that only moves when told to."""
+
+    def __init__(self) -> None:
+        """Start at 0."""
+        self.now: float = 0
+
+    def __call__(self) -> float:
+        """Get the time."""
+        return self.now
+
+
+def test_resolver_caches_for_the_ttl() -> None:
+    records = dns()
+    clock = Clock()
+    resolver = utils.network.Resolver(records, clock=clock)
+    answer = resolver.resolve("www.zer0")
+    assert (answer.record.net_address, answer.ttl, answer.cached) == (2, 10, False)
+    records.add("www.zer0", 9)
+    clock.now = 4
+    answer = resolver.resolve("WWW.zer0")
+    # the cached answer is kept until the TTL runs out
+    assert (answer.record.net_address, answer.ttl, answer.cached) == (2, 6, True)
+    clock.now = 10
+    answer = resolver.resolve("www.zer0")
+    assert (answer.record.net_address, answer.cached) == (9, False)
+    assert resolver.resolve("missing.zer0") is None
+    resolver.flush()
+    assert not resolver.resolve("www.zer0").cached
+
+
+def test_resolver_capacity() -> None:
+    records = dns()
+    clock = Clock()
+    resolver = utils.network.Resolver(records, capacity=2, clock=clock)
+    resolver.resolve("zer0")
+    resolver.resolve("mail.zer0")
+    resolver.resolve("other.net")
+    # the oldest answer made room
+    assert not resolver.resolve("zer0").cached
+    assert resolver.resolve("other.net").cached
+    clock.now = 1000
+    # expired answers are dropped first
+    resolver.resolve("www.zer0")
+    assert not resolver.resolve("other.net").cached
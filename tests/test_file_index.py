@@ -0,0 +1,89 @@
+"""Tests of the name and trigram indexes behind find and grep."""
+
+import utils.file_system
+
+
+def make_file_system() -> utils.file_system.FileSystem:
+    """Create a file system with a hand made directory next to the generated ones."""
+    file_system = utils.file_system.FileSystem()
+    docs = utils.file_system.Directory("docs", None, [], [])
+    file_system.root.add_child(docs)
+    docs.add_child(utils.file_system.File.text("notes", "first line\nsecret plan\n"))
+    return file_system
+
+
+def grep(file_system: utils.file_system.FileSystem, pattern: str) -> list[str]:
+    """Search the whole file system, results as path:line."""
+    return [f"{file_system.path(file)}:{number}"
+            for file, number, _ in file_system.grep(pattern, "/", recursive=True)]
+
+
+def test_find_sees_added_nodes() -> None:
+    file_system = make_file_system()
+    docs = file_system.get("/docs")
+    assert isinstance(docs, utils.file_system.Directory)
+    docs.add_child(utils.file_system.File.text("todo", "buy milk"))
+    docs.add_child(utils.file_system.Directory("todo", None, [], []))
+    assert sorted(file_system.find("/", name="todo*")) == ["/docs/todo", "/docs/todo.txt"]
+    assert sorted(file_system.find("/", name="todo", type_="d")) == ["/docs/todo"]
+
+
+def test_find_includes_unloaded_generated_directories() -> None:
+    file_system = make_file_system()
+    assert sorted(file_system.find("/", name="*.txt")) == ["/docs/notes.txt", "/home/bar.txt"]
+    home = file_system.root.child("home")
+    assert home is not None and not home.loaded
+
+
+def test_find_forgets_removed_nodes() -> None:
+    file_system = make_file_system()
+    assert file_system.rm("/docs/notes.txt") is None
+    assert not list(file_system.find("/", name="notes.txt"))
+    assert file_system.rm("/docs", recursive=True) is None
+    assert not list(file_system.find("/", name="docs"))
+
+
+def test_find_after_release() -> None:
+    file_system = make_file_system()
+    file_system.get("/home/bar.txt")
+    assert file_system.release() > 0
+    assert sorted(file_system.find("/", name="bar.txt")) == ["/home/bar.txt"]
+
+
+def test_grep_sees_changed_content() -> None:
+    file_system = make_file_system()
+    file = file_system.get("/docs/notes.txt")
+    assert isinstance(file, utils.file_system.File)
+    assert grep(file_system, "secret") == ["/docs/notes.txt:2"]
+    file.content = "nothing here"
+    assert not grep(file_system, "secret")
+    file.append("\nsecret again")
+    assert grep(file_system, "secret") == ["/docs/notes.txt:2"]
+
+
+def test_grep_finds_text_spanning_an_append() -> None:
+    file_system = make_file_system()
+    file = file_system.get("/docs/notes.txt")
+    assert isinstance(file, utils.file_system.File)
+    file.content = "top sec"
+    file.append("ret")
+    assert grep(file_system, "secret") == ["/docs/notes.txt:1"]
+
+
+def test_grep_forgets_removed_files() -> None:
+    file_system = make_file_system()
+    assert file_system.rm("/docs/notes.txt") is None
+    assert not grep(file_system, "secret")
+    assert file_system.index.content_candidates("secret") == []
+
+
+def test_grep_scans_unloaded_generated_content() -> None:
+    file_system = make_file_system()
+    assert grep(file_system, "Lorem") == ["/home/bar.txt:1"]
+    home = file_system.root.child("home")
+    assert home is not None and not home.loaded
+
+
+def test_grep_without_literal_scans_everything() -> None:
+    file_system = make_file_system()
+    assert grep(file_system, "^s") == ["/docs/notes.txt:2"]
@@ -0,0 +1,145 @@
+"""Tests of the incremental directory totals behind du, ls and df."""
+
+import utils.file_system
+
+
+def brute_force(directory: utils.file_system.Directory) -> tuple[int, int]:
+    """Sum the file sizes of a subtree by loading all of it."""
+    size: int = sum(file.size for file in directory.files)
+    files: int = len(directory.files)
+    for child in directory.children:
+        child_size, child_files = brute_force(child)
+        size += child_size
+        files += child_files
+    return size, files
+
+
+def expected_du(file_system: utils.file_system.FileSystem) -> dict[str, tuple[int, int]]:
+    """Get the totals of every directory of a fully loaded copy of a file system."""
+    copy = utils.file_system.FileSystem.from_record(file_system.to_record())
+    totals: dict[str, tuple[int, int]] = {}
+    stack: list[utils.file_system.Directory] = [copy.root]
+    while stack:
+        directory = stack.pop()
+        totals[copy.path(directory)] = brute_force(directory)
+        stack.extend(directory.children)
+    return totals
+
+
+def du(file_system: utils.file_system.FileSystem) -> dict[str, tuple[int, int]]:
+    """Get the totals of every directory."""
+    return {path: (size, files) for size, files, path in file_system.du("/")}
+
+
+def test_du_matches_brute_force_without_loading() -> None:
+    file_system = utils.file_system.FileSystem()
+    assert du(file_system) == expected_du(file_system)
+    home = file_system.root.child("home")
+    assert home is not None and not home.loaded
+
+
+def test_df_matches_brute_force() -> None:
+    file_system = utils.file_system.FileSystem()
+    size, files = brute_force(utils.file_system.FileSystem().root)
+    assert file_system.df()[1:] == (size, files)
+
+
+def test_totals_follow_changes() -> None:
+    file_system = utils.file_system.FileSystem()
+    file_system.df()
+    home = file_system.get("/home")
+    assert isinstance(home, utils.file_system.Directory)
+    docs = utils.file_system.Directory("docs", None, [], [])
+    home.add_child(docs)
+    notes = utils.file_system.File.text("notes", "hello")
+    docs.add_child(notes)
+    assert du(file_system) == expected_du(file_system)
+    notes.content = "a much longer text than before"
+    assert du(file_system) == expected_du(file_system)
+    notes.append(" and then some")
+    assert du(file_system) == expected_du(file_system)
+    assert file_system.rm("/home/bar.txt") is None
+    assert du(file_system) == expected_du(file_system)
+    assert file_system.rm("/home/docs", recursive=True) is None
+    assert du(file_system) == expected_du(file_system)
+    size, files = brute_force(file_system.root)
+    assert file_system.df()[1:] == (size, files)
+
+
+def test_totals_survive_release() -> None:
+    file_system = utils.file_system.FileSystem()
+    file_system.get("/home/bar.txt")
+    before = du(file_system)
+    assert file_system.release() > 0
+    assert du(file_system) == before
+    file_system.get("/home/bar.txt")
+    assert du(file_system) == before
+
+
+def test_ls_reports_directory_totals() -> None:
+    file_system = utils.file_system.FileSystem()
+    expected = expected_du(file_system)
+    home = file_system.get("/home")
+    assert isinstance(home, utils.file_system.Directory)
+    list(file_system.ls("/", list_=True))
+    assert (home.total_size, home.total_files) == expected["/home"]
+
+
+def test_record_round_trip_keeps_totals() -> None:
+    file_system = utils.file_system.FileSystem()
+    file_system.get("/home/bar.txt")
+    file = file_system.get("/home/bar.txt")
+    assert isinstance(file, utils.file_system.File)
+    file.append("more")
+    df = file_system.df()
+    assert utils.file_system.FileSystem.from_record(file_system.to_record()).df() == df
+
+
+def check_counters(directory: utils.file_system.Directory) -> tuple[int, int]:
+    """Check the pending and uncounted counters of a subtree against its unloaded nodes."""
+    if not directory.loaded:
+        expected: tuple[int, int] = (1, int(not directory.counted))
+    else:
+        expected = (0, 0)
+        for child in directory.children:
+            pending, uncounted = check_counters(child)
+            expected = (expected[0] + pending, expected[1] + uncounted)
+    assert (directory.pending, directory.uncounted) == expected
+    return expected
+
+
+def test_counters_follow_changes() -> None:
+    file_system = utils.file_system.FileSystem()
+    check_counters(file_system.root)
+    docs = utils.file_system.Directory("docs", None, [], [])
+    file_system.root.add_child(docs)
+    for seed in range(3):
+        docs.add_child(utils.file_system.Directory.generated(f"home{seed}", "home", seed))
+    check_counters(file_system.root)
+    home0 = docs.child("home0")
+    assert home0 is not None
+    home0.count()
+    list(file_system.du("/docs/home1"))
+    check_counters(file_system.root)
+    file_system.get("/docs/home2/bar.txt")
+    check_counters(file_system.root)
+    assert file_system.release() > 0
+    check_counters(file_system.root)
+    assert file_system.rm("/docs/home1", recursive=True) is None
+    check_counters(file_system.root)
+    copy = utils.file_system.FileSystem.from_record(file_system.to_record())
+    check_counters(copy.root)
+    assert copy.df() == file_system.df()
+
+
+def test_counting_a_subtree_leaves_the_rest() -> None:
+    file_system = utils.file_system.FileSystem()
+    docs = utils.file_system.Directory("docs", None, [], [])
+    file_system.root.add_child(docs)
+    docs.add_child(utils.file_system.File.text("a", "text"))
+    assert docs.unloaded() == []
+    list(file_system.ls("/docs", list_=True))
+    list(file_system.du("/docs"))
+    home = file_system.root.child("home")
+    assert home is not None and not home.counted
+    assert file_system.root.unloaded(uncounted=True) == [home]
@@ -0,0 +1,66 @@
+"""Tests of seed-based generation of directories and file contents on first access."""
+
+import utils.file_system
+
+
+def loaded_record(seed: int, template: str = "server") -> dict:
+    """Get the record of a fully loaded generated tree."""
+    file_system = utils.file_system.FileSystem(utils.file_system.Directory.root(seed, template))
+    stack: list[utils.file_system.Directory] = [file_system.root]
+    while stack:
+        directory = stack.pop()
+        for file in directory.files:
+            assert file.content is not None
+        stack.extend(directory.children)
+    return file_system.root.to_record()
+
+
+def test_generation_is_lazy() -> None:
+    root = utils.file_system.Directory.root(7)
+    assert not root.loaded
+    assert root.to_record() == {"name": "", "generator": "root", "seed": 7}
+    home = root.child("home")
+    assert root.loaded and not home.loaded
+    executable = home.file("foo")
+    assert home.loaded and not executable.loaded
+    assert len(executable.content) == executable.size
+    assert executable.loaded
+
+
+def test_same_seed_same_tree() -> None:
+    assert loaded_record(3) == loaded_record(3)
+    assert loaded_record(3) != loaded_record(4)
+
+
+def test_release_regenerates_the_same_content() -> None:
+    file_system = utils.file_system.FileSystem(utils.file_system.Directory.root(11, "server"))
+    access = file_system.get("/var/log/access.txt")
+    executable = file_system.get("/home/foo")
+    content: tuple[str, str] = (access.content, executable.content)
+    file_system.cd("/home")
+    assert file_system.release() > 0
+    # the working directory stays, the rest is back to its seed
+    assert file_system.root.loaded and file_system.get("/home").loaded
+    assert not file_system.root.child("var").loaded
+    assert not executable.loaded
+    assert (file_system.get("/var/log/access.txt").content,
+            file_system.get("/home/foo").content) == content
+
+
+def test_modified_content_is_kept() -> None:
+    file_system = utils.file_system.FileSystem(utils.file_system.Directory.root(5))
+    executable = file_system.get("/home/foo")
+    executable.content = "patched"
+    file_system.release()
+    assert file_system.get("/home/foo") is executable
+    assert executable.content == "patched"
+    record: dict = file_system.to_record()
+    copy = utils.file_system.FileSystem.from_record(record)
+    assert copy.get("/home/foo").content == "patched"
+    assert copy.get("/home/bar.txt").content == "Lorem ipsum, dolor sit amet."
+
+
+def test_peek_does_not_keep_content() -> None:
+    executable = utils.file_system.File.executable("tool", 9)
+    assert executable.peek() == utils.file_system.File.executable("tool", 9).content
+    assert not executable.loaded
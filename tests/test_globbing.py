@@ -0,0 +1,57 @@
+"""Tests of shell-style glob expansion."""
+
+import pytest
+
+import utils.file_system
+import utils.globbing
+
+
+@pytest.fixture(name="file_system")
+def fixture_file_system() -> utils.file_system.FileSystem:
+    """File system with a few hand made nodes next to the generated ones."""
+    file_system = utils.file_system.FileSystem()
+    docs = utils.file_system.Directory("docs", None, [], [])
+    file_system.root.add_child(docs)
+    docs.add_child(utils.file_system.File.text("a", "a"))
+    docs.add_child(utils.file_system.File.text("b", "b"))
+    docs.add_child(utils.file_system.File.text(".hidden", "h"))
+    docs.add_child(utils.file_system.Directory("sub", None, [], []))
+    sub = docs.child("sub")
+    assert sub is not None
+    sub.add_child(utils.file_system.File.text("c", "c"))
+    return file_system
+
+
+@pytest.mark.parametrize(("pattern", "expected"), [
+    ("/*", ["/bin", "/docs", "/home"]),
+    ("/docs/*.txt", ["/docs/a.txt", "/docs/b.txt"]),
+    ("/docs/?.txt", ["/docs/a.txt", "/docs/b.txt"]),
+    ("/docs/[a]*", ["/docs/a.txt"]),
+    ("/docs/[!a]*", ["/docs/b.txt", "/docs/sub"]),
+    ("/d?cs", ["/docs"]),
+    ("/[dh]*", ["/docs", "/home"]),
+    ("/docs/.*", ["/docs/.hidden.txt"]),
+    ("/docs/**/*.txt", ["/docs/a.txt", "/docs/b.txt", "/docs/sub/c.txt"]),
+    ("/docs/*/", ["/docs/sub"]),
+    ("/home/*", ["/home/bar.txt", "/home/foo", "/home/test"]),
+    ("/*/sub/c.txt", ["/docs/sub/c.txt"]),
+    ("/nothing*", []),
+])
+def test_absolute_patterns(file_system: utils.file_system.FileSystem, pattern: str,
+                           expected: list[str]) -> None:
+    assert utils.globbing.expand(pattern, file_system) == expected
+
+
+def test_relative_patterns(file_system: utils.file_system.FileSystem) -> None:
+    docs = file_system.get("/docs")
+    assert isinstance(docs, utils.file_system.Directory)
+    file_system.working_directory = docs
+    assert utils.globbing.expand("*", file_system) == ["a.txt", "b.txt", "sub"]
+    assert utils.globbing.expand("**/*.txt", file_system) == ["a.txt", "b.txt", "sub/c.txt"]
+    assert utils.globbing.expand("../h*", file_system) == ["../home"]
+
+
+def test_has_magic() -> None:
+    assert utils.globbing.has_magic("*.txt")
+    assert utils.globbing.has_magic("file[0-9]")
+    assert not utils.globbing.has_magic("/home/bar.txt")
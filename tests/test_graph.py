@@ -0,0 +1,108 @@
+"""Tests of the CSR graph backend against networkx."""
+
+import random
+
+import networkx
+import pytest
+
+import utils.graph
+
+
+def assert_same(graph: utils.graph.CSRGraph, expected: networkx.Graph) -> None:
+    """Check that a CSR graph has the same nodes and edges as a networkx graph."""
+    assert graph.number_of_nodes() == expected.number_of_nodes()
+    assert graph.number_of_edges() == expected.number_of_edges()
+    assert sorted(map(sorted, graph.edges())) == sorted(map(sorted, expected.edges()))
+    for node in expected.nodes:
+        assert node in graph
+        assert sorted(graph.neighbors(node)) == sorted(expected.neighbors(node))
+
+
+def add_edge(graph: utils.graph.CSRGraph, expected: networkx.Graph, first_node: int,
+             second_node: int) -> None:
+    """Add an edge to both graphs (the CSR graph drops self loops, only keeping the node)."""
+    graph.add_edge(first_node, second_node)
+    if first_node == second_node:
+        expected.add_node(first_node)
+    else:
+        expected.add_edge(first_node, second_node)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("compact_threshold", [3, 65536])
+def test_random_operations(seed: int, compact_threshold: int) -> None:
+    rng = random.Random(seed)
+    graph = utils.graph.CSRGraph(compact_threshold)
+    expected = networkx.Graph()
+    # nodes are sparse and not added in order
+    nodes: list[int] = rng.sample(range(10 ** 12), 40)
+    graph.add_nodes_from(nodes[:10])
+    expected.add_nodes_from(nodes[:10])
+    for _ in range(60):
+        add_edge(graph, expected, rng.choice(nodes[:30]), rng.choice(nodes[:30]))
+    assert_same(graph, expected)
+    for _ in range(300):
+        operation: float = rng.random()
+        if operation < 0.45:
+            add_edge(graph, expected, rng.choice(nodes), rng.choice(nodes))
+        elif operation < 0.9 and expected.number_of_edges():
+            first_node, second_node = rng.choice(list(expected.edges()))
+            graph.remove_edge(first_node, second_node)
+            expected.remove_edge(first_node, second_node)
+        else:
+            node: int = rng.choice(nodes)
+            graph.add_node(node)
+            expected.add_node(node)
+        first_node, second_node = rng.choice(nodes), rng.choice(nodes)
+        assert graph.has_edge(first_node, second_node) \
+            == expected.has_edge(first_node, second_node)
+    assert_same(graph, expected)
+    graph.compact()
+    assert_same(graph, expected)
+
+
+def test_duplicate_edges() -> None:
+    graph = utils.graph.CSRGraph()
+    graph.add_edges_from([(1, 2), (2, 1), (1, 2)])
+    graph.add_edge(2, 1)
+    assert graph.number_of_edges() == 1
+    assert list(graph.neighbors(1)) == [2]
+
+
+def test_readding_a_removed_edge() -> None:
+    graph = utils.graph.CSRGraph()
+    graph.add_edges_from([(1, 2), (2, 3)])
+    graph.remove_edge(2, 1)
+    assert not graph.has_edge(1, 2)
+    graph.add_edge(1, 2)
+    assert graph.has_edge(2, 1)
+    assert graph.number_of_edges() == 2
+
+
+def test_missing_edges_and_nodes() -> None:
+    graph = utils.graph.CSRGraph()
+    graph.add_edge(1, 2)
+    with pytest.raises(KeyError):
+        graph.remove_edge(1, 3)
+    with pytest.raises(KeyError):
+        graph.neighbors(3)
+    assert 3 not in graph
+    graph.remove_edge(1, 2)
+    with pytest.raises(KeyError):
+        graph.remove_edge(2, 1)
+    assert 1 in graph and 2 in graph
+
+
+def test_compaction_merges_sorted_rows() -> None:
+    graph = utils.graph.CSRGraph()
+    graph.add_edges_from([(10, 30), (30, 50), (10, 50)])
+    graph.add_node(70)
+    # new nodes between the old ones shift their ids
+    graph.add_edges_from([(20, 30), (40, 10), (60, 70), (30, 40)])
+    graph.remove_edge(10, 50)
+    graph.compact()
+    assert list(graph.neighbors(10)) == [30, 40]
+    assert list(graph.neighbors(30)) == [10, 20, 40, 50]
+    assert list(graph.neighbors(50)) == [30]
+    assert list(graph.neighbors(70)) == [60]
+    assert graph.number_of_edges() == 6
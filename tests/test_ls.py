@@ -0,0 +1,67 @@
+"""Tests of the sorted, paginated ls listing."""
+
+import utils.file_system
+
+
+def make_file_system() -> utils.file_system.FileSystem:
+    """Create a file system with a directory of generated directories."""
+    file_system = utils.file_system.FileSystem()
+    many = utils.file_system.Directory("many", None, [], [])
+    file_system.root.add_child(many)
+    # added out of order, listed sorted
+    for seed in (3, 0, 4, 1, 2):
+        many.add_child(utils.file_system.Directory.generated(f"d{seed}", "home", seed))
+    many.add_child(utils.file_system.File.text("notes", "some notes"))
+    return file_system
+
+
+def names(entries: list[str]) -> list[str]:
+    """Strip the markup of listed directory names."""
+    return [entry.removeprefix("[#0000FF]").removesuffix("[/]") for entry in entries]
+
+
+def test_sorted_pages() -> None:
+    file_system = make_file_system()
+    assert names(list(file_system.ls("/many"))) == ["d0", "d1", "d2", "d3", "d4", "notes.txt"]
+    assert names(list(file_system.ls("/many", offset=2, limit=2))) == ["d2", "d3"]
+    assert names(list(file_system.ls("/many", offset=5))) == ["notes.txt"]
+    assert not list(file_system.ls("/many", offset=10))
+    assert not list(file_system.ls("/many", limit=0))
+    assert names(list(file_system.ls("/many", all_=True, limit=3))) == [".", "..", "d0"]
+
+
+def test_pages_only_count_their_entries() -> None:
+    file_system = make_file_system()
+    many = file_system.get("/many")
+    assert isinstance(many, utils.file_system.Directory)
+    page = list(file_system.ls("/many", list_=True, offset=1, limit=2))
+    assert [line.split()[-1] for line in page] == ["[#0000FF]d1[/]", "[#0000FF]d2[/]"]
+    assert [child.counted for child in many.children] == [False, True, True, False, False]
+    assert all(not child.loaded for child in many.children)
+
+
+def test_sort_by_size() -> None:
+    file_system = make_file_system()
+    many = file_system.get("/many")
+    assert isinstance(many, utils.file_system.Directory)
+    listed = names(list(file_system.ls("/many", by_size=True)))
+    sizes = {child.name: child.total_size for child in many.children}
+    assert listed[:5] == sorted(sizes, key=lambda name: sizes[name], reverse=True)
+
+
+def test_recursive_listing() -> None:
+    file_system = utils.file_system.FileSystem()
+    docs = utils.file_system.Directory("docs", None, [], [])
+    file_system.root.add_child(docs)
+    docs.add_child(utils.file_system.Directory("sub", None, [], []))
+    docs.add_child(utils.file_system.File.text("a", "a"))
+    assert names(list(file_system.ls("/docs", recursive=True))) \
+        == ["/docs:", "sub", "a.txt", "", "/docs/sub:"]
+    assert names(list(file_system.ls("/docs", recursive=True, offset=1, limit=3))) \
+        == ["sub", "a.txt", ""]
+
+
+def test_file() -> None:
+    file_system = make_file_system()
+    assert list(file_system.ls("/many/notes.txt")) == ["notes.txt"]
+    assert list(file_system.ls("/many/notes.txt", list_=True))[0].split()[-1] == "notes.txt"
@@ -0,0 +1,76 @@
+"""Tests of the slotted directory and file nodes and of walking paths through them."""
+
+import sys
+
+import pytest
+
+import utils.file_system
+
+
+def tree() -> utils.file_system.FileSystem:
+    """Create a hand made file system (/a/b and files in /a)."""
+    root = utils.file_system.Directory("", None, [], [])
+    directory = utils.file_system.Directory("a", None, [], [])
+    root.add_child(directory)
+    directory.add_child(utils.file_system.Directory("b", None, [], []))
+    for name in ("zeta", "alpha", "mid"):
+        directory.add_child(utils.file_system.File.text(name, name))
+    return utils.file_system.FileSystem(root)
+
+
+def test_nodes_have_no_dict() -> None:
+    file_system = tree()
+    for node in (file_system.root, file_system.get("/a/alpha.txt")):
+        assert not hasattr(node, "__dict__")
+        with pytest.raises(AttributeError):
+            node.colour = "red"
+
+
+def test_names_are_interned() -> None:
+    name: str = "".join(["sh", "ared"])
+    assert utils.file_system.Directory(name, None, [], []).name is sys.intern("shared")
+    assert utils.file_system.File.text(name, "").name is sys.intern("shared")
+
+
+def test_children_stay_sorted() -> None:
+    file_system = tree()
+    directory = file_system.get("/a")
+    assert [str(file) for file in directory.files] == ["alpha.txt", "mid.txt", "zeta.txt"]
+    directory.add_child(utils.file_system.Directory("0", None, [], []))
+    directory.add_child(utils.file_system.Directory("c", None, [], []))
+    assert [child.name for child in directory.children] == ["0", "b", "c"]
+    assert directory.child("c").parent is directory
+    assert directory.child("missing") is None
+    assert directory.file("mid.txt").content == "mid"
+    assert directory.file("mid") is None
+    directory.remove_child(directory.file("mid.txt"))
+    directory.remove_child(directory.child("b"))
+    assert [str(file) for file in directory.files] == ["alpha.txt", "zeta.txt"]
+    assert [child.name for child in directory.children] == ["0", "c"]
+
+
+def test_paths() -> None:
+    file_system = tree()
+    assert file_system.cd("a/b") is None
+    assert file_system.pwd() == "/a/b"
+    assert file_system.path(file_system.get("../alpha.txt")) == "/a/alpha.txt"
+    # the root is its own parent
+    assert file_system.path(file_system.get("/../../a/./b/")) == "/a/b"
+    assert file_system.cd("/") is None
+    assert file_system.pwd() == "/"
+    assert file_system.cd("nowhere") == "No such directory 'nowhere'."
+    with pytest.raises(utils.file_system.FileSystem.NoSuchFileException):
+        file_system.get("/a/missing/alpha.txt")
+
+
+def test_rm() -> None:
+    file_system = tree()
+    file_system.cd("/a/b")
+    assert file_system.rm("/a/alpha.txt") is None
+    assert file_system.rm("/a") == "'/a' is a directory."
+    assert file_system.rm("/a", recursive=True) \
+        == "Can't remove '/a', it contains the working directory."
+    file_system.cd("/")
+    assert file_system.rm("/a", recursive=True) is None
+    assert file_system.rm("/a") == "No such file or directory '/a'."
+    assert file_system.root.total_files == 0
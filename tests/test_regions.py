@@ -0,0 +1,89 @@
+"""Tests of region shards and the eviction of least recently used devices."""
+
+import json
+import pathlib
+
+import pytest
+
+import utils.device
+import utils.file_system
+import utils.network
+import utils.regions
+
+HOME: int = 1
+"""Address of the home device, the others are 0x10000 * region + host."""
+
+
+def address(region: int, host: int) -> int:
+    """Get an address in a region."""
+    return region << utils.regions.REGION_BITS | host
+
+
+@pytest.fixture(name="path")
+def fixture_path(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Write a world with home and 3 devices in each of 2 regions, all connected to home."""
+    addresses: list[int] = [address(region, host) for region in (1, 2) for host in (1, 2, 3)]
+    devices: dict = {str(utils.device.NPv5Address(HOME)): {"name": "home"}}
+    devices.update({str(utils.device.NPv5Address(net_address)): {"name": f"d{net_address:x}"}
+                    for net_address in addresses})
+    path: pathlib.Path = tmp_path / "world.json"
+    path.write_text(json.dumps({
+        "home": str(utils.device.NPv5Address(HOME)), "dns": {}, "devices": devices,
+        "edges": [[str(utils.device.NPv5Address(HOME)), str(utils.device.NPv5Address(other))]
+                  for other in addresses]}))
+    return path
+
+
+def test_store_round_trip(tmp_path: pathlib.Path) -> None:
+    store = utils.regions.RegionStore(tmp_path / "shards", cache=1)
+    store.put_many([(address(1, 1), {"name": "a"}), (address(1, 2), {"name": "b"}),
+                    (address(2, 1), {"name": "c"})])
+    assert sorted(path.name for path in (tmp_path / "shards").iterdir()) \
+        == ["000000000001.json", "000000000002.json"]
+    assert store.get(address(1, 2)) == {"name": "b"}
+    assert store.get(address(2, 1)) == {"name": "c"}
+    assert address(1, 3) not in store and address(3, 1) not in store
+    store.put_many([(address(1, 2), {"name": "changed"})])
+    # a new store reads the shards written by the old one
+    reopened = utils.regions.RegionStore(tmp_path / "shards")
+    assert reopened.get(address(1, 1)) == {"name": "a"}
+    assert reopened.get(address(1, 2)) == {"name": "changed"}
+
+
+def test_least_recently_used_devices_are_evicted(path: pathlib.Path) -> None:
+    network = utils.network.Network.load(path, capacity=3)
+    assert network.computer.name == "home"
+    first, second, third = (utils.device.NPv5Address(address(1, host)) for host in (1, 2, 3))
+    network.devices([first, second])
+    network.devices([first])
+    # home, first and third fit, second was used least recently
+    network.devices([third])
+    assert list(network._nodes) == [HOME, first, third]  # pylint:disable=protected-access
+    # unmodified devices are read from the world file again, not stored
+    assert not list(network.regions.directory.iterdir())
+
+
+def test_modified_devices_go_to_their_region(path: pathlib.Path) -> None:
+    network = utils.network.Network.load(path, capacity=1)
+    target = utils.device.NPv5Address(address(2, 3))
+    assert network.connect(target)
+    network.file_system.root.add_child(utils.file_system.File.text("loot", "gold"))
+    network.disconnect()
+    network.devices([utils.device.NPv5Address(address(1, 1))])
+    assert target not in network._nodes  # pylint:disable=protected-access
+    assert network.regions.get(target)["name"] == "d20003"
+    assert [shard.name for shard in network.regions.directory.iterdir()] \
+        == ["000000000002.json"]
+    assert network.connect(target)
+    assert network.file_system.get("/loot.txt").content == "gold"
+
+
+def test_home_and_current_stay(path: pathlib.Path) -> None:
+    network = utils.network.Network.load(path, capacity=1)
+    assert network.computer.name == "home"
+    current = utils.device.NPv5Address(address(1, 1))
+    assert network.connect(current)
+    assert network.computer.name == "d10001"
+    network.devices([utils.device.NPv5Address(address(2, host)) for host in (1, 2)])
+    assert HOME in network._nodes and current in network._nodes  # pylint:disable=protected-access
+    assert network.computer.net_address == current
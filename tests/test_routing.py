@@ -0,0 +1,85 @@
+"""Tests of the cached shortest path router against networkx."""
+
+import random
+
+import networkx
+import pytest
+
+import utils.graph
+import utils.routing
+
+
+def make_graph(rng: random.Random, backend: str) -> tuple[utils.graph.Graph, dict]:
+    """Create a random sparse graph with random link weights."""
+    graph: utils.graph.Graph = utils.graph.GRAPH_BACKENDS[backend]()
+    weights: dict[frozenset[int], float] = {}
+    for _ in range(80):
+        first_node, second_node = rng.sample(range(40), 2)
+        graph.add_edge(first_node, second_node)
+        weights[frozenset((first_node, second_node))] = rng.choice([1, 1, 2, 5, 0.5])
+    graph.add_node(99)  # unreachable
+    return graph, weights
+
+
+def reference(graph: utils.graph.Graph, weights: dict) -> networkx.Graph:
+    """Copy a graph with its weights into networkx."""
+    expected = networkx.Graph()
+    expected.add_nodes_from(node for edge in graph.edges() for node in edge)
+    expected.add_node(99)
+    for first_node, second_node in graph.edges():
+        expected.add_edge(first_node, second_node,
+                          weight=weights[frozenset((first_node, second_node))])
+    return expected
+
+
+def assert_shortest(router: utils.routing.Router, expected: networkx.Graph, weights: dict,
+                    rng: random.Random) -> None:
+    """Check random queries of a router against networkx."""
+    nodes: list[int] = sorted(expected.nodes)
+    for _ in range(60):
+        source, target = rng.choice(nodes), rng.choice(nodes)
+        try:
+            length: float | None = networkx.shortest_path_length(expected, source, target,
+                                                                 weight="weight")
+        except networkx.NetworkXNoPath:
+            length = None
+        assert router.distance(source, target) == length
+        path: list[int] | None = router.path(source, target)
+        if length is None:
+            assert path is None
+            continue
+        assert path is not None and path[0] == source and path[-1] == target
+        assert sum(weights[frozenset(link)] for link in zip(path, path[1:])) == length
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("backend", ["networkx", "csr"])
+def test_matches_networkx_after_updates(seed: int, backend: str) -> None:
+    rng = random.Random(seed)
+    graph, weights = make_graph(rng, backend)
+    router = utils.routing.Router(graph, lambda a, b: weights[frozenset((a, b))], capacity=8)
+    assert_shortest(router, reference(graph, weights), weights, rng)
+    for _ in range(20):
+        if rng.random() < 0.5:
+            first_node, second_node = rng.sample(range(40), 2)
+            if graph.has_edge(first_node, second_node):
+                continue
+            weight: float = rng.choice([0.5, 1, 3])
+            graph.add_edge(first_node, second_node)
+            weights[frozenset((first_node, second_node))] = weight
+            router.added(first_node, second_node, weight)
+        else:
+            first_node, second_node = rng.choice(list(graph.edges()))
+            graph.remove_edge(first_node, second_node)
+            router.removed(first_node, second_node)
+        # query between updates so cached searches are reused
+        assert_shortest(router, reference(graph, weights), weights, rng)
+
+
+def test_unknown_nodes() -> None:
+    graph = networkx.Graph([(1, 2)])
+    router = utils.routing.Router(graph, lambda a, b: 1)
+    assert router.path(1, 3) is None
+    assert router.distance(3, 1) is None
+    assert router.path(1, 1) == [1]
+    assert router.distance(1, 2) == 1
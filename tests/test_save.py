@@ -0,0 +1,109 @@
+"""Tests of the save journal and snapshots."""
+
+import json
+import pathlib
+
+import pytest
+
+import utils.save
+
+
+@pytest.fixture(autouse=True)
+def saves_path(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """Keep the saves in a temporary directory."""
+    monkeypatch.setattr(utils.save, "SAVES_PATH", tmp_path)
+    monkeypatch.setattr(utils.save, "INDEX_PATH", tmp_path / "index.json")
+    return tmp_path
+
+
+def journal(username: str) -> list[dict]:
+    """Read the entries of the journal of a user."""
+    return [json.loads(line) for line in
+            utils.save.journal_path(username).read_text(encoding="utf-8").splitlines()]
+
+
+def test_round_trip_through_journal() -> None:
+    save = utils.save.Save.create("alice", "secret")
+    save.save()
+    assert len(journal("alice")) == 1
+    save.money = 42
+    save.programs.append("nmap")
+    save.save()
+    save.programs.append("ssh")
+    save.files = ["a.txt"]
+    save.save()
+    save.save()  # nothing changed, no entry
+    entries = journal("alice")
+    assert entries[1:] == [{"set": {"money": 42}, "extend": {"programs": ["nmap"]}},
+                           {"extend": {"programs": ["ssh"], "files": ["a.txt"]}}]
+    loaded = utils.save.load_save("alice")
+    assert loaded is not None
+    assert loaded.model_dump() == save.model_dump()
+    # the loaded save continues the journal
+    loaded.money = 7
+    loaded.save()
+    assert len(journal("alice")) == 4
+    reloaded = utils.save.load_save("alice")
+    assert reloaded is not None and reloaded.money == 7
+
+
+def test_load_profile() -> None:
+    save = utils.save.Save.create("bob", "hunter2")
+    save.save()
+    save.money = 5
+    save.save()
+    assert utils.save.load_profile("bob") == utils.save.Profile(
+        username="bob", password="hunter2", money=5)
+    assert utils.save.load_profile("nobody") is None
+    assert utils.save.load_save("nobody") is None
+
+
+def test_compaction_writes_snapshot(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(utils.save, "COMPACT_ENTRIES", 3)
+    save = utils.save.Save.create("carol", "pw")
+    save.save()
+    for money in range(1, 4):
+        save.money = money
+        save.save()
+    assert len(journal("carol")) == 4
+    save.money = 100
+    save.save()
+    assert journal("carol") == [{"snapshot": utils.save.read_index()["carol"].filename}]
+    loaded = utils.save.load_save("carol")
+    assert loaded is not None and loaded.money == 100
+
+
+def test_torn_journal_tail() -> None:
+    save = utils.save.Save.create("dave", "pw")
+    save.save()
+    save.money = 1
+    save.save()
+    with utils.save.journal_path("dave").open("a", encoding="utf-8") as file:
+        file.write('{"set": {"mon')
+    loaded = utils.save.load_save("dave")
+    assert loaded is not None and loaded.money == 1
+    # the journal can't be continued, so the next save writes a snapshot
+    loaded.money = 2
+    loaded.save()
+    assert len(journal("dave")) == 1
+    reloaded = utils.save.load_save("dave")
+    assert reloaded is not None and reloaded.money == 2
+
+
+def test_prune_keeps_newest_snapshots(saves_path: pathlib.Path) -> None:
+    names = [f"erin_2024-01-0{day}T00-00-00.save" for day in range(1, 6)]
+    for name in names:
+        (saves_path / name).touch()
+    (saves_path / "frank_2024-01-01T00-00-00.save").touch()
+    deleted = utils.save.prune("erin", keep=2)
+    assert sorted(path.name for path in deleted) == names[:3]
+    assert sorted(path.name for path in saves_path.glob("*.save")) \
+        == names[3:] + ["frank_2024-01-01T00-00-00.save"]
+
+
+def test_index_is_rebuilt(saves_path: pathlib.Path) -> None:
+    utils.save.Save.create("gina", "pw").save()
+    (saves_path / "index.json").write_text("garbage", encoding="utf-8")
+    assert utils.save.get_users() == ["gina"]
+    (saves_path / "index.json").unlink()
+    assert utils.save.get_users() == ["gina"]
@@ -0,0 +1,68 @@
+"""Tests of the sectioned binary save format."""
+
+import pathlib
+
+import pytest
+
+import utils.save
+import utils.save_file
+
+SECTIONS: dict[str, bytes] = {"profile": b'{"money": 1}', "files": b"x" * 1000, "empty": b""}
+
+
+@pytest.fixture(name="path")
+def fixture_path(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Write a save file with the sections."""
+    path: pathlib.Path = tmp_path / "test.save"
+    path.write_bytes(utils.save_file.encode(SECTIONS))
+    return path
+
+
+def test_round_trip(path: pathlib.Path) -> None:
+    with utils.save_file.SaveFile(path) as file:
+        assert file.names == list(SECTIONS)
+        assert "files" in file and "money" not in file
+        assert {name: file.read(name) for name in reversed(file.names)} == SECTIONS
+
+
+def test_large_sections_are_compressed(path: pathlib.Path) -> None:
+    assert path.stat().st_size < sum(map(len, SECTIONS.values()))
+
+
+def test_sections_are_read_on_demand(path: pathlib.Path) -> None:
+    data: bytearray = bytearray(path.read_bytes())
+    # break the compressed section, the others can still be read
+    data[-10:] = b"\0" * 10
+    path.write_bytes(data)
+    with utils.save_file.SaveFile(path) as file:
+        assert file.read("profile") == SECTIONS["profile"]
+        with pytest.raises(utils.save_file.SaveFileError):
+            file.read("files")
+
+
+def test_truncated_section(path: pathlib.Path) -> None:
+    path.write_bytes(utils.save_file.encode({"profile": b"abc", "raw": b"0123456789"})[:-3])
+    with utils.save_file.SaveFile(path) as file:
+        with pytest.raises(utils.save_file.SaveFileError, match="truncated"):
+            file.read("raw")
+
+
+@pytest.mark.parametrize("data", [b"", b"ORSV", b"NOPE\0\1\0\0", b"ORSV\0\x09\0\0",
+                                  b"ORSV\0\1\0\2" + b"\0" * 5])
+def test_invalid_files(path: pathlib.Path, data: bytes) -> None:
+    path.write_bytes(data)
+    with pytest.raises(utils.save_file.SaveFileError):
+        utils.save_file.SaveFile(path)
+
+
+def test_long_section_names() -> None:
+    with pytest.raises(ValueError):
+        utils.save_file.encode({"a" * 17: b""})
+
+
+def test_saves_are_sectioned() -> None:
+    save = utils.save.Save.create("mo", "pw")
+    save.programs = ["nmap"]
+    assert {name: data.decode() for name, data in save.sections().items()} == {
+        "profile": '{"username": "mo", "password": "pw", "money": 100}',
+        "programs": '["nmap"]', "files": "[]"}
@@ -0,0 +1,55 @@
+"""Tests of the index of the newest save of each user."""
+
+import pathlib
+import shutil
+
+import pytest
+
+import utils.save
+
+
+@pytest.fixture(autouse=True)
+def saves_path(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """Keep the saves in a temporary directory."""
+    monkeypatch.setattr(utils.save, "SAVES_PATH", tmp_path)
+    monkeypatch.setattr(utils.save, "INDEX_PATH", tmp_path / "index.json")
+    return tmp_path
+
+
+def test_snapshots_update_the_index(saves_path: pathlib.Path) -> None:
+    utils.save.Save.create("hana", "pw").save()
+    utils.save.Save.create("ivan", "pw").save()
+    index: dict[str, utils.save.IndexEntry] = utils.save.read_index()
+    assert sorted(index) == ["hana", "ivan"]
+    assert [path.name for path in saves_path.glob("hana_*.save")] == [index["hana"].filename]
+    assert index["hana"].saved.strftime(utils.save.TIME_FORMAT) in index["hana"].filename
+    # the index file is what later reads use
+    assert utils.save.INDEX_ADAPTER.validate_json((saves_path / "index.json").read_bytes()) \
+        == index
+
+
+def test_users_are_listed_without_reading_saves(monkeypatch: pytest.MonkeyPatch) -> None:
+    for username in ("jo", "kim"):
+        utils.save.Save.create(username, "pw").save()
+
+    def unexpected(filename: str, profile_only: bool = False) -> dict:
+        """Fail if a snapshot is read."""
+        raise AssertionError(filename)
+
+    monkeypatch.setattr(utils.save, "_read_snapshot", unexpected)
+    assert sorted(utils.save.get_users()) == ["jo", "kim"]
+
+
+def test_deleted_snapshot_falls_back(saves_path: pathlib.Path) -> None:
+    save = utils.save.Save.create("lee", "pw")
+    save.money = 5
+    save.save()
+    newest: pathlib.Path = saves_path / utils.save.read_index()["lee"].filename
+    older: pathlib.Path = saves_path / "lee_2000-01-01T00-00-00.save"
+    shutil.copy(newest, older)
+    newest.unlink()
+    assert utils.save.load_profile("lee").money == 5
+    assert utils.save.read_index()["lee"].filename == older.name
+    older.unlink()
+    assert utils.save.load_save("lee") is None
+    assert utils.save.get_users() == []
@@ -0,0 +1,81 @@
+"""Tests of target and port parsing and of scanning a network."""
+
+import asyncio
+import json
+import pathlib
+import re
+
+import pytest
+
+import utils.address_index
+import utils.device
+import utils.network
+import utils.scanner
+
+HOME: str = "00.00.00.00.00.00.00.01"
+SERVER: str = "00.00.00.00.00.00.01.02"
+ISLAND: str = "00.00.00.00.00.00.01.03"
+
+
+@pytest.fixture(name="network")
+def fixture_network(tmp_path: pathlib.Path) -> utils.network.Network:
+    """Load a world with a reachable server and an unreachable island."""
+    path: pathlib.Path = tmp_path / "world.json"
+    path.write_text(json.dumps({
+        "home": HOME, "dns": {"srv.zer0": SERVER},
+        "devices": {HOME: {}, SERVER: {"type": "server", "ports": [22, 80]}, ISLAND: {}},
+        "edges": [[HOME, SERVER, 5]]}))
+    return utils.network.Network.load(path)
+
+
+@pytest.mark.parametrize(("spec", "expected"), [
+    ("00.00.00.00.00.00.00.05", range(5, 6)),
+    ("00.00.00.00.00.00.01.00-00.00.00.00.00.00.01.FF", range(0x100, 0x200)),
+    ("00.00.00.00.00.00.01.00/56", range(0x100, 0x200)),
+    ("00.00.00.00.00.00.01.80/57", range(0x180, 0x200)),
+    ("0A.*", range(0x0A << 56, 0x0B << 56)),
+    ("00.00.00.00.00.00.01.*", range(0x100, 0x200)),
+    ("*", range(0, 1 << 64)),
+])
+def test_address_range(spec: str, expected: range) -> None:
+    assert utils.address_index.address_range(spec) == expected
+
+
+@pytest.mark.parametrize("spec", [
+    "00.00.83.86.0*", "0A.*.0B", "0A.**", "0A..*", "0G.*", "*.*.*.*.*.*.*.*.*",
+    "00.00.00.00.00.00.00.01/65", "00.00.00.00.00.00.00.01/x",
+    "00.00.00.00.00.00.00.02-00.00.00.00.00.00.00.01", "nonsense",
+])
+def test_invalid_address_range(spec: str) -> None:
+    with pytest.raises(ValueError, match=re.escape(f"Invalid address range '{spec}'")):
+        utils.address_index.address_range(spec)
+
+
+def test_parse_targets(network: utils.network.Network) -> None:
+    assert utils.scanner.parse_targets("srv.zer0", network) == range(0x102, 0x103)
+    assert utils.scanner.parse_targets("00.00.00.00.00.00.01.*", network) == range(0x100, 0x200)
+    with pytest.raises(ValueError, match="Could not resolve 'my-site.zer0'"):
+        utils.scanner.parse_targets("my-site.zer0", network)
+    with pytest.raises(ValueError, match="Invalid address range"):
+        utils.scanner.parse_targets("00.00.83.86.0*", network)
+
+
+def test_parse_ports() -> None:
+    assert utils.scanner.parse_ports("80,22,20-23") == [20, 21, 22, 23, 80]
+    for spec in ("", "x", "22-", "30-20", f"1-{utils.device.MAX_PORT + 1}"):
+        with pytest.raises(ValueError):
+            utils.scanner.parse_ports(spec)
+
+
+def test_scan(network: utils.network.Network) -> None:
+    scanner = utils.scanner.Scanner(network, concurrency=2, time_scale=0)
+
+    async def scan() -> list[utils.scanner.ScanResult]:
+        """Collect the results of a scan."""
+        return [result async for result in scanner.scan(
+            [utils.address_index.address_range("00.00.00.00.00.00.01.*")], [22, 443])]
+
+    results: list[utils.scanner.ScanResult] = asyncio.run(scan())
+    assert results == [utils.scanner.ScanResult(utils.device.NPv5Address(SERVER), 10, (22,))]
+    # only indexed addresses are probed
+    assert scanner.scanned == 2
@@ -0,0 +1,67 @@
+"""Tests of the iterative tree drawing."""
+
+import utils.file_system
+
+
+def file_system() -> utils.file_system.FileSystem:
+    """Create /a/b/deep.txt, /a/x.txt and /c."""
+    root = utils.file_system.Directory("", None, [], [])
+    first = utils.file_system.Directory("a", None, [], [])
+    second = utils.file_system.Directory("b", None, [], [])
+    root.add_child(first)
+    root.add_child(utils.file_system.Directory("c", None, [], []))
+    first.add_child(second)
+    first.add_child(utils.file_system.File.text("x", ""))
+    second.add_child(utils.file_system.File.text("deep", ""))
+    return utils.file_system.FileSystem(root)
+
+
+def plain(lines: list[str]) -> list[str]:
+    """Remove the markup of the directory names."""
+    return [line.replace("[#0000FF]", "").replace("[/]", "") for line in lines]
+
+
+def test_tree() -> None:
+    assert plain(list(file_system().tree("/"))) == [
+        "/",
+        "├── a",
+        "│   ├── b",
+        "│   │   └── deep.txt",
+        "│   └── x.txt",
+        "└── c",
+        "",
+        "3 directories, 2 files",
+    ]
+
+
+def test_max_depth_and_ignore() -> None:
+    assert plain(list(file_system().tree("/", max_depth=1))) == [
+        "/", "├── a", "└── c", "", "2 directories, 0 files"]
+    assert plain(list(file_system().tree("/a", ignore=["b"]))) == [
+        "/a", "└── x.txt", "", "0 directories, 1 file"]
+
+
+def test_file() -> None:
+    assert list(file_system().tree("/a/x.txt")) == ["x.txt", "", "0 directories, 1 file"]
+
+
+def test_deep_hierarchy() -> None:
+    root = utils.file_system.Directory("", None, [], [])
+    directory: utils.file_system.Directory = root
+    for _ in range(2000):
+        child = utils.file_system.Directory("d", None, [], [])
+        directory.add_child(child)
+        directory = child
+    lines: list[str] = list(utils.file_system.FileSystem(root).tree("/"))
+    assert lines[-1] == "2000 directories, 0 files"
+    assert lines[-3].endswith("└── [#0000FF]d[/]")
+    assert lines[-3].startswith("    " * 1999)
+
+
+def test_tree_is_lazy() -> None:
+    root = utils.file_system.Directory.root(1, "server")
+    lines = utils.file_system.FileSystem(root).tree("/")
+    assert next(lines) == "[#0000FF]/[/]"
+    # only the first entries are loaded while the first line is drawn
+    next(lines)
+    assert not root.child("var").loaded
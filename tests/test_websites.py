@@ -0,0 +1,150 @@
+"""Tests of the website registry manifest and the website switcher."""
+
+import asyncio
+import json
+import os
+import pathlib
+
+import pytest
+import textual.app
+
+import widgets.website
+
+WEBSITE: str = '''
+import widgets.website
+
+raise RuntimeError("websites are not imported to be registered")
+
+
+class {name}(widgets.website.Website):
+
+    def __init__(self) -> None:
+        super().__init__("{id_}", "{title}", keywords=["shop", "{id_}"], tld="com")
+'''
+"""Source of a website module that fails if it is imported."""
+
+
+def write_website(directory: pathlib.Path, id_: str, title: str) -> pathlib.Path:
+    """Write a website module to a directory."""
+    path: pathlib.Path = directory / f"{id_}.py"
+    path.write_text(WEBSITE.format(name=f"{title}Website", id_=id_, title=title),
+                    encoding="utf-8")
+    return path
+
+
+@pytest.fixture(name="manifest")
+def fixture_manifest(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Write two websites and get the path of their manifest."""
+    write_website(tmp_path, "shop", "Shop")
+    write_website(tmp_path, "bank", "Bank")
+    (tmp_path / "helpers.py").write_text("VALUE = 1\n", encoding="utf-8")
+    return tmp_path / "manifest.json"
+
+
+def test_websites_are_found_without_importing(manifest: pathlib.Path) -> None:
+    entries = widgets.website.WebsiteRegistry(manifest).entries
+    assert sorted(entries) == ["bank", "shop"]
+    shop: widgets.website.WebsiteEntry = entries["shop"]
+    assert (shop.title, shop.keywords, shop.domain) == ("Shop", ["shop", "shop"], "shop.com")
+    assert (shop.module, shop.class_name) == ("shop", "ShopWebsite")
+    # defaults of Website.__init__ fill what isn't passed
+    assert shop.description == "This website does not provide a description."
+    assert json.loads(manifest.read_text(encoding="utf-8"))["version"] \
+        == widgets.website.MANIFEST_VERSION
+
+
+def test_unchanged_files_are_not_scanned(manifest: pathlib.Path,
+                                         monkeypatch: pytest.MonkeyPatch) -> None:
+    widgets.website.WebsiteRegistry(manifest).entries  # pylint:disable=expression-not-assigned
+    written: int = manifest.stat().st_mtime_ns
+
+    def unexpected(file: pathlib.Path) -> list:
+        """Fail if a file is scanned."""
+        raise AssertionError(file)
+
+    monkeypatch.setattr(widgets.website, "_scan", unexpected)
+    assert sorted(widgets.website.WebsiteRegistry(manifest).entries) == ["bank", "shop"]
+    # nothing changed, so the manifest isn't written again
+    assert manifest.stat().st_mtime_ns == written
+
+
+def test_changed_files_are_scanned_again(manifest: pathlib.Path) -> None:
+    widgets.website.WebsiteRegistry(manifest).entries  # pylint:disable=expression-not-assigned
+    shop: pathlib.Path = write_website(manifest.parent, "shop", "Shopping")
+    stat: os.stat_result = shop.stat()
+    os.utime(shop, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    (manifest.parent / "bank.py").unlink()
+    entries = widgets.website.WebsiteRegistry(manifest).entries
+    assert sorted(entries) == ["shop"]
+    assert entries["shop"].title == "Shopping"
+    assert sorted(json.loads(manifest.read_text(encoding="utf-8"))["files"]) \
+        == ["helpers.py", "shop.py"]
+
+
+@pytest.mark.parametrize("content", ["not json", '{"version": 0, "files": {}}',
+                                     '{"version": 1, "files": {"shop.py": {"websites": 1}}}'])
+def test_invalid_manifest_is_rebuilt(manifest: pathlib.Path, content: str) -> None:
+    manifest.write_text(content, encoding="utf-8")
+    assert sorted(widgets.website.WebsiteRegistry(manifest).entries) == ["bank", "shop"]
+
+
+def test_broken_module_is_skipped(manifest: pathlib.Path) -> None:
+    (manifest.parent / "broken.py").write_text("class (", encoding="utf-8")
+    assert sorted(widgets.website.WebsiteRegistry(manifest).entries) == ["bank", "shop"]
+
+
+class Browser(textual.app.App):
+    """App with only the display of the desktop."""
+
+    def __init__(self, limit: int) -> None:
+        """Initialize the app.
+
+        Arguments:
+            - limit: the maximum number of mounted websites.
+        """
+        super().__init__()
+        self.limit: int = limit
+
+    def compose(self) -> textual.app.ComposeResult:
+        """Compose the ui."""
+        with widgets.website.WebsiteSwitcher(initial="search", id="display_inner",
+                                             limit=self.limit):
+            yield widgets.website.REGISTRY.create("search")
+
+
+def browse(limit: int, websites: list[str]) -> tuple[list[str], list[str]]:
+    """Show websites one after another in a browser.
+
+    Returns:
+        The tracked websites and the ids of the websites that are actually mounted.
+    """
+    async def run() -> tuple[list[str], list[str]]:
+        """Run the app headless."""
+        app = Browser(limit)
+        async with app.run_test() as pilot:
+            switcher = app.query_one("#display_inner", widgets.website.WebsiteSwitcher)
+            for website in websites:
+                switcher.switch(website)
+                await pilot.pause()
+            assert switcher.current == websites[-1]
+            return switcher.mounted, [child.id for child in switcher.children
+                                      if isinstance(child, widgets.website.Website)]
+
+    return asyncio.run(run())
+
+
+def test_websites_are_mounted_on_navigation() -> None:
+    mounted, children = browse(4, ["example", "slot_machine", "example"])
+    assert mounted == ["search", "slot_machine", "example"]
+    assert sorted(children) == sorted(mounted)
+
+
+def test_least_recently_shown_websites_are_unmounted() -> None:
+    mounted, children = browse(2, ["example", "search", "slot_machine"])
+    assert mounted == ["search", "slot_machine"]
+    assert sorted(children) == sorted(mounted)
+
+
+def test_current_website_stays_mounted() -> None:
+    mounted, children = browse(0, ["example"])
+    assert mounted == children == ["example"]
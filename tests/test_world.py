@@ -0,0 +1,90 @@
+"""Tests of the streaming world file reader and lazily loaded networks."""
+
+import json
+import pathlib
+
+import pytest
+
+import utils.device
+import utils.file_system
+import utils.network
+import utils.world
+
+HOME: str = "00.00.00.00.00.00.00.01"
+SERVER: str = "00.00.00.00.00.00.00.02"
+NESTED: str = "00.00.00.00.00.00.00.03"
+
+
+def world() -> dict:
+    """Get a small world with records the span scan has to fall back on."""
+    return {
+        "home": HOME,
+        "dns": {"srv.zer0": SERVER, "home.zer0": {"address": HOME, "ttl": 60}},
+        "devices": {
+            HOME: {"name": "home", "type": "terminal"},
+            SERVER: {"name": "sérver \"}{\" \\", "type": "server", "ports": [22, 80]},
+            NESTED: {"name": "nested", "file_system": utils.file_system.FileSystem(
+                utils.file_system.Directory.root(3)).to_record()},
+        },
+        "edges": [[HOME, SERVER], [SERVER, NESTED, 7]],
+    }
+
+
+@pytest.fixture(name="path")
+def fixture_path(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Write the world file (with non-ASCII text as UTF-8)."""
+    path: pathlib.Path = tmp_path / "world.json"
+    path.write_text(json.dumps(world(), ensure_ascii=False, indent=1), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, utils.world.CHUNK_SIZE])
+def test_reader_spans(path: pathlib.Path, chunk_size: int) -> None:
+    expected: dict = world()
+    with utils.world.WorldReader(path, chunk_size) as reader:
+        sections: dict = {}
+        for section in reader.sections():
+            if section == "devices":
+                sections[section] = {
+                    key: utils.world.read_record(path, offset, length)
+                    for keys, offsets, lengths in reader.records()
+                    for key, offset, length in zip(keys, offsets, lengths)}
+            else:
+                sections[section] = reader.value()
+    assert sections == expected
+
+
+def test_load_network(path: pathlib.Path) -> None:
+    network = utils.network.Network.load(path)
+    assert not network._nodes  # pylint:disable=protected-access
+    assert network.ports(utils.device.NPv5Address(SERVER)) == (22, 80)
+    assert not network._nodes  # pylint:disable=protected-access
+    assert network.dns.get("home.zer0").ttl == 60
+    assert network.weight(utils.device.NPv5Address(SERVER), utils.device.NPv5Address(NESTED)) == 7
+    assert network.computer.name == "home"
+    assert network.connect("srv.zer0")
+    assert network.computer.name == "sérver \"}{\" \\"
+    assert network.devices([utils.device.NPv5Address(NESTED)])[0].file_system.root.seed == 3
+    assert network.route(NESTED, HOME) == [utils.device.NPv5Address(HOME),
+                                           utils.device.NPv5Address(SERVER),
+                                           utils.device.NPv5Address(NESTED)]
+
+
+def test_default_network() -> None:
+    network = utils.network.Network()
+    assert network.computer.name == "oracle"
+    network.disconnect()
+    assert network.computer.name == "oracle"
+
+
+def test_world_path_is_absolute() -> None:
+    assert utils.network.WORLD_PATH.is_absolute()
+    assert utils.network.WORLD_PATH.exists()
+
+
+def test_leaving_does_not_construct(path: pathlib.Path) -> None:
+    network = utils.network.Network.load(path, capacity=1)
+    assert network.connect(SERVER)
+    network._nodes.clear()  # pylint:disable=protected-access
+    network.disconnect()
+    assert not network._nodes  # pylint:disable=protected-access
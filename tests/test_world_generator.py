@@ -0,0 +1,54 @@
+"""Tests of the seeded world generator."""
+
+import json
+import pathlib
+
+import pytest
+
+import utils.device
+import utils.network
+import utils.regions
+import utils.world_generator
+
+
+def generated(tmp_path: pathlib.Path, devices: int, seed: int, workers: int = 1) -> dict:
+    """Generate a world and parse it."""
+    path: pathlib.Path = tmp_path / f"world-{devices}-{seed}-{workers}.json"
+    utils.world_generator.generate(path, devices, seed, workers)
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def test_same_seed_same_world(tmp_path: pathlib.Path) -> None:
+    world: dict = generated(tmp_path, 1000, 3)
+    assert generated(tmp_path, 1000, 3) == world
+    assert generated(tmp_path, 1000, 3, workers=2) == world
+    assert generated(tmp_path, 1000, 4) != world
+
+
+def test_world_is_consistent(tmp_path: pathlib.Path) -> None:
+    world: dict = generated(tmp_path, 1000, 1)
+    devices: dict = world["devices"]
+    # the home device is added
+    assert len(devices) == 1001
+    assert devices[world["home"]]["name"] == "oracle"
+    for first, second, *_ in world["edges"]:
+        assert first in devices and second in devices
+    for name, record in world["dns"].items():
+        net_address: str = record["address"] if isinstance(record, dict) else record
+        assert devices[net_address]["type"] == "server", name
+    # every subnet is a region of its own with its gateway as host 1
+    regions: set[int] = {utils.regions.region_of(utils.device.NPv5Address(net_address))
+                         for net_address in devices}
+    assert len(regions) == 1000 // utils.world_generator.SUBNET_SIZE
+
+
+def test_generated_network_is_connected() -> None:
+    network = utils.world_generator.network(600, seed=2, workers=1)
+    assert network.computer.name == "oracle"
+    reachable: list[int] = network.components.component(network.computer.net_address)
+    assert len(reachable) == 601
+
+
+def test_no_devices() -> None:
+    with pytest.raises(ValueError):
+        utils.world_generator.generate("unused.json", 0)
@@ -0,0 +1,187 @@
+"""Sorted index of NPv5 addresses for range and prefix queries."""
+
+import array
+import bisect
+import typing
+
+import utils.device
+
+ADDRESS_BITS: int = 8 * utils.device.NPv5Address.NUM_BYTES
+"""Bits of an NPv5 address."""
+HEX_DIGITS: str = "0123456789abcdefABCDEF"
+"""Characters of a hex number."""
+
+
+def address_range(spec: str) -> range:
+    """Parse an address range specification.
+
+    A specification is an address, a wildcard pattern with trailing * bytes (0A.0B.*.*.*.*.*.*
+    or short 0A.0B.*), an address range (first-last) or a CIDR block (address/prefix length in
+    bits, e.g. /48 for the last 2 bytes).
+
+    Arguments:
+        - spec: the specification.
+
+    Returns:
+        The range of addresses (ValueError if the specification is invalid).
+    """
+    invalid: str = f"Invalid address range '{spec}'"
+    try:
+        if "/" in spec:
+            address, _, length = spec.partition("/")
+            if not length.isdigit() or int(length) > ADDRESS_BITS:
+                raise ValueError(f"{invalid}, the prefix length must be 0 to {ADDRESS_BITS}.")
+            host_bits: int = ADDRESS_BITS - int(length)
+            start: int = utils.device.NPv5Address(address) >> host_bits << host_bits
+            return range(start, start + (1 << host_bits))
+        if "-" in spec:
+            first, _, last = spec.partition("-")
+            start = utils.device.NPv5Address(first)
+            if start > utils.device.NPv5Address(last):
+                raise ValueError(f"{invalid}, the first address is larger.")
+            return range(start, utils.device.NPv5Address(last) + 1)
+        if "*" in spec:
+            parts: list[str] = spec.split(".")
+            fixed: list[str] = parts[:len(parts) - parts.count("*")]
+            # only trailing * bytes after bytes of 1 or 2 hex digits
+            if len(parts) > utils.device.NPv5Address.NUM_BYTES or "*" in fixed \
+                    or any(not 1 <= len(part) <= 2 or part.strip(HEX_DIGITS) for part in fixed):
+                raise ValueError(f"{invalid}.")
+            host_bits = ADDRESS_BITS - 8 * len(fixed)
+            start = 0
+            for part in fixed:
+                start = start << 8 | int(part, 16)
+            start <<= host_bits
+            return range(start, start + (1 << host_bits))
+        address = utils.device.NPv5Address(spec)
+        return range(address, address + 1)
+    except TypeError as excp:
+        raise ValueError(f"{invalid}.") from excp
+
+
+def text_prefix_range(prefix: str) -> range | None:
+    """Get the range of addresses whose canonical form starts with a text (for completion).
+
+    Arguments:
+        - prefix: the beginning of an address with 2 hex digits per byte (e.g. 00.00.3).
+
+    Returns:
+        The range or None if the text can't start an address.
+    """
+    digits: str = prefix.replace(".", "")
+    canonical: str = ".".join(digits[i:i + 2] for i in range(0, len(digits), 2))
+    if prefix not in (canonical, f"{canonical}.") or digits.strip(HEX_DIGITS) \
+            or len(digits) > ADDRESS_BITS // 4:
+        return None
+    free_bits: int = ADDRESS_BITS - 4 * len(digits)
+    start: int = int(digits or "0", 16) << free_bits
+    return range(start, start + (1 << free_bits))
+
+
+class AddressIndex:
+    """Sorted index of addresses (array of ints).
+
+    Addresses added in bulk are sorted once on the next query, single addresses are inserted
+    in place. Queries are binary searches, so a range query takes O(log n + k).
+    """
+
+    def __init__(self) -> None:
+        """Initialize the index."""
+        self._addresses: array.array = array.array("Q")
+        self._sorted: bool = True
+
+    def _sort(self) -> None:
+        """Sort the addresses after bulk additions."""
+        if not self._sorted:
+            self._addresses = array.array("Q", sorted(set(self._addresses)))
+            self._sorted = True
+
+    def __len__(self) -> int:
+        """Number of addresses."""
+        self._sort()
+        return len(self._addresses)
+
+    def __contains__(self, net_address: int) -> bool:
+        """Check if an address is in the index."""
+        self._sort()
+        index: int = bisect.bisect_left(self._addresses, net_address)
+        return index < len(self._addresses) and self._addresses[index] == net_address
+
+    def __iter__(self) -> typing.Iterator[int]:
+        """Iterate over all addresses in order."""
+        self._sort()
+        return iter(self._addresses)
+
+    def add(self, net_address: int) -> None:
+        """Add an address.
+
+        Arguments:
+            - net_address: the address.
+        """
+        if not self._sorted:
+            self._addresses.append(net_address)
+        elif net_address not in self:
+            bisect.insort(self._addresses, net_address)
+
+    def add_many(self, net_addresses: typing.Iterable[int]) -> None:
+        """Add many addresses (sorted on the next query).
+
+        Arguments:
+            - net_addresses: the addresses.
+        """
+        self._addresses.extend(net_addresses)
+        self._sorted = False
+
+    def remove(self, net_address: int) -> None:
+        """Remove an address if it exists.
+
+        Arguments:
+            - net_address: the address.
+        """
+        self._sort()
+        index: int = bisect.bisect_left(self._addresses, net_address)
+        if index < len(self._addresses) and self._addresses[index] == net_address:
+            del self._addresses[index]
+
+    def count(self, addresses: range) -> int:
+        """Count the addresses in a range.
+
+        Arguments:
+            - addresses: the range.
+
+        Returns:
+            The number of addresses.
+        """
+        self._sort()
+        return bisect.bisect_left(self._addresses, addresses.stop) \
+            - bisect.bisect_left(self._addresses, addresses.start)
+
+    def query(self, addresses: range) -> array.array:
+        """Get the addresses in a range in order.
+
+        Arguments:
+            - addresses: the range (e.g. from address_range or text_prefix_range).
+
+        Returns:
+            The int values of the addresses (not interned like NPv5Address).
+        """
+        self._sort()
+        start: int = bisect.bisect_left(self._addresses, addresses.start)
+        stop: int = bisect.bisect_left(self._addresses, addresses.stop)
+        return self._addresses[start:stop]
+
+    def bounds(self, addresses: range) -> tuple[int, int] | None:
+        """Get the first and last address in a range.
+
+        Arguments:
+            - addresses: the range.
+
+        Returns:
+            The int values of the first and last address or None if there is none.
+        """
+        self._sort()
+        start: int = bisect.bisect_left(self._addresses, addresses.start)
+        stop: int = bisect.bisect_left(self._addresses, addresses.stop)
+        if start == stop:
+            return None
+        return self._addresses[start], self._addresses[stop - 1]
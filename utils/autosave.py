@@ -0,0 +1,170 @@
+"""Autosave of the game state in a worker thread."""
+
+import atexit
+import threading
+import typing
+
+import utils.save
+
+AUTOSAVE_INTERVAL: float = 60
+"""Seconds between autosaves while logged in."""
+
+
+class Autosave:
+    """Saves the state of the logged in player without blocking the UI.
+
+    A request only copies the state of the session's save, which is cheap. A worker thread
+    writes it (see utils.save.Save.save, all writes are atomic and synced). Requests that
+    arrive while a write is running are coalesced: only the newest state is written next.
+
+    Each session has its own copy of the save with the journal bookkeeping, only written by the
+    worker, the session's save is never written directly. States are queued with the copy of
+    their session, so switching players never waits for a write. A failed write is kept in
+    error and the worker goes on.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the autosave (the worker is started on the first request)."""
+        self.save: utils.save.Save | None = None
+        """Save of the current session, changed by the game."""
+        self._persisted: utils.save.Save | None = None
+        """Copy of the session's save as it was last written (only written by the worker)."""
+        self._pending: list[tuple[utils.save.Save, dict[str, typing.Any]]] = []
+        """States to write with the copy of their session's save, in order."""
+        self._writing: utils.save.Save | None = None
+        """Copy of the save being written."""
+        self._closed: bool = False
+        self._condition: threading.Condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self.requests: int = 0
+        """Number of requests."""
+        self.writes: int = 0
+        """Number of writes (less than requests if requests were coalesced)."""
+        self.error: Exception | None = None
+        """Error of the last failed write (the state is written again on the next request)."""
+        self.failures: int = 0
+        """Number of failed writes."""
+
+    def start(self, save: utils.save.Save) -> None:
+        """Start a session with a save.
+
+        Arguments:
+            - save: the loaded save of the player.
+        """
+        if self._persisted is None or self._persisted.username != save.username:
+            # pending states of another player stay queued with their own copy
+            self._persisted = save.model_copy(deep=True)
+        self.save = save
+
+    def load(self, username: str) -> utils.save.Save | None:
+        """Load the newest save of a user, the session's save if it might not be written yet.
+
+        Arguments:
+            - username: the username.
+
+        Returns:
+            The save or None if the user has none.
+        """
+        if self.save is not None and self.save.username == username:
+            return self.save
+        with self._condition:
+            queued: bool = self._queued(username)
+        if queued:
+            # a state of an earlier session of the user is not written yet
+            self.flush()
+        return utils.save.load_save(username)
+
+    def _queued(self, username: str) -> bool:
+        """Check if a state of a user is waiting or being written (call with the lock held)."""
+        saves: list[utils.save.Save] = [persisted for persisted, _ in self._pending]
+        if self._writing is not None:
+            saves.append(self._writing)
+        return any(save.username == username for save in saves)
+
+    def request(self) -> None:
+        """Request a save of the session's state (returns immediately)."""
+        if self.save is None:
+            return
+        state: dict[str, typing.Any] = self.save.model_dump(exclude={"filename"})
+        persisted: utils.save.Save = typing.cast(utils.save.Save, self._persisted)
+        with self._condition:
+            if self._closed:
+                return
+            if self._pending and self._pending[-1][0] is persisted:
+                self._pending[-1] = (persisted, state)
+            else:
+                self._pending.append((persisted, state))
+            self.requests += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self) -> None:
+        """Write pending states until closed."""
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(lambda: bool(self._pending) or self._closed)
+                    if not self._pending:
+                        return
+                    persisted, state = self._pending.pop(0)
+                    self._writing = persisted
+                try:
+                    self._write(persisted, state)
+                except Exception as excp:  # pylint:disable=broad-exception-caught
+                    # a failed write must not stop later ones
+                    self.error = excp
+                    self.failures += 1
+                finally:
+                    with self._condition:
+                        self._writing = None
+                        self._condition.notify_all()
+        finally:
+            with self._condition:
+                # started again by the next request, waiters must not wait for it
+                self._thread = None
+                self._condition.notify_all()
+
+    def _alive(self) -> bool:
+        """Check if the worker is running (call with the condition held)."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _write(self, persisted: utils.save.Save, state: dict[str, typing.Any]) -> None:
+        """Write a state with the copy of its session's save."""
+        for key, value in state.items():
+            setattr(persisted, key, value)
+        persisted.save()
+        self.writes += 1
+        self.error = None
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until all requested states are written.
+
+        Arguments:
+            - timeout: the maximum time to wait in seconds (no limit if None).
+
+        Returns:
+            True if everything is written, False on timeout.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: (not self._pending and self._writing is None) or not self._alive(),
+                timeout)
+            return not self._pending and self._writing is None
+
+    def close(self) -> None:
+        """Write the pending state and stop the worker (at exit)."""
+        self.flush()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread: threading.Thread | None = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join()
+
+
+AUTOSAVE = Autosave()
+"""Autosave of the game."""
+# daemon threads are still running when exit handlers are called
+atexit.register(AUTOSAVE.close)
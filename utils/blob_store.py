@@ -0,0 +1,119 @@
+"""Content-addressed storage for file contents."""
+
+import dataclasses
+import hashlib
+
+
+@dataclasses.dataclass
+class BlobStats:
+    """Statistics of a blob store."""
+    blobs: int
+    """Number of distinct blobs."""
+    references: int
+    """Number of references to blobs."""
+    stored_size: int
+    """Size of all distinct blobs (characters)."""
+    logical_size: int
+    """Size of all referenced content as if it was not deduplicated (characters)."""
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Logical size divided by stored size (1.0 means no deduplication)."""
+        return self.logical_size / self.stored_size if self.stored_size else 1.0
+
+
+@dataclasses.dataclass(slots=True)
+class _Blob:
+    """Stored blob."""
+    key: bytes
+    content: str
+    refs: int
+
+
+class BlobStore:
+    """Content-addressed, reference counted blob store. Identical content is stored once."""
+
+    def __init__(self) -> None:
+        """Initialize the blob store."""
+        self._blobs: dict[bytes, _Blob] = {}
+        self._references: int = 0
+        self._stored_size: int = 0
+        self._logical_size: int = 0
+
+    def __contains__(self, key: bytes) -> bool:
+        """Check if a blob exists."""
+        return key in self._blobs
+
+    def __len__(self) -> int:
+        """Number of distinct blobs."""
+        return len(self._blobs)
+
+    @staticmethod
+    def key(content: str) -> bytes:
+        """Get the key (hash) for some content.
+
+        Arguments:
+            - content: the content to hash.
+
+        Returns:
+            The key.
+        """
+        return hashlib.blake2b(content.encode(), digest_size=16).digest()
+
+    def put(self, content: str) -> bytes:
+        """Store content and add a reference to it.
+
+        Arguments:
+            - content: the content to store.
+
+        Returns:
+            The key of the content (the same object for identical content).
+        """
+        key: bytes = self.key(content)
+        blob: _Blob | None = self._blobs.get(key)
+        if blob is not None:
+            blob.refs += 1
+        else:
+            blob = self._blobs[key] = _Blob(key, content, 1)
+            self._stored_size += len(content)
+        self._references += 1
+        self._logical_size += len(content)
+        return blob.key
+
+    def get(self, key: bytes) -> str:
+        """Get content by key.
+
+        Arguments:
+            - key: the key of the content.
+
+        Returns:
+            The content.
+        """
+        return self._blobs[key].content
+
+    def release(self, key: bytes) -> None:
+        """Remove a reference to content. The content is deleted with its last reference.
+
+        Arguments:
+            - key: the key of the content.
+        """
+        blob: _Blob = self._blobs[key]
+        self._references -= 1
+        self._logical_size -= len(blob.content)
+        blob.refs -= 1
+        if blob.refs == 0:
+            del self._blobs[key]
+            self._stored_size -= len(blob.content)
+
+    def stats(self) -> BlobStats:
+        """Get statistics of the blob store.
+
+        Returns:
+            The statistics.
+        """
+        return BlobStats(len(self._blobs), self._references,
+                         self._stored_size, self._logical_size)
+
+
+BLOBS = BlobStore()
+"""Blob store shared by all file systems in the network."""
@@ -1,13 +1,22 @@
 """Command functionality."""
 # we're just going to use click
 
+import asyncio
 import importlib
 import inspect
+import itertools
+import os
 import pathlib
+import re
 import sys
+import typing
 
 import click
+import rich.markup
 
+import utils.address_index
+import utils.device
+import utils.globbing
 import utils.network
 import utils.values
 import widgets.terminal
@@ -31,9 +40,35 @@ def get_commands() -> dict[str, click.Command]:
     return results
 
 
+TOKEN: re.Pattern = re.compile(r"\"([^\"]*)\"|'([^']*)'|(\S+)")
+"""Token of cli input: double quoted, single quoted or unquoted."""
+
+
+def tokenize(text: str) -> list[str]:
+    """Split cli input into tokens and expand globs in unquoted arguments.
+
+    Arguments:
+        - text: the input.
+
+    Returns:
+        The tokens. Globs without matches are kept as they are.
+    """
+    tokens: list[str] = []
+    for match in TOKEN.finditer(text):
+        double, single, unquoted = match.groups()
+        if unquoted is None:
+            tokens.append(double if double is not None else single)
+        elif tokens and utils.globbing.has_magic(unquoted):
+            tokens.extend(utils.globbing.expand(unquoted, utils.network.NETWORK.file_system)
+                          or [unquoted])
+        else:
+            tokens.append(unquoted)
+    return tokens
+
+
 async def parse(text: str) -> None:
     """Parse cli input."""
-    chunks: list[str] = text.strip().split()
+    chunks: list[str] = tokenize(text)
     cmd_name: str = chunks[0]
     args: list[str] = chunks[1:]
     if COMMANDS.get(cmd_name) is not None:
@@ -42,6 +77,8 @@ async def parse(text: str) -> None:
                                          help_option_names=[])
             if inspect.isawaitable(cmd_ret):
                 await cmd_ret
+        except asyncio.CancelledError:
+            print("^C")
         except Exception as excp:  # pylint:disable=broad-exception-caught
             print(f"Error: {excp}")
         finally:
@@ -51,6 +88,42 @@ async def parse(text: str) -> None:
         print(utils.network.NETWORK.computer.prompt)
 
 
+ADDRESS_COMMANDS: frozenset[str] = frozenset(
+    ("connect", "nmap", "route", "traceroute", "dig", "nslookup"))
+"""Commands that take addresses, their last argument is completed as one."""
+
+
+def complete(text: str) -> str:
+    """Complete cli input: the command name or an address of a device as last argument.
+
+    Addresses are only completed for commands in ADDRESS_COMMANDS and once the argument has a
+    hex digit, so paths like . aren't taken for the start of an address.
+
+    Arguments:
+        - text: the input.
+
+    Returns:
+        The completed input (as far as it is unambiguous).
+    """
+    if " " not in text:
+        for cmd_name in sorted(COMMANDS):
+            if cmd_name.startswith(text):
+                return cmd_name
+        return text
+    head, _, last = text.rpartition(" ")
+    if text.split(" ", 1)[0] not in ADDRESS_COMMANDS or not last.replace(".", ""):
+        return text
+    addresses: range | None = utils.address_index.text_prefix_range(last)
+    if addresses is None:
+        return text
+    bounds: tuple[int, int] | None = utils.network.NETWORK.addresses.bounds(addresses)
+    if bounds is None:
+        return text
+    # the index is sorted, so all matches share the prefix of the first and last one
+    first, last = utils.device.NPv5Address.format_many(bounds)
+    return f"{head} {os.path.commonprefix([first, last])}"
+
+
 def clear() -> None:
     """Clear the terminal."""
     widgets.terminal.Terminal.TERMINAL.clear()
@@ -66,4 +139,33 @@ def print(text: str) -> None:  # pylint:disable=redefined-builtin
     widgets.terminal.Terminal.TERMINAL.write_lines(text)
 
 
+def height() -> int:
+    """Get the height of the terminal in lines."""
+    return widgets.terminal.Terminal.TERMINAL.size.height
+
+
+async def stream(lines: typing.Iterable[str], batch: int = 64, separator: str = "\n") -> int:
+    """Write lines to console in batches, letting the terminal render in between.
+
+    Arguments:
+        - lines: the lines (consumed lazily).
+        - batch: the number of lines per batch.
+        - separator: the separator of lines within a batch.
+
+    Returns:
+        The number of lines written.
+    """
+    count: int = 0
+    for chunk in itertools.batched(lines, batch):
+        print(separator.join(chunk))
+        count += len(chunk)
+        await asyncio.sleep(0)
+    return count
+
+
+def escape(text: str) -> str:
+    """Escape text (e.g. file content) so it is printed as is (markup and variables)."""
+    return rich.markup.escape(text).replace("{", "{{").replace("}", "}}")
+
+
 COMMANDS = get_commands()
@@ -0,0 +1,108 @@
+"""Connected components of networks."""
+
+import utils.graph
+
+
+class Components:
+    """Connected components of a graph as union-find, maintained incrementally.
+
+    Added edges are merged directly (union by size with path compression). Removed edges can
+    split a component, so the index is rebuilt from the graph on the next query instead.
+    Nodes without edges are their own component and not stored.
+    """
+
+    def __init__(self, graph: utils.graph.Graph) -> None:
+        """Initialize the index (built on the first query).
+
+        Arguments:
+            - graph: the graph.
+        """
+        self._graph: utils.graph.Graph = graph
+        self._parent: dict[int, int] = {}
+        self._members: dict[int, list[int]] = {}
+        """Nodes of each component by root."""
+        self._stale: bool = True
+
+    def _rebuild(self) -> None:
+        """Build the index from the edges of the graph."""
+        self._parent = {}
+        self._members = {}
+        for first_node, second_node in self._graph.edges():
+            self._union(first_node, second_node)
+        self._stale = False
+
+    def _ensure(self) -> None:
+        """Rebuild the index if it is stale."""
+        if self._stale:
+            self._rebuild()
+
+    def _find(self, node: int) -> int:
+        """Get the root of the component of a node (compressing the path)."""
+        parent: dict[int, int] = self._parent
+        root: int = node
+        while (next_root := parent.get(root, root)) != root:
+            root = next_root
+        while node != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    def _union(self, first_node: int, second_node: int) -> None:
+        """Merge the components of two nodes (the smaller one into the larger one)."""
+        first_root: int = self._find(first_node)
+        second_root: int = self._find(second_node)
+        if first_root == second_root:
+            return
+        first_members: list[int] = self._members.get(first_root) or [first_root]
+        second_members: list[int] = self._members.get(second_root) or [second_root]
+        if len(first_members) < len(second_members):
+            first_root, second_root = second_root, first_root
+            first_members, second_members = second_members, first_members
+        self._parent.setdefault(first_root, first_root)
+        self._parent[second_root] = first_root
+        first_members.extend(second_members)
+        self._members[first_root] = first_members
+        self._members.pop(second_root, None)
+
+    def added(self, first_node: int, second_node: int) -> None:
+        """Update the index for an added edge.
+
+        Arguments:
+            - first_node: the first node of the edge.
+            - second_node: the second node of the edge.
+        """
+        if not self._stale:
+            self._union(first_node, second_node)
+
+    def removed(self) -> None:
+        """Mark the index as stale after an edge was removed."""
+        self._stale = True
+
+    def connected(self, first_node: int, second_node: int) -> bool:
+        """Check if two nodes are in the same component.
+
+        Arguments:
+            - first_node: the first node.
+            - second_node: the second node.
+
+        Returns:
+            True if they are, False otherwise.
+        """
+        self._ensure()
+        return first_node == second_node or self._find(first_node) == self._find(second_node)
+
+    def component(self, node: int) -> list[int]:
+        """Get all nodes in the component of a node.
+
+        Arguments:
+            - node: the node.
+
+        Returns:
+            The nodes (including node, unordered).
+        """
+        self._ensure()
+        return list(self._members.get(self._find(node), [node]))
+
+    def __len__(self) -> int:
+        """Number of components with more than one node."""
+        self._ensure()
+        return len(self._members)
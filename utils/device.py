@@ -1,13 +1,15 @@
 """Everything used for devices."""
 
+import contextlib
 import enum
+import gc
 import re
+import struct
 import typing
 
 import pydantic
 
 import utils.file_system
-import utils.network
 
 
 class DeviceType(enum.StrEnum):
@@ -38,6 +40,38 @@ class DeviceName(enum.StrEnum):
     POWERTERM = "PowerTerm"
 
 
+class Port(enum.IntEnum):
+    """Registered ports, the lowercase name is the service."""
+    FTP = 20
+    SSH = 22
+    TELNET = 23
+    SMTP = 25
+    TIME = 37
+    DNS = 53
+    HTTP = 80
+    POP3 = 110
+    IRC = 194
+    IMAP = 220
+    HTTPS = 443
+    DOOM = 666
+
+
+MAX_PORT: int = 65535
+"""Largest port number."""
+
+DEFAULT_PORTS: dict[DeviceType, tuple[Port, ...]] = {
+    DeviceType.TERMINAL: (Port.SSH,),
+    DeviceType.CYBERDECK: (),
+    DeviceType.SERVER: (Port.SSH, Port.DNS, Port.HTTP, Port.HTTPS),
+    DeviceType.IMPLANT: (),
+    DeviceType.VEHICLE: (Port.TELNET,),
+}
+"""Open ports of devices without ports in their record."""
+
+DEFAULT_PROMPT: str = "[green]{user}@{name}:{path} $[/] "
+"""Terminal prompt of devices without a prompt in their record."""
+
+
 SYSINFO_TEXT = """
 OS:         {os}
 Kernel:     {kernel}
@@ -48,41 +82,178 @@ Memory:     {memory}
 """
 
 
-class NPv5Address:
-    """Net Protocol v5 address. It is represented as 8 bytes seperated by dots."""
-    NUM_BYTES: int = 8
+NUMERIC_FORMATS: str = "bcdeEfFgGnoxX%"
+"""Presentation types of int format specs (other specs format addresses as strings)."""
+
+
+class NPv5Address(int):
+    """Net Protocol v5 address. It is represented as 8 bytes seperated by dots.
 
-    def __init__(self, address: "str | int | NPv5Address") -> None:
-        """Initialize the address."""
-        self.address: int = self._parse(address)
+    Addresses are immutable ints without a __dict__ and interned, so every address exists
+    once however often it is parsed. They compare and hash like their int value.
+    """
+    __slots__ = ()
+    NUM_BYTES: typing.ClassVar[int] = 8
+    PATTERN: typing.ClassVar[re.Pattern] = re.compile(r"[0-9a-fA-F]{1,2}(?:\.[0-9a-fA-F]{1,2}){7}")
+    """Address with 1 or 2 hex digits per byte."""
+    _interned: typing.ClassVar[dict[int, "NPv5Address"]] = {}
+
+    def __new__(cls, address: "str | int | NPv5Address") -> "NPv5Address":
+        """Get the (interned) address for a str, int or address."""
+        if type(address) is cls:
+            return address
+        return cls._intern(cls._parse(address))
+
+    @classmethod
+    def _intern(cls, value: int) -> "NPv5Address":
+        """Get the interned address of a valid int."""
+        address: NPv5Address | None = cls._interned.get(value)
+        if address is None:
+            address = cls._interned[value] = int.__new__(cls, value)
+        return address
+
+    @classmethod
+    def _parse(cls, address: "str | int | NPv5Address") -> int:
+        """Parse address to int from str, int, or address."""
+        if isinstance(address, str):
+            if cls.PATTERN.fullmatch(address):
+                if len(address) == 3 * cls.NUM_BYTES - 1:
+                    return int(address.replace(".", ""), 16)
+                value: int = 0
+                for part in address.split("."):
+                    value = value << 8 | int(part, 16)
+                return value
+        elif isinstance(address, int):
+            if 0 <= address <= 2**(cls.NUM_BYTES * 8) - 1:
+                return int(address)
+        raise TypeError("Type not accepted.")
+
+    @property
+    def address(self) -> int:
+        """The address as plain int."""
+        return int(self)
 
     def __repr__(self) -> str:
         """Official string representation."""
-        return f"{self.__class__.__name__}({self.address})"
+        return f"{self.__class__.__name__}({int(self)})"
 
     def __str__(self) -> str:
         """Informal string representation."""
-        return ".".join(map("{:02X}".format, list(self.address.to_bytes(self.NUM_BYTES))))
+        return self.to_bytes(self.NUM_BYTES).hex(".").upper()
 
-    def __hash__(self) -> int:
-        """Hash of the address."""
-        return hash(hex(self.address))
+    def __format__(self, format_spec: str) -> str:
+        """Format the string representation (e.g. >25), the int for numeric types (e.g. 016x)."""
+        if format_spec and format_spec[-1] in NUMERIC_FORMATS:
+            return int.__format__(self, format_spec)
+        return format(str(self), format_spec)
 
-    def __eq__(self, other: typing.Any) -> bool:
-        """Equality of the address with another object."""
-        return isinstance(other, NPv5Address) and self.address == other.address
+    def __reduce__(self) -> tuple[type, tuple[int]]:
+        """Pickle as the int value (interned again when unpickled)."""
+        return self.__class__, (int(self),)
 
-    def _parse(self, address: "str | int | NPv5Address") -> int:
-        """Parse address to int from str, int, or address."""
-        if isinstance(address, NPv5Address):
-            return address.address
-        elif isinstance(address, str):
-            if match := re.fullmatch(r"\.".join(self.NUM_BYTES * ["[0-9a-fA-F]{1,2}"]), address):
-                return int.from_bytes(bytes.fromhex(match.string.replace(".", "")))
-        elif isinstance(address, int):
-            if 0 <= address <= 2**(self.NUM_BYTES * 8) - 1:
-                return address
-        raise TypeError("Type not accepted.")
+    @classmethod
+    def values_many(cls, addresses: typing.Iterable[str | int]) -> list[int]:
+        """Parse many addresses at once to plain ints (not interned, e.g. for graphs).
+
+        Canonical addresses (2 hex digits per byte) are joined, checked by the positions of
+        their dots and converted with one hex decode and struct unpack for the whole batch.
+        Batches with ints are parsed one by one.
+
+        Arguments:
+            - addresses: the addresses (or their int values).
+
+        Returns:
+            The int values of the addresses.
+        """
+        addresses = list(addresses)
+        count: int = len(addresses)
+        # joined with dots, every third character is a dot and the rest are hex digits
+        try:
+            joined: str = ".".join(typing.cast(list[str], addresses))
+        except TypeError:
+            return [cls._parse(address) for address in addresses]
+        digits: str = joined.replace(".", "")
+        if count and len(joined) == 3 * cls.NUM_BYTES * count - 1 \
+                and joined[2::3] == "." * (cls.NUM_BYTES * count - 1) \
+                and len(digits) == 2 * cls.NUM_BYTES * count and digits.isalnum():
+            try:
+                raw: bytes = bytes.fromhex(digits)
+            except ValueError:
+                pass
+            else:
+                return list(struct.unpack(f">{count}Q", raw))
+        return [cls._parse(address) for address in addresses]
+
+    @classmethod
+    def parse_many(cls, addresses: typing.Iterable[str | int]) -> list["NPv5Address"]:
+        """Parse many addresses at once (e.g. when loading a world file).
+
+        Arguments:
+            - addresses: the addresses.
+
+        Returns:
+            The parsed addresses.
+        """
+        intern = cls._intern
+        return [intern(value) for value in cls.values_many(addresses)]
+
+    @classmethod
+    def format_many(cls, addresses: typing.Iterable[int]) -> list[str]:
+        """Format many addresses at once.
+
+        Arguments:
+            - addresses: the addresses (or their int values).
+
+        Returns:
+            The string representations.
+        """
+        addresses = list(addresses)
+        text: str = struct.pack(f">{len(addresses)}Q", *addresses).hex(".").upper()
+        width: int = 3 * cls.NUM_BYTES
+        return [text[i:i + width - 1] for i in range(0, len(text), width)]
+
+
+@contextlib.contextmanager
+def _paused_gc() -> typing.Iterator[None]:
+    """Disable the cyclic garbage collector in a block (unless it is already disabled)."""
+    enabled: bool = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class DeviceRecord(pydantic.BaseModel):
+    """Record of a device in a world file or a region shard."""
+    model_config = pydantic.ConfigDict(extra="forbid")
+    name: str | None = None
+    type: DeviceType = DeviceType.TERMINAL
+    manufacturer: Manufacturer = Manufacturer.ACRON
+    device_name: str = DeviceName.POWERTERM
+    username: str = "admin"
+    prompt: str = DEFAULT_PROMPT
+    ports: tuple[typing.Annotated[int, pydantic.Field(ge=0, le=MAX_PORT)], ...] | None = None
+    """Open ports (defaults by device type)."""
+    seed: int | None = None
+    """Seed of the generated file system (the address by default)."""
+    template: str = "root"
+    """Generator of the root directory (see utils.file_system.DIRECTORY_GENERATORS)."""
+    file_system: dict[str, typing.Any] | None = None
+    """Saved file system (region shards, see utils.file_system.FileSystem.to_record)."""
+
+    @pydantic.field_validator("template")
+    @classmethod
+    def _validate_template(cls, template: str) -> str:
+        """Check that the template exists."""
+        if template not in utils.file_system.DIRECTORY_GENERATORS:
+            raise ValueError(f"Unknown file system template '{template}'.")
+        return template
+
+
+RECORDS_ADAPTER: pydantic.TypeAdapter = pydantic.TypeAdapter(list[DeviceRecord])
+"""Validator for lists of device records (built once)."""
 
 
 class Device(pydantic.BaseModel):
@@ -107,6 +278,8 @@ class Device(pydantic.BaseModel):
     """Name of the user."""
     prompt: str
     """Terminal prompt of the device."""
+    ports: tuple[int, ...] = ()
+    """Open ports."""
 
     @pydantic.field_serializer("net_address")
     def _serialize_net_address(self, net_address: NPv5Address) -> int:
@@ -137,16 +310,98 @@ class Device(pydantic.BaseModel):
         Returns:
             The computer.
         """
-        return Device(name=name, net_address=NPv5Address(net_address),
-                      file_system=utils.file_system.FileSystem(), type=DeviceType.TERMINAL,
+        net_address = NPv5Address(net_address)
+        return Device(name=name, net_address=net_address,
+                      file_system=utils.file_system.FileSystem(
+                          utils.file_system.Directory.root(net_address.address)),
+                      type=DeviceType.TERMINAL,
                       manufacturer=Manufacturer.ACRON, device_name=DeviceName.POWERTERM,
-                      username="admin", prompt="[green]{user}@{name}:{path} $[/] ")
+                      username="admin", prompt=DEFAULT_PROMPT)
+
+    @classmethod
+    def from_record(cls, net_address: NPv5Address | str | int,
+                    record: dict[str, typing.Any]) -> "Device":
+        """Create a device from its record in a world file (missing values are defaults).
+
+        Arguments:
+            - net_address: the NPv5 address of the device.
+            - record: the record of the device.
+
+        Returns:
+            The device.
+        """
+        return cls.from_records([(net_address, record)])[0]
+
+    @classmethod
+    def from_records(cls, records: typing.Iterable[tuple[NPv5Address | str | int,
+                                                         dict[str, typing.Any]]],
+                     pause_gc: bool = True) -> list["Device"]:
+        """Create devices from their records in a world file (missing values are defaults).
+
+        The records are validated as DeviceRecord in one call (extra keys are refused).
+
+        Arguments:
+            - records: the NPv5 addresses and records of the devices.
+            - pause_gc: whether the cyclic garbage collector is paused during the construction.
+
+        Returns:
+            The devices.
+        """
+        # devices are many small objects that survive, collections during the construction
+        # only slow it down (see benchmarks.device_construction)
+        with _paused_gc() if pause_gc else contextlib.nullcontext():
+            records = list(records)
+            validated: list[DeviceRecord] = RECORDS_ADAPTER.validate_python(
+                [record for _, record in records])
+            devices: list[Device] = []
+            for (net_address, _), record in zip(records, validated):
+                net_address = NPv5Address(net_address)
+                devices.append(cls(
+                    name=record.name or str(net_address), net_address=net_address,
+                    file_system=utils.file_system.FileSystem.from_record(record.file_system)
+                    if record.file_system is not None else utils.file_system.FileSystem(
+                        utils.file_system.Directory.root(
+                            record.seed if record.seed is not None else net_address.address,
+                            record.template)),
+                    type=record.type, manufacturer=record.manufacturer,
+                    device_name=record.device_name, username=record.username,
+                    prompt=record.prompt,
+                    ports=record.ports if record.ports is not None
+                    else DEFAULT_PORTS[record.type]))
+            return devices
+
+    def to_record(self) -> dict[str, typing.Any]:
+        """Get a record of the device with its file system (see from_records).
+
+        Returns:
+            The record.
+        """
+        return {"name": self.name, "type": self.type.value,
+                "manufacturer": self.manufacturer.value, "device_name": str(self.device_name),
+                "username": self.username, "prompt": self.prompt, "ports": list(self.ports),
+                "file_system": self.file_system.to_record()}
+
+    @staticmethod
+    def record_ports(record: dict[str, typing.Any]) -> tuple[int, ...]:
+        """Get the open ports of a device record (defaults by device type).
+
+        Arguments:
+            - record: the record of the device.
+
+        Returns:
+            The ports.
+        """
+        if "ports" in record:
+            return tuple(record["ports"])
+        return DEFAULT_PORTS[DeviceType(record.get("type", DeviceType.TERMINAL))]
 
     @classmethod
     def oracle(cls) -> "Device":
         """Create oracle."""
         return Device(name="oracle", net_address=NPv5Address(19391048),
-                      file_system=utils.file_system.FileSystem(), type=DeviceType.TERMINAL,
+                      file_system=utils.file_system.FileSystem(
+                          utils.file_system.Directory.root(19391048)),
+                      type=DeviceType.TERMINAL,
                       manufacturer=Manufacturer.CYCLOPS, device_name=DeviceName.POWERTERM,
                       username="sh4d0w", prompt="[$primary]┌([#00FF00]{player}[/]@[#D2691E]"
                       "oracle[/])-([#FF0000]{path}[/])[/]\n[$primary]└──$[/] ")
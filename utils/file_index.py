@@ -0,0 +1,267 @@
+"""Search indexes for file systems."""
+
+import fnmatch
+import functools
+import re
+import typing
+
+import utils.file_system
+
+type Node = utils.file_system.Directory | utils.file_system.File
+
+GLOB_CHARS: str = "*?["
+"""Characters that make a name a glob pattern."""
+
+
+def name_of(node: Node) -> str:
+    """Get the name of a node as it is displayed (e.g. bar.txt, home).
+
+    Arguments:
+        - node: the node.
+
+    Returns:
+        The name.
+    """
+    if isinstance(node, utils.file_system.Directory):
+        return node.name
+    return str(node)
+
+
+def trigrams(text: str) -> set[str]:
+    """Get all (lowercase) trigrams of a text.
+
+    Arguments:
+        - text: the text.
+
+    Returns:
+        The trigrams.
+    """
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+@functools.lru_cache(maxsize=128)
+def compile_glob(pattern: str) -> re.Pattern:
+    """Compile a glob pattern to a regex (cached).
+
+    Arguments:
+        - pattern: the glob pattern.
+
+    Returns:
+        The compiled pattern.
+    """
+    return re.compile(fnmatch.translate(pattern))
+
+
+def required_literal(pattern: str) -> str:
+    """Get the longest literal every match of a regex has to contain.
+
+    This is conservative: groups, character classes and optional characters are skipped and
+    top-level alternations give no literal at all.
+
+    Arguments:
+        - pattern: the regex.
+
+    Returns:
+        The literal (empty if there is none).
+    """
+    runs: list[str] = []
+    run: str = ""
+    depth: int = 0
+    i: int = 0
+    while i < len(pattern):
+        char: str = pattern[i]
+        if char == "\\":
+            escaped: str = pattern[i + 1:i + 2]
+            if depth == 0 and escaped and not escaped.isalnum():
+                run += escaped
+            else:
+                runs.append(run)
+                run = ""
+            i += 2
+            continue
+        if char == "[":
+            # skip character class, ']' directly after '[' or '[^' is literal
+            i += 2 if pattern[i + 1:i + 2] == "^" else 1
+            i += 1 if pattern[i:i + 1] == "]" else 0
+            while i < len(pattern) and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            runs.append(run)
+            run = ""
+        elif char == "(":
+            depth += 1
+            runs.append(run)
+            run = ""
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return ""
+        elif depth > 0:
+            pass
+        elif char in "*?{":
+            # previous character is optional
+            runs.append(run[:-1])
+            run = ""
+            if char == "{":
+                i = pattern.find("}", i)
+                if i == -1:
+                    break
+        elif char in "+.^$":
+            runs.append(run)
+            run = ""
+        else:
+            run += char
+        i += 1
+    runs.append(run)
+    return max(runs, key=len)
+
+
+class FileIndex:
+    """Name index and trigram content index of a file system, maintained incrementally.
+
+    Only loaded parts of the file system are indexed. Files with unloaded generated content are
+    kept as unindexed and unloaded generated directories are found with Directory.unloaded, so
+    searches know what they still have to scan.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the index."""
+        self.names: dict[str, dict[int, Node]] = {}
+        self.postings: dict[str, set[int]] = {}
+        self.files: dict[int, "utils.file_system.File"] = {}
+        """Files with indexed content."""
+        self.unindexed: dict[int, "utils.file_system.File"] = {}
+        """Files with content that is not loaded."""
+
+    def add(self, node: Node) -> None:
+        """Add a node with its (loaded) subtree.
+
+        Arguments:
+            - node: the node to add.
+        """
+        stack: list[Node] = [node]
+        while stack:
+            current = stack.pop()
+            self.names.setdefault(name_of(current), {})[id(current)] = current
+            if isinstance(current, utils.file_system.File):
+                if current.loaded:
+                    self.add_content(current)
+                else:
+                    self.unindexed[id(current)] = current
+            elif current.loaded:
+                stack.extend(current.children)
+                stack.extend(current.files)
+
+    def remove(self, node: Node) -> None:
+        """Remove a node with its (loaded) subtree.
+
+        Arguments:
+            - node: the node to remove.
+        """
+        stack: list[Node] = [node]
+        while stack:
+            current = stack.pop()
+            name: str = name_of(current)
+            nodes = self.names.get(name, {})
+            nodes.pop(id(current), None)
+            if not nodes:
+                self.names.pop(name, None)
+            if isinstance(current, utils.file_system.File):
+                if id(current) in self.files:
+                    self.remove_content(current)
+                self.unindexed.pop(id(current), None)
+            elif current.loaded:
+                stack.extend(current.children)
+                stack.extend(current.files)
+
+    def loaded(self, directory: "utils.file_system.Directory") -> None:
+        """Index the children of a directory that was just loaded.
+
+        Arguments:
+            - directory: the directory.
+        """
+        for child in (*directory.children, *directory.files):
+            self.add(child)
+
+    def unloading(self, directory: "utils.file_system.Directory") -> None:
+        """Remove the children of a directory that is about to be unloaded.
+
+        Arguments:
+            - directory: the directory.
+        """
+        for child in (*directory.children, *directory.files):
+            self.remove(child)
+
+    def add_content(self, file: "utils.file_system.File") -> None:
+        """Index the content of a loaded file.
+
+        Arguments:
+            - file: the file.
+        """
+        self.unindexed.pop(id(file), None)
+        self.files[id(file)] = file
+        for trigram in trigrams(file.content):
+            self.postings.setdefault(trigram, set()).add(id(file))
+
+    def extend_content(self, file: "utils.file_system.File", text: str) -> None:
+        """Index text appended to a file (appending never removes trigrams).
+
+        Arguments:
+            - file: the file.
+            - text: the appended text including the two characters before it.
+        """
+        for trigram in trigrams(text):
+            self.postings.setdefault(trigram, set()).add(id(file))
+
+    def remove_content(self, file: "utils.file_system.File") -> None:
+        """Remove the content of a file from the index (call before the content is dropped).
+
+        Arguments:
+            - file: the file.
+        """
+        self.files.pop(id(file), None)
+        for trigram in trigrams(file.content):
+            posting = self.postings.get(trigram)
+            if posting is not None:
+                posting.discard(id(file))
+                if not posting:
+                    del self.postings[trigram]
+        if file.generator is not None:
+            self.unindexed[id(file)] = file
+
+    def find_names(self, pattern: str) -> typing.Iterator[Node]:
+        """Find indexed nodes by name.
+
+        Arguments:
+            - pattern: the name or a glob pattern.
+
+        Returns:
+            The nodes.
+        """
+        if not any(char in pattern for char in GLOB_CHARS):
+            yield from list(self.names.get(pattern, {}).values())
+            return
+        regex: re.Pattern = compile_glob(pattern)
+        for name, nodes in list(self.names.items()):
+            if regex.match(name):
+                yield from list(nodes.values())
+
+    def content_candidates(self, literal: str) -> list["utils.file_system.File"] | None:
+        """Get indexed files that can contain a literal (case-insensitive).
+
+        Arguments:
+            - literal: the literal.
+
+        Returns:
+            The candidate files or None if the index can't answer (literal too short).
+        """
+        grams: list[str] = sorted(trigrams(literal),
+                                  key=lambda gram: len(self.postings.get(gram, ())))
+        if not grams:
+            return None
+        result: set[int] = set(self.postings.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not result:
+                break
+            result &= self.postings.get(gram, set())
+        return [self.files[file_id] for file_id in result]
@@ -1,8 +1,17 @@
 """Everything used for file systems."""
 
+import bisect
 import dataclasses
 import enum
+import itertools
+import operator
 import random
+import re
+import sys
+import typing
+
+import utils.blob_store
+import utils.file_index
 
 
 class FileType(enum.StrEnum):
@@ -11,14 +20,30 @@ class FileType(enum.StrEnum):
     TXT = "text"
 
 
-@dataclasses.dataclass
+CHUNK_SIZE: int = 4096
+"""Maximum size of one content chunk."""
+
+
+@dataclasses.dataclass(slots=True)
 class File:
-    """Virtual file."""
+    """Virtual file. Slotted to keep per-node overhead low in large trees.
+
+    The content is split into chunks of at most CHUNK_SIZE that live in the shared blob store,
+    the file only references them by key. Together with the newline count per chunk this makes
+    appends O(chunk) and allows reading lines without joining the whole content. Generated
+    files only store their (generator, seed) pair and create their content when it is first
+    read. Unmodified generated content can be dropped again with release.
+    """
     name: str
     parent: "Directory | None"
     filetype: FileType
-    content: str
-    size: int = dataclasses.field(init=False)
+    chunks: tuple[bytes, ...] | None
+    size: int
+    generator: str | None = None
+    seed: int = 0
+    modified: bool = False
+    newlines: tuple[int, ...] | None = None
+    """Number of newlines up to and including each chunk."""
 
     def __str__(self) -> str:
         """Get string representation of the file."""
@@ -30,15 +55,221 @@ class File:
 
     def __post_init__(self) -> None:
         """Initialize attributes dependent on other attributes."""
-        self.size = len(self.content)
+        self.name = sys.intern(self.name)
+
+    def _store(self, text: str) -> None:
+        """Append text as chunks to the (loaded) content without any bookkeeping.
+
+        Tuples are used because most files have a single chunk (or none), the copy on append
+        is tiny compared to the chunk.
+        """
+        chunks: list[bytes] = list(typing.cast(tuple[bytes, ...], self.chunks))
+        newlines: list[int] = list(typing.cast(tuple[int, ...], self.newlines))
+        # fill up the last chunk first
+        if chunks and (room := CHUNK_SIZE - len(utils.blob_store.BLOBS.get(chunks[-1]))) > 0:
+            last: str = utils.blob_store.BLOBS.get(chunks[-1])
+            utils.blob_store.BLOBS.release(chunks[-1])
+            chunks[-1] = utils.blob_store.BLOBS.put(last + text[:room])
+            newlines[-1] += text.count("\n", 0, room)
+            text = text[room:]
+        for start in range(0, len(text), CHUNK_SIZE):
+            chunk: str = text[start:start + CHUNK_SIZE]
+            chunks.append(utils.blob_store.BLOBS.put(chunk))
+            newlines.append((newlines[-1] if newlines else 0) + chunk.count("\n"))
+        self.chunks = tuple(chunks)
+        self.newlines = tuple(newlines)
+
+    def _load(self) -> None:
+        """Generate the content if it is not in memory."""
+        if self.chunks is None:
+            self.chunks = ()
+            self.newlines = ()
+            self._store(CONTENT_GENERATORS[typing.cast(str, self.generator)](self))
+            if (index := _index_of(self)) is not None:
+                index.add_content(self)
+
+    @property
+    def content(self) -> str:
+        """Content of the file (generated on first access)."""
+        self._load()
+        return "".join(map(utils.blob_store.BLOBS.get, typing.cast(tuple[bytes, ...], self.chunks)))
+
+    @content.setter
+    def content(self, value: str) -> None:
+        """Set the content of the file."""
+        index: utils.file_index.FileIndex | None = _index_of(self)
+        if index is not None and self.chunks is not None:
+            index.remove_content(self)
+        self.drop()
+        self.chunks = ()
+        self.newlines = ()
+        self._store(value)
+        if self.parent is not None:
+            self.parent._grow(len(value) - self.size, 0)  # pylint:disable=protected-access
+        self.size = len(value)
+        self.modified = True
+        if index is not None:
+            index.add_content(self)
+
+    def append(self, text: str) -> None:
+        """Append text to the content (only touches the last chunk).
+
+        Arguments:
+            - text: the text to append.
+        """
+        self._load()
+        chunks: tuple[bytes, ...] = typing.cast(tuple[bytes, ...], self.chunks)
+        # text spanning the old end is needed for the trigram index
+        before: str = utils.blob_store.BLOBS.get(chunks[-1])[-2:] if chunks else ""
+        self._store(text)
+        if self.parent is not None:
+            self.parent._grow(len(text), 0)  # pylint:disable=protected-access
+        self.size += len(text)
+        self.modified = True
+        if (index := _index_of(self)) is not None:
+            index.extend_content(self, before + text)
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines (like len(content.split("\\n")))."""
+        self._load()
+        newlines: tuple[int, ...] = typing.cast(tuple[int, ...], self.newlines)
+        return (newlines[-1] if newlines else 0) + 1
+
+    def iter_lines(self, start: int = 0) -> typing.Iterator[str]:
+        """Iterate over lines starting at a line number, reading only the chunks needed.
+
+        Arguments:
+            - start: the number of the first line (starting at 0).
+
+        Returns:
+            The lines (without newlines).
+        """
+        self._load()
+        chunks: tuple[bytes, ...] = typing.cast(tuple[bytes, ...], self.chunks)
+        newlines: tuple[int, ...] = typing.cast(tuple[int, ...], self.newlines)
+        if not chunks:
+            if start == 0:
+                yield ""
+            return
+        # first chunk with the start of the line
+        index: int = bisect.bisect_left(newlines, start)
+        if index == len(chunks):
+            return
+        text: str = utils.blob_store.BLOBS.get(chunks[index])
+        position: int = 0
+        for _ in range(start - (newlines[index - 1] if index > 0 else 0)):
+            position = text.index("\n", position) + 1
+        text = text[position:]
+        partial: str = ""
+        while True:
+            lines: list[str] = text.split("\n")
+            lines[0] = partial + lines[0]
+            yield from lines[:-1]
+            partial = lines[-1]
+            index += 1
+            if index == len(chunks):
+                yield partial
+                return
+            text = utils.blob_store.BLOBS.get(chunks[index])
+
+    def lines(self, start: int = 0, count: int | None = None) -> list[str]:
+        """Get lines by line number, reading only the chunks needed.
+
+        Arguments:
+            - start: the number of the first line (starting at 0).
+            - count: the maximum number of lines (all if None).
+
+        Returns:
+            The lines (without newlines).
+        """
+        iterator: typing.Iterator[str] = self.iter_lines(start)
+        if count is None:
+            return list(iterator)
+        return [line for line, _ in zip(iterator, range(count))]
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the content is in memory."""
+        return self.chunks is not None
+
+    def drop(self) -> None:
+        """Drop the references to the content (when the file is released or deleted)."""
+        if self.chunks is not None:
+            for chunk in self.chunks:
+                utils.blob_store.BLOBS.release(chunk)
+            self.chunks = None
+            self.newlines = None
+
+    def release(self) -> bool:
+        """Drop generated content back to its seed if it is unmodified.
+
+        Returns:
+            True if the content was dropped, False otherwise.
+        """
+        if self.generator is None or self.modified or self.chunks is None:
+            return False
+        if (index := _index_of(self)) is not None:
+            index.remove_content(self)
+        self.drop()
+        return True
+
+    def peek(self) -> str:
+        """Get the content without keeping generated content in memory (for scans).
+
+        Returns:
+            The content.
+        """
+        if self.chunks is None:
+            return CONTENT_GENERATORS[typing.cast(str, self.generator)](self)
+        return self.content
 
-    def info(self) -> str:
+    def info(self, human: bool = False) -> str:
         """Get info about the file.
 
+        Arguments:
+            - human: format the size human readable if True.
+
         Returns:
             The formatted info.
         """
-        return f"{self.filetype:10} {self.size:>4} kB {self}"
+        return f"{self.filetype:10} {format_size(self.size, human)} {self}"
+
+    def to_record(self) -> dict[str, typing.Any]:
+        """Get a JSON compatible record of the file (unmodified generated content as its seed).
+
+        Returns:
+            The record.
+        """
+        record: dict[str, typing.Any] = {"name": self.name, "type": self.filetype.value,
+                                         "size": self.size}
+        if self.generator is not None:
+            record["generator"] = self.generator
+            record["seed"] = self.seed
+        if self.modified:
+            record["modified"] = True
+        if self.generator is None or self.modified:
+            record["content"] = self.content
+        return record
+
+    @classmethod
+    def from_record(cls, record: dict[str, typing.Any]) -> "File":
+        """Create a file from its record (see to_record).
+
+        Arguments:
+            - record: the record.
+
+        Returns:
+            The file.
+        """
+        file: File = File(record["name"], None, FileType(record["type"]), None, record["size"],
+                          record.get("generator"), record.get("seed", 0),
+                          record.get("modified", False))
+        if "content" in record:
+            file.chunks = ()
+            file.newlines = ()
+            file._store(record["content"])  # pylint:disable=protected-access
+        return file
 
     @classmethod
     def text(cls, name: str, content: str) -> "File":
@@ -51,57 +282,398 @@ class File:
         Returns:
             The file.
         """
-        return File(name, None, FileType.TXT, content)
+        file: File = File(name, None, FileType.TXT, (), len(content), newlines=())
+        file._store(content)  # pylint:disable=protected-access
+        return file
 
     @classmethod
-    def executable(cls, name: str) -> "File":
-        """Create an executable file.
+    def executable(cls, name: str, seed: int | None = None) -> "File":
+        """Create an executable file. The content is only generated when read.
 
         Arguments:
             - name: the name of the file.
+            - seed: the seed for the content (random if None).
 
         Returns:
             The file.
         """
-        size: int = len(name) * random.randint(0, 7)
-        content: str = "".join([str(random.randint(0, 1))
-                               for _ in range(size)])
-        return File(name, None, FileType.EXE, content)
+        if seed is None:
+            seed = random.getrandbits(64)
+        return File(name, None, FileType.EXE, None, len(name) * (seed % 8),
+                    generator="executable", seed=seed)
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Directory:
-    """Virtual directory."""
+    """Virtual directory. Slotted to keep per-node overhead low in large trees.
+
+    Generated directories only store their (generator, seed) pair and create their children
+    when they are first accessed. Unmodified generated directories can be dropped again with
+    release.
+    """
     name: str
     parent: "Directory | None"
-    children: list["Directory"]
-    files: list["File"]
+    _children: list["Directory"] | None
+    _files: list["File"] | None
+    generator: str | None = None
+    seed: int = 0
+    modified: bool = False
+    index: "utils.file_index.FileIndex | None" = None
+    """Search index of the file system (only set on the root)."""
+    total_size: int = 0
+    """Size of all files in the subtree (kept up to date on every change)."""
+    total_files: int = 0
+    """Number of files in the subtree (kept up to date on every change)."""
+    counted: bool = True
+    """Whether the totals include the subtree, unloaded generated directories are not counted
+    until their totals are needed (see count)."""
+    pending: int = dataclasses.field(default=0, init=False)
+    """Number of unloaded generated directories in the subtree (including the directory)."""
+    uncounted: int = dataclasses.field(default=0, init=False)
+    """Number of those that are not counted, so the totals are complete if it is 0."""
+
+    def __post_init__(self) -> None:
+        """Intern the name, generated trees repeat the same names a lot."""
+        self.name = sys.intern(self.name)
+        if self._children is None:
+            self.pending = 1
+            self.uncounted = int(not self.counted)
 
     def __str__(self) -> str:
         """Get string representation."""
         return f"{self.name}/"
 
-    def info(self) -> str:
-        """Get info about the file.
+    @property
+    def children(self) -> list["Directory"]:
+        """Child directories (generated on first access)."""
+        self._load()
+        return typing.cast(list[Directory], self._children)
+
+    @property
+    def files(self) -> list["File"]:
+        """Files (generated on first access)."""
+        self._load()
+        return typing.cast(list[File], self._files)
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the children are in memory."""
+        return self._children is not None
+
+    def _generate(self) -> None:
+        """Run the generator on empty children."""
+        self._children = []
+        self._files = []
+        DIRECTORY_GENERATORS[typing.cast(str, self.generator)](self, random.Random(self.seed))
+        # generators append, sort once instead of inserting sorted
+        self._children.sort(key=_directory_key)
+        self._files.sort(key=str)
+
+    def _load(self) -> None:
+        """Generate children if they are not in memory."""
+        if self._children is None:
+            counted: bool = self.counted
+            # totals kept from before a release are counted again by the generator
+            self._grow(-self.total_size, -self.total_files, -1, -int(not counted))
+            self._generate()
+            self.counted = True
+            if counted:
+                # generated children start uncounted, keep the totals complete
+                for child in self._children:
+                    child.count()
+            if (index := _index_of(self)) is not None:
+                index.loaded(self)
+
+    def _detached(self) -> "Directory":
+        """Generate the children of an unloaded directory into a copy that isn't in the tree.
+
+        Returns:
+            The copy (drop its contents with _drop_contents when done).
+        """
+        copy: Directory = Directory(self.name, None, None, None, self.generator, self.seed)
+        copy._generate()
+        # only for paths, set after generating so no totals are added to the tree
+        copy.parent = self.parent
+        return copy
+
+    def scan(self) -> typing.Iterator["Directory | File"]:
+        """Iterate over the subtree (depth first) without loading anything.
+
+        Unloaded generated directories are generated into detached copies that are dropped
+        when the iteration ends, so nodes below them are only valid during the iteration.
+
+        Returns:
+            The nodes, starting with the directory itself.
+        """
+        copies: list[Directory] = []
+        stack: list[Directory | File] = [self]
+        try:
+            while stack:
+                node: Directory | File = stack.pop()
+                yield node
+                if isinstance(node, Directory):
+                    if node._children is None:
+                        node = node._detached()
+                        copies.append(node)
+                    stack.extend(reversed(typing.cast(list[File], node._files)))
+                    stack.extend(reversed(typing.cast(list[Directory], node._children)))
+        finally:
+            for copy in copies:
+                copy._drop_contents()
+
+    def count(self) -> None:
+        """Add the totals of an unloaded generated directory without loading it.
+
+        Generated directories count as empty until then, counting runs the generators of the
+        subtree once and drops the result, like File.peek does for content.
+        """
+        if self.counted or self._children is not None:
+            return
+        size: int = 0
+        files: int = 0
+        for node in self.scan():
+            if isinstance(node, File):
+                size += node.size
+                files += 1
+        self.counted = True
+        self._grow(size, files, 0, -1)
+
+    def unloaded(self, uncounted: bool = False) -> list["Directory"]:
+        """Get the unloaded generated directories in the subtree.
+
+        Only directories that have some below them are visited (see pending and uncounted).
+
+        Arguments:
+            - uncounted: only get the ones that are not counted if True.
+
+        Returns:
+            The directories.
+        """
+        key: typing.Callable[[Directory], int] = \
+            operator.attrgetter("uncounted" if uncounted else "pending")
+        found: list[Directory] = []
+        stack: list[Directory] = [self] if key(self) else []
+        while stack:
+            directory = stack.pop()
+            if directory._children is None:
+                found.append(directory)
+            else:
+                stack.extend(filter(key, directory._children))
+        return found
+
+    def _grow(self, size: int, files: int, pending: int = 0, uncounted: int = 0) -> None:
+        """Add to the totals and counters of this directory and all its parents."""
+        node: Directory | None = self
+        while node is not None:
+            node.total_size += size
+            node.total_files += files
+            node.pending += pending
+            node.uncounted += uncounted
+            node = node.parent
+
+    def _attach(self, child: "Directory | File", keep_sorted: bool = False) -> None:
+        """Add a child without marking the directory as modified (used by generators).
+
+        Children are kept sorted by name. Generators append and the directory is sorted once
+        after generation, otherwise the child is inserted at its sorted position.
+        """
+        child.parent = self
+        if isinstance(child, Directory):
+            if keep_sorted:
+                bisect.insort(self.children, child, key=_directory_key)
+            else:
+                self.children.append(child)
+            self._grow(child.total_size, child.total_files, child.pending, child.uncounted)
+        else:
+            if keep_sorted:
+                bisect.insort(self.files, child, key=str)
+            else:
+                self.files.append(child)
+            self._grow(child.size, 1)
+
+    def child(self, name: str) -> "Directory | None":
+        """Get a child directory by name (binary search).
+
+        Arguments:
+            - name: the name of the directory.
+
+        Returns:
+            The directory or None if it doesn't exist.
+        """
+        children: list[Directory] = self.children
+        i: int = bisect.bisect_left(children, name, key=_directory_key)
+        if i < len(children) and children[i].name == name:
+            return children[i]
+        return None
+
+    def file(self, name: str) -> "File | None":
+        """Get a file by name as displayed, e.g. bar.txt (binary search).
+
+        Arguments:
+            - name: the name of the file.
+
+        Returns:
+            The file or None if it doesn't exist.
+        """
+        files: list[File] = self.files
+        i: int = bisect.bisect_left(files, name, key=str)
+        if i < len(files) and str(files[i]) == name:
+            return files[i]
+        return None
+
+    def _drop_contents(self) -> None:
+        """Drop the content references of all loaded files in the subtree."""
+        stack: list[Directory] = [self]
+        while stack:
+            directory = stack.pop()
+            if directory._children is not None:
+                for file in typing.cast(list[File], directory._files):
+                    file.drop()
+                stack.extend(directory._children)
+
+    def info(self, human: bool = False, name: str | None = None) -> str:
+        """Get info about the directory.
+
+        Arguments:
+            - human: format the size human readable if True.
+            - name: the name to show instead of the directory name (e.g. . or ..).
 
         Returns:
             The formatted info.
         """
-        return f"directory  ({len(self.children):>2}|{len(self.files):>2}) " \
-            f"[#0000FF]{self.name}[/]"
+        return f"directory  {format_size(self.total_size, human)} " \
+            f"[#0000FF]{self.name if name is None else name}[/]"
 
     def add_child(self, child: "Directory | File") -> None:
         """Add a child to the directory."""
-        child.parent = self
+        self._attach(child, keep_sorted=True)
+        self.modified = True
+        if (index := _index_of(self)) is not None:
+            index.add(child)
+
+    def remove_child(self, child: "Directory | File") -> None:
+        """Remove a child (and its subtree) from the directory."""
+        if (index := _index_of(self)) is not None:
+            index.remove(child)
         if isinstance(child, Directory):
-            self.children.append(child)
+            children: list[Directory] = self.children
+            i: int = bisect.bisect_left(children, child.name, key=_directory_key)
+            del children[i]
+            self._grow(-child.total_size, -child.total_files, -child.pending, -child.uncounted)
+            child._drop_contents()
+        else:
+            files: list[File] = self.files
+            del files[bisect.bisect_left(files, str(child), key=str)]
+            self._grow(-child.size, -1)
+            child.drop()
+        child.parent = None
+        self.modified = True
+
+    def pristine(self) -> bool:
+        """Check if nothing in the loaded part of the subtree was modified."""
+        stack: list[Directory] = [self]
+        while stack:
+            directory = stack.pop()
+            if directory.modified:
+                return False
+            if directory._children is None:
+                continue
+            if any(file.modified for file in typing.cast(list[File], directory._files)):
+                return False
+            stack.extend(directory._children)
+        return True
+
+    def release(self) -> bool:
+        """Drop generated children back to the seed if the subtree is unmodified.
+
+        Returns:
+            True if the children were dropped, False otherwise.
+        """
+        if self.generator is None or self._children is None or not self.pristine():
+            return False
+        if (index := _index_of(self)) is not None:
+            index.unloading(self)
+        # totals are kept, the subtree is unmodified so they stay valid if complete
+        if self.uncounted:
+            self._grow(-self.total_size, -self.total_files, 1 - self.pending, 1 - self.uncounted)
+            self.counted = False
+        else:
+            self._grow(0, 0, 1 - self.pending)
+        self._drop_contents()
+        self._children = None
+        self._files = None
+        return True
+
+    def to_record(self) -> dict[str, typing.Any]:
+        """Get a JSON compatible record of the subtree.
+
+        Unloaded and unmodified generated subtrees are stored as their seed, only modified or
+        hand made parts are stored completely.
+
+        Returns:
+            The record.
+        """
+        record: dict[str, typing.Any] = {"name": self.name}
+        if self.generator is not None:
+            record["generator"] = self.generator
+            record["seed"] = self.seed
+        if self.modified:
+            record["modified"] = True
+        if self._children is None or (self.generator is not None and self.pristine()):
+            # counted again when needed if unknown
+            if not self.uncounted:
+                record["total_size"] = self.total_size
+                record["total_files"] = self.total_files
         else:
-            self.files.append(child)
+            record["directories"] = [child.to_record() for child in self._children]
+            record["files"] = [file.to_record() for file in typing.cast(list[File], self._files)]
+        return record
+
+    @classmethod
+    def from_record(cls, record: dict[str, typing.Any]) -> "Directory":
+        """Create a directory with its subtree from its record (see to_record).
+
+        Arguments:
+            - record: the record.
+
+        Returns:
+            The directory.
+        """
+        loaded: bool = "directories" in record
+        directory: Directory = cls(record["name"], None, [] if loaded else None,
+                                   [] if loaded else None, record.get("generator"),
+                                   record.get("seed", 0), record.get("modified", False),
+                                   counted=loaded or "total_size" in record)
+        if loaded:
+            # records are sorted already
+            for child in record["directories"]:
+                directory._attach(Directory.from_record(child))
+            for file in record["files"]:
+                directory._attach(File.from_record(file))
+        elif "total_size" in record:
+            # kept like after a release, counted again when generated
+            directory.total_size = record["total_size"]
+            directory.total_files = record["total_files"]
+        return directory
 
     @classmethod
-    def home(cls) -> "Directory":
+    def generated(cls, name: str, generator: str, seed: int) -> "Directory":
+        """Create a directory whose children are generated on first access.
+
+        Arguments:
+            - name: the name of the directory.
+            - generator: the name of the generator in DIRECTORY_GENERATORS.
+            - seed: the seed for the generator.
+
+        Returns:
+            The directory.
+        """
+        return cls(name, None, None, None, generator=generator, seed=seed, counted=False)
+
+    @classmethod
+    def home(cls, seed: int = 0) -> "Directory":
         """Create home directory."""
-        return cls("home", None, [], [])
+        return cls.generated("home", "home", seed)
 
     @classmethod
     def bin(cls) -> "Directory":
@@ -109,16 +681,103 @@ class Directory:
         return cls("bin", None, [], [])
 
     @classmethod
-    def root(cls) -> "Directory":
-        """Create root directory."""
-        root = cls("", None, [], [])
-        root.add_child(cls.bin())
-        home = cls.home()
-        home.add_child(File.executable("foo"))
-        home.add_child(File.text("bar", "Lorem ipsum, dolor sit amet."))
-        home.add_child(Directory("test", None, [], []))
-        root.add_child(home)
-        return root
+    def root(cls, seed: int = 0, template: str = "root") -> "Directory":
+        """Create root directory.
+
+        Arguments:
+            - seed: the seed for the generator.
+            - template: the name of the generator in DIRECTORY_GENERATORS (e.g. server).
+
+        Returns:
+            The directory.
+        """
+        return cls.generated("", template, seed)
+
+
+def format_size(size: int, human: bool = False) -> str:
+    """Format a size in kB.
+
+    Arguments:
+        - size: the size in kB.
+        - human: use the largest fitting unit if True.
+
+    Returns:
+        The formatted size (7 characters wide).
+    """
+    if not human:
+        return f"{size:>4} kB"
+    value: float = size
+    for unit in ("kB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            break
+        value /= 1024
+    return f"{value:>4.0f} {unit}" if unit == "kB" else f"{value:>4.1f} {unit}"
+
+
+def _directory_key(directory: Directory) -> str:
+    """Sort key of directories."""
+    return directory.name
+
+
+def _index_of(node: File | Directory) -> "utils.file_index.FileIndex | None":
+    """Get the search index of the file system a node belongs to."""
+    while node.parent is not None:
+        node = node.parent
+    return node.index if isinstance(node, Directory) else None
+
+
+def _generate_executable(file: File) -> str:
+    """Generate the binary content of an executable (one call instead of one per bit)."""
+    if file.size == 0:
+        return ""
+    return format(random.Random(file.seed).getrandbits(file.size), f"0{file.size}b")
+
+
+def _generate_root(directory: Directory, rng: random.Random) -> None:
+    """Generate the root directory."""
+    directory._attach(Directory.bin())  # pylint:disable=protected-access
+    directory._attach(Directory.home(rng.getrandbits(64)))  # pylint:disable=protected-access
+
+
+def _generate_home(directory: Directory, rng: random.Random) -> None:
+    """Generate the home directory."""
+    # pylint:disable=protected-access
+    directory._attach(File.executable("foo", rng.getrandbits(64)))
+    directory._attach(File.text("bar", "Lorem ipsum, dolor sit amet."))
+    directory._attach(Directory("test", None, [], []))
+
+
+def _generate_server_root(directory: Directory, rng: random.Random) -> None:
+    """Generate the root directory of a server."""
+    _generate_root(directory, rng)
+    # pylint:disable=protected-access
+    directory._attach(Directory.generated("var", "var", rng.getrandbits(64)))
+
+
+def _generate_var(directory: Directory, rng: random.Random) -> None:
+    """Generate the var directory of a server."""
+    # pylint:disable=protected-access
+    log: Directory = Directory("log", None, [], [])
+    log._attach(File.text("access", "".join(
+        f"{rng.choice(('GET', 'POST'))} /{rng.choice(('', 'index', 'login', 'api'))} "
+        f"{rng.choice((200, 200, 200, 301, 404, 500))}\n" for _ in range(rng.randint(1, 32)))))
+    directory._attach(log)
+    www: Directory = Directory("www", None, [], [])
+    www._attach(File.text("index", "<h1>It works!</h1>"))
+    directory._attach(www)
+
+
+CONTENT_GENERATORS: dict[str, typing.Callable[[File], str]] = {
+    "executable": _generate_executable
+}
+"""File content generators by name."""
+DIRECTORY_GENERATORS: dict[str, typing.Callable[[Directory, random.Random], None]] = {
+    "root": _generate_root,
+    "home": _generate_home,
+    "server": _generate_server_root,
+    "var": _generate_var
+}
+"""Directory generators by name. They add children to the directory using the seeded rng."""
 
 
 class FileSystem:
@@ -127,91 +786,446 @@ class FileSystem:
     class NoSuchDirectoryException(Exception):
         """No such directory exception."""
 
-    def __init__(self, root: Directory = Directory.root()) -> None:
-        """Initialize the file system."""
-        self.root: Directory = root
+    class NoSuchFileException(Exception):
+        """No such file or directory exception."""
+
+    def __init__(self, root: Directory | None = None, capacity: int = 65536) -> None:
+        """Initialize the file system.
+
+        Arguments:
+            - root: the root directory (default root if None).
+            - capacity: the capacity in kB.
+        """
+        self.root: Directory = root if root is not None else Directory.root()
         self.working_directory: Directory = self.root
+        self.capacity: int = capacity
+        self.index: utils.file_index.FileIndex = utils.file_index.FileIndex()
+        self.root.index = self.index
+        self.index.add(self.root)
+
+    def to_record(self) -> dict[str, typing.Any]:
+        """Get a JSON compatible record of the file system (without the working directory).
+
+        Returns:
+            The record.
+        """
+        return {"root": self.root.to_record(), "capacity": self.capacity}
+
+    @classmethod
+    def from_record(cls, record: dict[str, typing.Any]) -> "FileSystem":
+        """Create a file system from its record (see to_record).
+
+        Arguments:
+            - record: the record.
+
+        Returns:
+            The file system.
+        """
+        return cls(Directory.from_record(record["root"]), record["capacity"])
+
+    def drop(self) -> None:
+        """Drop the content references of all files (when the file system is discarded)."""
+        self.root._drop_contents()  # pylint:disable=protected-access
+
+    def release(self) -> int:
+        """Drop unmodified generated directories and file contents back to their seeds.
+
+        Directories containing the working directory stay loaded.
+
+        Returns:
+            The number of released nodes.
+        """
+        keep: set[int] = set()
+        node: Directory | None = self.working_directory
+        while node is not None:
+            keep.add(id(node))
+            node = node.parent
+        released: int = 0
+        stack: list[Directory] = [self.root]
+        while stack:
+            directory = stack.pop()
+            if not directory.loaded:
+                continue
+            if id(directory) not in keep and directory.release():
+                released += 1
+                continue
+            released += sum(file.release() for file in directory.files)
+            stack.extend(directory.children)
+        return released
 
     def _walk(self, start: Directory, path: list[str]) -> Directory:
         """Walk through a path."""
-        if len(path) == 0:
-            return start
-        step = path.pop(0)
-        # same directory
-        if step == ".":
-            return self._walk(start, path)
-        # parent directory
-        if step == "..":
-            if start.parent is not None:
-                return self._walk(start.parent, path)
-            # start is root
-            return self._walk(start, path)
-        # child directory
-        for child in start.children:
-            if child.name == step:
-                return self._walk(child, path)
-        # raise error if child doesn't exist
-        raise self.NoSuchDirectoryException(step)
+        directory: Directory = start
+        for step in path:
+            # same directory
+            if step == ".":
+                continue
+            # parent directory (root is its own parent)
+            if step == "..":
+                if directory.parent is not None:
+                    directory = directory.parent
+                continue
+            # child directory
+            child: Directory | None = directory.child(step)
+            # raise error if child doesn't exist
+            if child is None:
+                raise self.NoSuchDirectoryException(step)
+            directory = child
+        return directory
+
+    def path(self, node: Directory | File) -> str:
+        """Get the absolute path of a node.
+
+        Arguments:
+            - node: the node.
+
+        Returns:
+            The path.
+        """
+        # step all the way back to root
+        names: list[str] = [utils.file_index.name_of(node)]
+        parent: Directory | None = node.parent
+        while parent is not None:
+            names.append(parent.name)
+            parent = parent.parent
+        return "/".join(reversed(names)) or "/"
 
     def pwd(self) -> str:
         """Get current working directory."""
-        # step all the way back to root
-        path: list[Directory] = []
-        node: Directory = self.working_directory
-        while True:
-            path.insert(0, node)
-            if node.parent is not None:
-                node = node.parent
-            else:
-                break
-        # remove / if not root
-        wd: str = "".join(map(str, path))
-        if wd != "/":
-            wd = wd.removesuffix("/")
-        return wd
+        return self.path(self.working_directory)
 
-    def ls(self, list_: bool = False, all_: bool = False) \
-            -> tuple[list[str] | None, list[str] | None]:
-        """List content of directory.
+    def get(self, path: str) -> Directory | File:
+        """Get a directory or file by path.
 
         Arguments:
+            - path: the absolute or relative path.
+
+        Returns:
+            The directory or file.
+        """
+        path_parts: list[str] = path.removesuffix("/").split("/")
+        start: Directory = self.working_directory
+        if path_parts[0] == "":
+            start = self.root
+            path_parts = path_parts[1:]
+        if len(path_parts) == 0:
+            return start
+        try:
+            directory: Directory = self._walk(start, path_parts[:-1])
+        except FileSystem.NoSuchDirectoryException as excp:
+            raise FileSystem.NoSuchFileException(path) from excp
+        try:
+            return self._walk(directory, path_parts[-1:])
+        except FileSystem.NoSuchDirectoryException:
+            pass
+        if (file := directory.file(path_parts[-1])) is not None:
+            return file
+        raise FileSystem.NoSuchFileException(path)
+
+    @staticmethod
+    def _is_below(directory: Directory, node: Directory | File) -> bool:
+        """Check if a node is in the subtree of a directory."""
+        current: Directory | File | None = node
+        while current is not None:
+            if current is directory:
+                return True
+            current = current.parent
+        return False
+
+    @staticmethod
+    def _count(directory: Directory) -> None:
+        """Count the uncounted directories in a subtree into the totals."""
+        for uncounted in directory.unloaded(uncounted=True):
+            uncounted.count()
+
+    def find(self, path: str = ".", name: str | None = None, type_: str | None = None,
+             size: str | None = None) -> typing.Iterator[str]:
+        """Find files and directories. Uses the name index if a name is given.
+
+        Unloaded generated directories are scanned without loading them.
+
+        Arguments:
+            - path: the directory to search in.
+            - name: the name or glob pattern to match.
+            - type_: 'f' for files, 'd' for directories.
+            - size: size of files as N, +N (more than) or -N (less than).
+
+        Returns:
+            The paths of all matches.
+        """
+        start: Directory | File = self.get(path)
+        candidates: typing.Iterable[Directory | File]
+        if isinstance(start, File):
+            candidates = [start]
+        elif name is not None:
+            regex: re.Pattern = utils.file_index.compile_glob(name)
+            candidates = itertools.chain(
+                (node for node in self.index.find_names(name) if self._is_below(start, node)),
+                # the unloaded directories themselves are indexed
+                (node for pending in start.unloaded() for node in pending.scan()
+                 if node is not pending and regex.match(utils.file_index.name_of(node))))
+        else:
+            candidates = start.scan()
+        for node in candidates:
+            if type_ is not None and (type_ == "d") != isinstance(node, Directory):
+                continue
+            if size is not None:
+                if not isinstance(node, File):
+                    continue
+                number: int = int(size.lstrip("+-"))
+                if (size[0] == "+" and node.size <= number) \
+                        or (size[0] == "-" and node.size >= number) \
+                        or (size[0] not in "+-" and node.size != number):
+                    continue
+            yield self.path(node)
+
+    def grep(self, pattern: str, path: str, recursive: bool = False,
+             ignore_case: bool = False) -> typing.Iterator[tuple[File, int, str]]:
+        """Search file contents with a regex.
+
+        Recursive searches use the trigram index if the pattern contains a literal of at least
+        three characters and fall back to scanning every file otherwise. Generated content
+        and directories that aren't loaded are scanned without keeping them in memory.
+
+        Arguments:
+            - pattern: the regex.
+            - path: the file or directory to search.
+            - recursive: search directories recursively if True.
+            - ignore_case: ignore case if True.
+
+        Returns:
+            The file, line number and line of every match.
+        """
+        regex: re.Pattern = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+
+        def search(file: File) -> typing.Iterator[tuple[File, int, str]]:
+            """Search the lines of a file."""
+            for number, line in enumerate(file.peek().split("\n"), start=1):
+                if regex.search(line):
+                    yield file, number, line
+
+        start: Directory | File = self.get(path)
+        if isinstance(start, File):
+            yield from search(start)
+            return
+        if not recursive:
+            raise FileSystem.NoSuchFileException(f"{path} is a directory")
+        candidates: list[File] | None = self.index.content_candidates(
+            utils.file_index.required_literal(pattern))
+        if candidates is None:
+            for node in start.scan():
+                if isinstance(node, File):
+                    yield from search(node)
+            return
+        matches: list[tuple[File, int, str]] = [
+            match for file in (*candidates, *self.index.unindexed.values())
+            if self._is_below(start, file) for match in search(file)]
+        for pending in start.unloaded():
+            # files of unloaded directories are only valid during the scan, keep the matches
+            matches.extend(match for node in pending.scan() if isinstance(node, File)
+                           for match in search(node))
+        # stable, so lines stay in order
+        matches.sort(key=lambda match: self.path(match[0]))
+        yield from matches
+
+    def ls(self, path: str = ".", list_: bool = False, all_: bool = False, human: bool = False,
+           by_size: bool = False, recursive: bool = False, offset: int = 0,
+           limit: int | None = None) -> typing.Iterator[str]:
+        """List content of directory. Entries are formatted lazily, one at a time.
+
+        Children are kept sorted, so no sorting is needed unless sorting by size. Only the
+        entries of the page are formatted, so only their sizes are counted (see count).
+
+        Arguments:
+            - path: the directory (or file) to list.
             - list_: uses list format with info if True.
-            - all: adds . and .. to output if True.
-
-        Returns:
-            A list of directories and a list of files. Can be None if empty.
-        """
-        # yeah, this has become cursed again
-        directories: list[tuple[str, str]] = []
-        files: list[str] = []
-        # add . and .. if all
-        if all_:
-            # info if list
-            if list_:
-                current: Directory = self.working_directory
-                parent: Directory = self.working_directory.parent \
-                    if self.working_directory.parent else self.working_directory
-                directories += [
-                    (".", f"directory  ({len(current.children):>2}|{len(current.files):>2}) "
-                     "[#0000FF].[/]"),
-                    ("..", f"directory  ({len(parent.children):>2}|{len(parent.files):>2}) "
-                     "[#0000FF]..[/]")
-                ]
+            - all_: adds . and .. to output if True.
+            - human: human readable sizes if True.
+            - by_size: sort by size (largest first) if True.
+            - recursive: list subdirectories recursively (with headers) if True.
+            - offset: number of entries to skip.
+            - limit: maximum number of entries (all if None).
+
+        Returns:
+            The formatted entries, directories first.
+        """
+        start: Directory | File = self.get(path)
+        entries: typing.Iterator[tuple[Directory | File | None, str | None]] = \
+            iter([(start, None)]) if isinstance(start, File) \
+            else self._entries(start, all_, by_size, recursive)
+        for node, label in itertools.islice(entries, offset,
+                                            None if limit is None else offset + limit):
+            if node is None:
+                yield typing.cast(str, label)
+            elif isinstance(node, File):
+                yield node.info(human) if list_ else str(node)
+            elif list_:
+                self._count(node)
+                yield node.info(human, label)
             else:
-                directories += [(".", "."), ("..", "..")]
-        # info if list
-        if list_:
-            directories += map(lambda directory: (str(directory), directory.info()),
-                               self.working_directory.children)
-            files += map(lambda file: file.info(),
-                         self.working_directory.files)
-        # name if not list
-        else:
-            directories += map(lambda child: (str(child), f"[#0000FF]{child.name}[/]"),
-                               self.working_directory.children)
-            files += map(str, self.working_directory.files)
-        return list(map(lambda t: t[1], sorted(directories, key=lambda t: t[0]))) \
-            if len(directories) > 0 else None, sorted(files) if len(files) > 0 else None
+                yield label if label is not None else f"[#0000FF]{node.name}[/]"
+
+    def _entries(self, start: Directory, all_: bool, by_size: bool, recursive: bool) \
+            -> typing.Iterator[tuple[Directory | File | None, str | None]]:
+        """Get the entries of ls as nodes with the name to show (or lines without a node)."""
+        stack: list[Directory] = [start]
+        while stack:
+            directory: Directory = stack.pop()
+            if recursive:
+                if directory is not start:
+                    yield None, ""
+                yield None, f"{self.path(directory)}:"
+            children: typing.Iterable[Directory] = directory.children
+            files: typing.Iterable[File] = directory.files
+            if by_size:
+                self._count(directory)
+                children = sorted(children, key=lambda child: child.total_size, reverse=True)
+                files = sorted(files, key=lambda file: file.size, reverse=True)
+            # add . and .. if all
+            if all_:
+                yield directory, "."
+                yield directory.parent if directory.parent else directory, ".."
+            for child in children:
+                yield child, None
+            yield from ((file, None) for file in files)
+            if recursive:
+                stack.extend(reversed(list(children)))
+
+    def tree(self, path: str = ".", max_depth: int | None = None,
+             ignore: typing.Iterable[str] = ()) -> typing.Iterator[str]:
+        """Draw a subtree line by line, using an explicit stack instead of recursion.
+
+        Arguments:
+            - path: the directory to draw.
+            - max_depth: the maximum depth to descend to (unlimited if None).
+            - ignore: glob patterns of names to prune (ignored directories aren't loaded).
+
+        Returns:
+            The lines of the tree, followed by the totals.
+        """
+        start: Directory | File = self.get(path)
+        if isinstance(start, File):
+            yield str(start)
+            yield ""
+            yield "0 directories, 1 file"
+            return
+        yield f"[#0000FF]{path}[/]"
+        patterns: list[re.Pattern] = [utils.file_index.compile_glob(pattern)
+                                      for pattern in ignore]
+
+        def entries(directory: Directory) -> typing.Iterator[Directory | File]:
+            """Get the entries of a directory that aren't pruned."""
+            for node in itertools.chain(directory.children, directory.files):
+                name: str = utils.file_index.name_of(node)
+                if not any(pattern.match(name) for pattern in patterns):
+                    yield node
+
+        directories: int = 0
+        files: int = 0
+        # frames: entries iterator, line prefix, next entry (lookahead to find the last one)
+        root_entries = entries(start)
+        stack: list[tuple[typing.Iterator[Directory | File], str, Directory | File | None]] \
+            = [(root_entries, "", next(root_entries, None))]
+        while stack:
+            iterator, prefix, node = stack[-1]
+            if node is None:
+                stack.pop()
+                continue
+            following: Directory | File | None = next(iterator, None)
+            stack[-1] = (iterator, prefix, following)
+            last: bool = following is None
+            if isinstance(node, Directory):
+                directories += 1
+                yield f"{prefix}{'└── ' if last else '├── '}[#0000FF]{node.name}[/]"
+                if max_depth is None or len(stack) < max_depth:
+                    child_entries = entries(node)
+                    stack.append((child_entries, prefix + ("    " if last else "│   "),
+                                  next(child_entries, None)))
+            else:
+                files += 1
+                yield f"{prefix}{'└── ' if last else '├── '}{node}"
+        yield ""
+        yield f"{directories} {'directory' if directories == 1 else 'directories'}, " \
+            f"{files} {'file' if files == 1 else 'files'}"
+
+    def du(self, path: str = ".", max_depth: int | None = None) \
+            -> typing.Iterator[tuple[int, int, str]]:
+        """Get the disk usage of all directories in a subtree (O(1) per loaded directory).
+
+        Unloaded generated directories are counted and listed without loading them.
+
+        Arguments:
+            - path: the directory.
+            - max_depth: only list directories up to this depth below path.
+
+        Returns:
+            Total size, file count and path of every directory (children before parents).
+        """
+        start: Directory | File = self.get(path)
+        if isinstance(start, File):
+            yield start.size, 1, self.path(start)
+            return
+        self._count(start)
+        copies: list[Directory] = []
+        # iterative post-order, directories of detached copies have no valid totals
+        stack: list[tuple[Directory, int, bool, bool]] = [(start, 0, False, False)]
+        try:
+            while stack:
+                directory, depth, detached, visited = stack.pop()
+                if visited:
+                    if detached:
+                        files: list[File] = [node for node in directory.scan()
+                                             if isinstance(node, File)]
+                        yield sum(file.size for file in files), len(files), \
+                            self.path(directory)
+                    else:
+                        yield directory.total_size, directory.total_files, self.path(directory)
+                    continue
+                stack.append((directory, depth, detached, True))
+                if max_depth is None or depth < max_depth:
+                    if directory.loaded:
+                        children: list[Directory] = directory.children
+                    else:
+                        copy: Directory = directory._detached()  # pylint:disable=protected-access
+                        copies.append(copy)
+                        children = copy.children
+                        detached = True
+                    stack.extend((child, depth + 1, detached, False)
+                                 for child in reversed(children))
+        finally:
+            for copy in copies:
+                copy._drop_contents()  # pylint:disable=protected-access
+
+    def df(self) -> tuple[int, int, int]:
+        """Get the disk usage of the whole file system.
+
+        Returns:
+            Capacity, used size and number of files.
+        """
+        self._count(self.root)
+        return self.capacity, self.root.total_size, self.root.total_files
+
+    def rm(self, path: str, recursive: bool = False) -> str | None:
+        """Remove a file or directory.
+
+        Arguments:
+            - path: the path to remove.
+            - recursive: allow removing directories if True.
+
+        Returns:
+            An error message or None if successful.
+        """
+        try:
+            node: Directory | File = self.get(path)
+        except FileSystem.NoSuchFileException as excp:
+            return f"No such file or directory '{excp}'."
+        if isinstance(node, Directory):
+            if not recursive:
+                return f"'{path}' is a directory."
+            if self._is_below(node, self.working_directory):
+                return f"Can't remove '{path}', it contains the working directory."
+        typing.cast(Directory, node.parent).remove_child(node)
+        return None
 
     def cd(self, path: str) -> str | None:
         """Change directory."""
@@ -0,0 +1,147 @@
+"""Shell-style glob expansion against a virtual file system."""
+
+import bisect
+import dataclasses
+import functools
+import re
+import typing
+
+import utils.file_index
+import utils.file_system
+
+MAGIC: re.Pattern = re.compile(r"[*?\[]")
+"""Characters that make a path a glob pattern."""
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Segment:
+    """One compiled path segment of a glob pattern."""
+    text: str
+    """Text of the segment."""
+    regex: re.Pattern | None
+    """Regex to match names or None if the segment is a literal."""
+    prefix: str
+    """Literal prefix of the segment, used to skip non-matching children."""
+
+    @property
+    def recursive(self) -> bool:
+        """Whether the segment is **."""
+        return self.text == "**"
+
+
+def has_magic(text: str) -> bool:
+    """Check if a text is a glob pattern."""
+    return MAGIC.search(text) is not None
+
+
+@functools.lru_cache(maxsize=256)
+def compile_pattern(pattern: str) -> tuple[Segment, ...]:
+    """Compile a glob pattern once into segments (cached).
+
+    Arguments:
+        - pattern: the glob pattern.
+
+    Returns:
+        The segments (empty first segment for absolute patterns).
+    """
+    segments: list[Segment] = []
+    for part in pattern.split("/"):
+        if not has_magic(part):
+            segments.append(Segment(part, None, part))
+        else:
+            prefix: str = MAGIC.split(part, maxsplit=1)[0]
+            segments.append(Segment(part, utils.file_index.compile_glob(part), prefix))
+    return tuple(segments)
+
+
+def _sorted_range(nodes: list, prefix: str, key: typing.Callable) -> typing.Iterable:
+    """Get all nodes of a sorted list with names starting with prefix (binary search)."""
+    if not prefix:
+        return nodes
+    start: int = bisect.bisect_left(nodes, prefix, key=key)
+    end: int = start
+    while end < len(nodes) and key(nodes[end]).startswith(prefix):
+        end += 1
+    return nodes[start:end]
+
+
+def _match(directory: "utils.file_system.Directory", segment: Segment, last: bool) \
+        -> typing.Iterator["utils.file_system.Directory | utils.file_system.File"]:
+    """Get the children of a directory matching a segment (files only for the last one)."""
+    if segment.regex is None:
+        if segment.text in ("", "."):
+            yield directory
+        elif segment.text == "..":
+            yield directory.parent if directory.parent is not None else directory
+        elif (child := directory.child(segment.text)) is not None:
+            yield child
+        elif last and (file := directory.file(segment.text)) is not None:
+            yield file
+        return
+    # like shells, wildcards don't match hidden names unless the pattern does
+    hidden: bool = segment.text.startswith(".")
+    candidates: list[typing.Iterable] = [_sorted_range(directory.children, segment.prefix,
+                                                       lambda child: child.name)]
+    if last:
+        candidates.append(_sorted_range(directory.files, segment.prefix, str))
+    for nodes in candidates:
+        for node in nodes:
+            name: str = utils.file_index.name_of(node)
+            if (hidden or not name.startswith(".")) and segment.regex.match(name):
+                yield node
+
+
+def expand(pattern: str, file_system: "utils.file_system.FileSystem") -> list[str]:
+    """Expand a glob pattern (*, ?, [...], **) against a file system.
+
+    Literal segments are looked up directly and wildcard segments only look at children
+    starting with their literal prefix, so only the matching parts of the tree are visited.
+
+    Arguments:
+        - pattern: the glob pattern.
+        - file_system: the file system.
+
+    Returns:
+        The matching paths written like the pattern (sorted, empty if nothing matches).
+    """
+    segments: tuple[Segment, ...] = compile_pattern(pattern)
+    start: utils.file_system.Directory = file_system.working_directory
+    prefix: str = ""
+    if segments[0].text == "" and len(segments) > 1:
+        start = file_system.root
+        prefix = "/"
+        segments = segments[1:]
+    # trailing slash: only match directories
+    directories_only: bool = len(segments) > 1 and segments[-1].text == ""
+    if directories_only:
+        segments = segments[:-1]
+    states: list[tuple[utils.file_index.Node, str]] = [(start, prefix)]
+    for index, segment in enumerate(segments):
+        last: bool = index == len(segments) - 1
+        following: list[tuple[utils.file_index.Node, str]] = []
+        for node, path in states:
+            if not isinstance(node, utils.file_system.Directory):
+                continue
+            if segment.recursive:
+                # zero or more directories
+                stack: list[tuple[utils.file_system.Directory, str]] = [(node, path)]
+                while stack:
+                    directory, directory_path = stack.pop()
+                    following.append((directory, directory_path))
+                    if last:
+                        following.extend((file, f"{directory_path}{file}")
+                                         for file in directory.files
+                                         if not str(file).startswith("."))
+                    stack.extend((child, f"{directory_path}{child.name}/")
+                                 for child in reversed(directory.children)
+                                 if not child.name.startswith("."))
+                continue
+            for match in _match(node, segment, last):
+                name: str = segment.text if segment.regex is None \
+                    else utils.file_index.name_of(match)
+                following.append((match, f"{path}{name}" if last else f"{path}{name}/"))
+        states = following
+    # the relative start itself (from **) is not a match
+    return sorted(path.removesuffix("/") or "/" for node, path in states
+                  if path and (not directories_only
+                               or isinstance(node, utils.file_system.Directory)))
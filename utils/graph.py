@@ -0,0 +1,328 @@
+"""Graph backends for networks."""
+
+import array
+import bisect
+import collections
+import itertools
+import operator
+import typing
+
+import networkx
+
+ID_BITS: int = 32
+"""Bits of a node id in an encoded edge."""
+
+
+class CSRGraph:
+    """Undirected graph of int nodes in compressed sparse row (CSR) form.
+
+    Nodes are stored as a sorted array of ints, so a node's id is its index, and the neighbors
+    of all nodes as one array of ids with an array of row offsets. This needs a few bytes per
+    node and edge instead of several dicts.
+
+    Nodes and edges added before the first query are collected and built into the arrays at
+    once. Later additions go into a small mutable delta and removals of edges in the arrays are
+    marked as removed, both are merged into the arrays when they grow beyond compact_threshold
+    edges.
+
+    The methods are the part of the networkx.Graph API used by the network.
+    """
+
+    def __init__(self, compact_threshold: int = 65536) -> None:
+        """Initialize an empty graph.
+
+        Arguments:
+            - compact_threshold: number of edges in the delta that triggers a compaction.
+        """
+        self.compact_threshold: int = compact_threshold
+        self._nodes: array.array = array.array("Q")
+        """Sorted nodes, the index of a node is its id."""
+        self._offsets: array.array = array.array("Q", [0])
+        """Start of the neighbors of each node id in _targets (plus the end)."""
+        self._targets: array.array = array.array("I")
+        """Neighbor ids of all nodes, sorted per node."""
+        self._edges: int = 0
+        self._built: bool = False
+        self._pending_nodes: array.array = array.array("Q")
+        self._pending_edges: array.array = array.array("Q")
+        """Pairs of nodes added before the graph was built."""
+        self._delta: dict[int, set[int]] = {}
+        """Neighbors added after the graph was built (not in the arrays)."""
+        self._delta_edges: int = 0
+        self._removed: set[tuple[int, int]] = set()
+        """Edges in the arrays that were removed (smaller node first)."""
+
+    def __contains__(self, node: int) -> bool:
+        """Check if a node is in the graph."""
+        self._build()
+        return self._id(node) is not None or node in self._delta
+
+    def __len__(self) -> int:
+        """Number of nodes."""
+        return self.number_of_nodes()
+
+    def _id(self, node: int) -> int | None:
+        """Get the id of a node in the arrays (binary search)."""
+        index: int = bisect.bisect_left(self._nodes, node)
+        if index < len(self._nodes) and self._nodes[index] == node:
+            return index
+        return None
+
+    def _row(self, node_id: int) -> array.array:
+        """Get the neighbor ids of a node id."""
+        return self._targets[self._offsets[node_id]:self._offsets[node_id + 1]]
+
+    def _has_base_edge(self, first_node: int, second_node: int) -> bool:
+        """Check if an edge is in the arrays (and not removed)."""
+        if self._removed and _key(first_node, second_node) in self._removed:
+            return False
+        first_id: int | None = self._id(first_node)
+        second_id: int | None = self._id(second_node)
+        if first_id is None or second_id is None:
+            return False
+        start: int = self._offsets[first_id]
+        end: int = self._offsets[first_id + 1]
+        index: int = bisect.bisect_left(self._targets, second_id, start, end)
+        return index < end and self._targets[index] == second_id
+
+    def _build(self) -> None:
+        """Build the arrays from the nodes and edges added before the first query."""
+        if not self._built:
+            self._built = True
+            self.compact()
+
+    def add_node(self, node: int) -> None:
+        """Add a node.
+
+        Arguments:
+            - node: the node.
+        """
+        if not self._built:
+            self._pending_nodes.append(node)
+        elif node not in self:
+            self._delta[node] = set()
+
+    def add_nodes_from(self, nodes: typing.Iterable[int]) -> None:
+        """Add nodes.
+
+        Arguments:
+            - nodes: the nodes.
+        """
+        if not self._built:
+            self._pending_nodes.extend(nodes)
+            return
+        for node in nodes:
+            self.add_node(node)
+
+    def add_edge(self, first_node: int, second_node: int) -> None:
+        """Add an edge (and its nodes).
+
+        Arguments:
+            - first_node: the first node.
+            - second_node: the second node.
+        """
+        if not self._built:
+            self._pending_edges.append(first_node)
+            self._pending_edges.append(second_node)
+            return
+        if first_node == second_node or self.has_edge(first_node, second_node):
+            self.add_node(first_node)
+            return
+        key: tuple[int, int] = _key(first_node, second_node)
+        if key in self._removed:
+            self._removed.discard(key)
+            return
+        self._delta.setdefault(first_node, set()).add(second_node)
+        self._delta.setdefault(second_node, set()).add(first_node)
+        self._delta_edges += 1
+        if self._delta_edges + len(self._removed) > self.compact_threshold:
+            self.compact()
+
+    def add_edges_from(self, edges: typing.Iterable[tuple[int, int]]) -> None:
+        """Add edges (and their nodes).
+
+        Arguments:
+            - edges: the edges as pairs of nodes.
+        """
+        if not self._built:
+            self._pending_edges.extend(itertools.chain.from_iterable(edges))
+            return
+        for first_node, second_node in edges:
+            self.add_edge(first_node, second_node)
+
+    def remove_edge(self, first_node: int, second_node: int) -> None:
+        """Remove an edge (its nodes stay in the graph).
+
+        Arguments:
+            - first_node: the first node.
+            - second_node: the second node.
+        """
+        self._build()
+        added: set[int] | None = self._delta.get(first_node)
+        if added is not None and second_node in added:
+            added.discard(second_node)
+            self._delta[second_node].discard(first_node)
+            self._delta_edges -= 1
+        elif self._has_base_edge(first_node, second_node):
+            self._removed.add(_key(first_node, second_node))
+            if self._delta_edges + len(self._removed) > self.compact_threshold:
+                self.compact()
+        else:
+            raise KeyError((first_node, second_node))
+
+    def edges(self) -> typing.Iterator[tuple[int, int]]:
+        """Get all edges (each once).
+
+        Returns:
+            The edges as pairs of nodes.
+        """
+        self._build()
+        nodes: array.array = self._nodes
+        for node_id, node in enumerate(nodes):
+            for target in self._row(node_id):
+                if target > node_id and (not self._removed
+                                         or (node, nodes[target]) not in self._removed):
+                    yield node, nodes[target]
+        for node, neighbors in self._delta.items():
+            yield from ((node, neighbor) for neighbor in neighbors if node < neighbor)
+
+    def has_edge(self, first_node: int, second_node: int) -> bool:
+        """Check if an edge is in the graph.
+
+        Arguments:
+            - first_node: the first node.
+            - second_node: the second node.
+
+        Returns:
+            True if it is, False otherwise.
+        """
+        self._build()
+        return self._has_base_edge(first_node, second_node) \
+            or second_node in self._delta.get(first_node, ())
+
+    def neighbors(self, node: int) -> typing.Iterator[int]:
+        """Get the neighbors of a node.
+
+        Arguments:
+            - node: the node.
+
+        Returns:
+            The neighbors.
+        """
+        self._build()
+        node_id: int | None = self._id(node)
+        added: set[int] | None = self._delta.get(node)
+        if node_id is None:
+            if added is None:
+                raise KeyError(node)
+            return iter(added)
+        base: typing.Iterator[int] = map(self._nodes.__getitem__, self._row(node_id))
+        if self._removed:
+            base = (neighbor for neighbor in base if _key(node, neighbor) not in self._removed)
+        return base if added is None else itertools.chain(base, added)
+
+    def number_of_nodes(self) -> int:
+        """Get the number of nodes."""
+        self._build()
+        return len(self._nodes) + sum(1 for node in self._delta if self._id(node) is None)
+
+    def number_of_edges(self) -> int:
+        """Get the number of edges."""
+        self._build()
+        return self._edges - len(self._removed) + self._delta_edges
+
+    def compact(self) -> None:
+        """Merge all added nodes and edges into the arrays.
+
+        The added edges are sorted into rows by counting their sources, then each row of the
+        arrays is merged with its added and removed neighbors. Apart from the arrays, only the
+        nodes and the rows being merged are held as Python objects.
+        """
+        old_nodes: array.array = self._nodes
+        old_offsets: array.array = self._offsets
+        old_targets: array.array = self._targets
+        nodes: set[int] = set(old_nodes)
+        nodes.update(self._pending_nodes)
+        nodes.update(self._pending_edges)
+        nodes.update(self._delta)
+        self._nodes = array.array("Q", sorted(nodes))
+        del nodes
+        ids: dict[int, int] = dict(zip(self._nodes, itertools.count()))
+        # old ids map to increasing new ids, so remapped rows stay sorted
+        remap: array.array = array.array("I", map(ids.__getitem__, old_nodes))
+        identity: bool = len(old_nodes) == len(self._nodes)
+        # added edges in both directions as source and target ids, pending edges without self
+        # loops (delta neighbors are already stored for both nodes)
+        first: array.array = array.array("I", map(ids.__getitem__, self._pending_edges[0::2]))
+        second: array.array = array.array("I", map(ids.__getitem__, self._pending_edges[1::2]))
+        not_loop: list[bool] = list(map(operator.ne, first, second))
+        first = array.array("I", itertools.compress(first, not_loop))
+        second = array.array("I", itertools.compress(second, not_loop))
+        del not_loop
+        sources: array.array = first + second
+        targets: array.array = second + first
+        del first, second
+        for node, neighbors in self._delta.items():
+            sources.extend(itertools.repeat(ids[node], len(neighbors)))
+            targets.extend(map(ids.__getitem__, neighbors))
+        removed: dict[int, set[int]] = collections.defaultdict(set)
+        for first_node, second_node in self._removed:
+            removed[ids[first_node]].add(ids[second_node])
+            removed[ids[second_node]].add(ids[first_node])
+        del ids
+        # counting sort of the added edges by source
+        added_offsets: array.array = array.array("Q", bytes(8 * len(self._nodes)))
+        for source in sources:
+            added_offsets[source] += 1
+        added_offsets = array.array("Q", itertools.accumulate(added_offsets, initial=0))
+        position: array.array = added_offsets[:-1]
+        added: array.array = array.array("I", bytes(4 * len(sources)))
+        for source, target in zip(sources, targets):
+            added[position[source]] = target
+            position[source] += 1
+        del sources, targets, position
+        self._targets = array.array("I")
+        self._offsets = array.array("Q", [0])
+        old_id: int = 0
+        for node_id in range(len(self._nodes)):
+            row: typing.Iterable[int] = ()
+            if old_id < len(remap) and remap[old_id] == node_id:
+                row = old_targets[old_offsets[old_id]:old_offsets[old_id + 1]]
+                if not identity:
+                    row = map(remap.__getitem__, row)
+                old_id += 1
+            start: int = added_offsets[node_id]
+            end: int = added_offsets[node_id + 1]
+            if node_id in removed:
+                row = set(row).difference(removed[node_id])
+                row.update(added[start:end])
+                row = sorted(row)
+            elif start < end:
+                row = sorted(set(row).union(added[start:end]))
+            self._targets.extend(row)
+            self._offsets.append(len(self._targets))
+        self._edges = len(self._targets) // 2
+        self._pending_nodes = array.array("Q")
+        self._pending_edges = array.array("Q")
+        self._delta = {}
+        self._delta_edges = 0
+        self._removed = set()
+
+
+def _key(first_node: int, second_node: int) -> tuple[int, int]:
+    """Get the key of an undirected edge (smaller node first)."""
+    return (first_node, second_node) if first_node < second_node else (second_node, first_node)
+
+
+def _encode(sources: typing.Iterable[int], targets: typing.Iterable[int]) -> typing.Iterator[int]:
+    """Encode directed edges between node ids as source id << ID_BITS | target id."""
+    return map(operator.or_, map(operator.lshift, sources, itertools.repeat(ID_BITS)), targets)
+
+
+type Graph = networkx.Graph | CSRGraph
+
+GRAPH_BACKENDS: dict[str, typing.Callable[[], Graph]] = {
+    "networkx": networkx.Graph,
+    "csr": CSRGraph,
+}
+"""Graph backends a network can be loaded with."""
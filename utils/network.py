@@ -1,47 +1,414 @@
 """Everything used for networks."""
 
-import networkx
+import collections
+import dataclasses
+import itertools
+import math
+import operator
+import pathlib
+import time
+import typing
 
+import utils.address_index
+import utils.components
 import utils.device
 import utils.file_system
+import utils.graph
+import utils.regions
+import utils.routing
+import utils.world
+
+WORLD_PATH = pathlib.Path(__file__).resolve().parent.parent / "network.json"
+"""Path of the world file (next to the package, whatever the working directory)."""
+LOAD_BATCH: int = 4096
+"""Number of devices or connections parsed at once when loading a world file."""
+DEVICE_BUDGET: int = 256
+"""Number of constructed devices kept in memory."""
+DEFAULT_WEIGHT: float = 1
+"""Latency of a connection in ms if the world file doesn't say otherwise."""
+DEFAULT_TTL: int = 300
+"""Seconds a DNS answer is cached if the world file doesn't say otherwise."""
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a domain name (lowercase without trailing dot).
+
+    Arguments:
+        - name: the domain name.
+
+    Returns:
+        The normalized name.
+    """
+    return name.lower().rstrip(".")
+
+
+@dataclasses.dataclass(slots=True)
+class Record:
+    """Address record of a domain name."""
+    name: str
+    net_address: utils.device.NPv5Address
+    ttl: int
+    """Seconds resolvers may cache the record."""
+
+
+@dataclasses.dataclass(slots=True)
+class _Zone:
+    """Node of the domain trie (one label)."""
+    children: dict[str, "_Zone"] = dataclasses.field(default_factory=dict)
+    record: Record | None = None
+
+
+@dataclasses.dataclass(slots=True)
+class Answer:
+    """Answer of a resolver."""
+    record: Record
+    ttl: int
+    """Remaining seconds the answer is cached."""
+    cached: bool
+    """Whether the answer came from the cache."""
 
 
 class DNS:
-    """Domain Name System."""
+    """Domain Name System.
+
+    Records are indexed by name, in a trie of reversed labels (zer0 -> search) for zone
+    queries and by address for reverse lookups.
+    """
 
     def __init__(self) -> None:
         """Initialise the DNS."""
-        self._dns: dict[str, utils.device.NPv5Address] = {}
+        self._dns: dict[str, Record] = {}
+        self._zones: _Zone = _Zone()
+        self._reverse: dict[int, list[str]] = {}
+
+    def __len__(self) -> int:
+        """Number of records."""
+        return len(self._dns)
+
+    def add(self, name: str, net_address: utils.device.NPv5Address | str | int,
+            ttl: int = DEFAULT_TTL) -> None:
+        """Add a domain name (replacing an existing record of the name).
+
+        Arguments:
+            - name: the domain name.
+            - net_address: the address of the domain.
+            - ttl: seconds resolvers may cache the record.
+        """
+        name = normalize_name(name)
+        self.remove(name)
+        record = Record(name, utils.device.NPv5Address(net_address), ttl)
+        self._dns[name] = record
+        zone: _Zone = self._zones
+        for label in reversed(name.split(".")):
+            zone = zone.children.setdefault(label, _Zone())
+        zone.record = record
+        self._reverse.setdefault(record.net_address, []).append(name)
+
+    def add_many(self, records: typing.Iterable[tuple[str, str | int, int]]) -> None:
+        """Add many domain names, their addresses are parsed at once (see add).
+
+        Arguments:
+            - records: the domain names with their addresses and TTLs.
+        """
+        records = list(records)
+        addresses: list[utils.device.NPv5Address] = utils.device.NPv5Address.parse_many(
+            net_address for _, net_address, _ in records)
+        for (name, _, ttl), net_address in zip(records, addresses):
+            self.add(name, net_address, ttl)
+
+    def remove(self, name: str) -> None:
+        """Remove a domain name if it exists.
+
+        Arguments:
+            - name: the domain name.
+        """
+        name = normalize_name(name)
+        record: Record | None = self._dns.pop(name, None)
+        if record is None:
+            return
+        path: list[tuple[_Zone, str]] = []
+        zone: _Zone = self._zones
+        for label in reversed(name.split(".")):
+            path.append((zone, label))
+            zone = zone.children[label]
+        zone.record = None
+        # drop zones without records below them
+        for parent, label in reversed(path):
+            child: _Zone = parent.children[label]
+            if child.children or child.record is not None:
+                break
+            del parent.children[label]
+        names: list[str] = self._reverse[record.net_address]
+        names.remove(name)
+        if not names:
+            del self._reverse[record.net_address]
+
+    def get(self, name: str) -> Record | None:
+        """Get the record of a domain name.
+
+        Arguments:
+            - name: the domain name.
+
+        Returns:
+            The record or None if the name doesn't exist.
+        """
+        return self._dns.get(normalize_name(name))
+
+    def reverse(self, net_address: utils.device.NPv5Address | int) -> list[str]:
+        """Get all domain names of an address.
+
+        Arguments:
+            - net_address: the address.
+
+        Returns:
+            The names.
+        """
+        return list(self._reverse.get(net_address, ()))
+
+    def zone(self, name: str) -> list[Record]:
+        """Get all records in a zone (zer0 including zer0 itself or only subdomains with *.zer0).
+
+        Arguments:
+            - name: the zone.
+
+        Returns:
+            The records sorted by name.
+        """
+        name = normalize_name(name)
+        zone: _Zone | None = self._zones
+        for label in reversed(name.removeprefix("*.").split(".")):
+            if zone is None:
+                break
+            zone = zone.children.get(label)
+        if zone is None:
+            return []
+        records: list[Record] = []
+        stack: list[_Zone] = [zone]
+        while stack:
+            current: _Zone = stack.pop()
+            if current.record is not None and (current is not zone or not name.startswith("*.")):
+                records.append(current.record)
+            stack.extend(current.children.values())
+        return sorted(records, key=lambda record: record.name)
+
+
+class Resolver:
+    """Caching resolver of a device, answers are cached for the TTL of their record."""
+
+    def __init__(self, dns: DNS, capacity: int = 1024,
+                 clock: typing.Callable[[], float] = time.monotonic) -> None:
+        """Initialize the resolver.
+
+        Arguments:
+            - dns: the DNS to query.
+            - capacity: maximum number of cached answers.
+            - clock: the clock for TTLs (seconds).
+        """
+        self._dns: DNS = dns
+        self._capacity: int = capacity
+        self._clock: typing.Callable[[], float] = clock
+        self._cache: dict[str, tuple[Record, float]] = {}
+        """Cached records with their expiry time."""
+
+    def resolve(self, name: str) -> Answer | None:
+        """Resolve a domain name.
+
+        Arguments:
+            - name: the domain name.
+
+        Returns:
+            The answer or None if the name doesn't exist.
+        """
+        name = normalize_name(name)
+        now: float = self._clock()
+        cached: tuple[Record, float] | None = self._cache.get(name)
+        if cached is not None:
+            record, expires = cached
+            if expires > now:
+                return Answer(record, math.ceil(expires - now), True)
+            del self._cache[name]
+        record = self._dns.get(name)
+        if record is None:
+            return None
+        if len(self._cache) >= self._capacity:
+            self._evict(now)
+        self._cache[name] = (record, now + record.ttl)
+        return Answer(record, record.ttl, False)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired answers, or the oldest one if none expired."""
+        for name in [name for name, (_, expires) in self._cache.items() if expires <= now]:
+            del self._cache[name]
+        if len(self._cache) >= self._capacity:
+            del self._cache[next(iter(self._cache))]
+
+    def flush(self) -> None:
+        """Drop all cached answers."""
+        self._cache.clear()
 
 
 class Network:
     """Virtual network."""
     # oracle has a network, so everything should be directly accessible here
 
-    def __init__(self) -> None:
-        """Initialize the network."""
-        # oracle as default home -> FIXME: maybe load from file
-        oracle = utils.device.Device.oracle()
-        self._graph: networkx.Graph = networkx.Graph()
-        self._nodes: dict[utils.device.NPv5Address, utils.device.Device] = {}
-        self._home: utils.device.NPv5Address = oracle.net_address
+    def __init__(self, path: pathlib.Path | str | None = None, backend: str = "networkx",
+                 regions: utils.regions.RegionStore | None = None,
+                 capacity: int = DEVICE_BUDGET) -> None:
+        """Initialize a network, the default home network without a world file (see load).
+
+        Arguments:
+            - path: the world file devices are read from on first connect (None for the
+              default home network).
+            - backend: the graph backend (see utils.graph.GRAPH_BACKENDS).
+            - regions: the store for evicted devices (shards in a temporary directory if None).
+            - capacity: number of constructed devices kept in memory.
+        """
+        self._graph: utils.graph.Graph = utils.graph.GRAPH_BACKENDS[backend]()
+        self._nodes: collections.OrderedDict[utils.device.NPv5Address, utils.device.Device] = \
+            collections.OrderedDict()
+        """Constructed devices, least recently used first."""
+        self._records: dict[int, tuple[int, int]] = {}
+        """Offset and length of the records of devices in the world file."""
+        self.regions: utils.regions.RegionStore = \
+            regions if regions is not None else utils.regions.RegionStore()
+        self.capacity: int = capacity
+        self.addresses: utils.address_index.AddressIndex = utils.address_index.AddressIndex()
+        """Sorted addresses of all devices."""
+        self._path: pathlib.Path | None = pathlib.Path(path) if path is not None else None
+        self.dns: DNS = DNS()
+        self._resolvers: dict[int, Resolver] = {}
+        self._weights: dict[tuple[int, int], float] = {}
+        """Weights (latency in ms) of connections that don't have DEFAULT_WEIGHT."""
+        self.router: utils.routing.Router = utils.routing.Router(self._graph, self.weight)
+        self.components: utils.components.Components = utils.components.Components(self._graph)
+        self._home: utils.device.NPv5Address = utils.device.NPv5Address(0)
         self._current: utils.device.NPv5Address = self._home
-        self.add_node(oracle)
-        # FIXME: remove later; for test purposes only
-        zer0 = utils.device.Device.default("zer0's server", 12345)
-        self.add_node(zer0)
-        self.add_connection(oracle.net_address, zer0.net_address)
+        if path is None:
+            oracle: utils.device.Device = utils.device.Device.oracle()
+            self.add_node(oracle)
+            self._home = self._current = oracle.net_address
 
     @property
     def computer(self) -> utils.device.Device:
         """Get the current computer."""
-        return self._nodes[self._current]
+        return self.device(self._current)
 
     @property
     def file_system(self) -> utils.file_system.FileSystem:
         """Get the current computer's filesystem."""
         return self.computer.file_system
 
+    def __contains__(self, net_address: utils.device.NPv5Address) -> bool:
+        """Check if a device is in the network (constructed or not)."""
+        return net_address in self._nodes or net_address in self._records \
+            or net_address in self.regions
+
+    def device(self, net_address: utils.device.NPv5Address) -> utils.device.Device:
+        """Get a device, constructing it from its shard or the world file if not in memory.
+
+        Arguments:
+            - net_address: the address of the device.
+
+        Returns:
+            The device.
+        """
+        device: utils.device.Device | None = self._nodes.get(net_address)
+        if device is None:
+            return self.devices([net_address])[0]
+        self._nodes.move_to_end(net_address)
+        return device
+
+    def devices(self, net_addresses: typing.Iterable[utils.device.NPv5Address]) \
+            -> list[utils.device.Device]:
+        """Get devices, constructing the ones not in memory in bulk.
+
+        Only the last capacity devices stay in memory, the others must not be kept.
+
+        Arguments:
+            - net_addresses: the addresses of the devices.
+
+        Returns:
+            The devices in the order of the addresses.
+        """
+        net_addresses = list(net_addresses)
+        missing: list[utils.device.NPv5Address] = list(dict.fromkeys(
+            net_address for net_address in net_addresses if net_address not in self._nodes))
+        if missing:
+            stored: list[tuple[utils.device.NPv5Address, dict]] = []
+            unread: list[utils.device.NPv5Address] = []
+            for net_address in missing:
+                if (record := self.regions.get(net_address)) is not None:
+                    stored.append((net_address, record))
+                elif self._path is None or net_address not in self._records:
+                    raise KeyError(net_address)
+                else:
+                    unread.append(net_address)
+            records: list[dict] = utils.world.read_records(
+                self._path, map(self._records.__getitem__, unread)) if unread else []
+            for device in utils.device.Device.from_records(
+                    itertools.chain(stored, zip(unread, records))):
+                self._nodes[device.net_address] = device
+        for net_address in net_addresses:
+            self._nodes.move_to_end(net_address)
+        devices: list[utils.device.Device] = list(map(self._nodes.__getitem__, net_addresses))
+        self._evict()
+        return devices
+
+    def _evict(self) -> None:
+        """Evict the least recently used devices beyond the capacity (except home and current).
+
+        Devices that differ from their world record are written to the shards of their regions,
+        the others are constructed from the world file again.
+        """
+        excess: int = len(self._nodes) - self.capacity
+        if excess <= 0:
+            return
+        evicted: list[utils.device.NPv5Address] = list(itertools.islice(
+            (net_address for net_address in self._nodes
+             if net_address != self._home and net_address != self._current), excess))
+        modified: list[tuple[int, dict]] = []
+        for net_address in evicted:
+            device: utils.device.Device = self._nodes.pop(net_address)
+            self._resolvers.pop(net_address, None)
+            if net_address not in self._records or not device.file_system.root.pristine():
+                modified.append((net_address, device.to_record()))
+            device.file_system.drop()
+        if modified:
+            self.regions.put_many(modified)
+
+    def ports(self, net_address: utils.device.NPv5Address | int) -> tuple[int, ...]:
+        """Get the open ports of a device without constructing it.
+
+        Arguments:
+            - net_address: the address of the device.
+
+        Returns:
+            The ports.
+        """
+        device: utils.device.Device | None = self._nodes.get(net_address)
+        if device is not None:
+            return device.ports
+        if (record := self.regions.get(net_address)) is not None:
+            return utils.device.Device.record_ports(record)
+        if self._path is None:
+            raise KeyError(net_address)
+        offset, length = self._records[net_address]
+        return utils.device.Device.record_ports(
+            utils.world.read_record(self._path, offset, length))
+
+    def distance(self, target: utils.device.NPv5Address | int) -> float | None:
+        """Get the latency of the shortest route from the current node.
+
+        Arguments:
+            - target: the address of the target.
+
+        Returns:
+            The latency in ms or None if there is no route.
+        """
+        if not self.components.connected(self._current, target):
+            return None
+        return self.router.distance(self._current, target)
+
     def add_node(self, node: utils.device.Device) -> None:
         """Add a node to the network.
 
@@ -50,18 +417,94 @@ class Network:
         """
         self._graph.add_node(node.net_address)
         self._nodes[node.net_address] = node
+        self.addresses.add(node.net_address)
+        self._records.pop(node.net_address, None)
+        self._evict()
 
     def add_connection(self, first_node: utils.device.NPv5Address | str | int,
-                       second_node: utils.device.NPv5Address | str | int) -> None:
+                       second_node: utils.device.NPv5Address | str | int,
+                       weight: float = DEFAULT_WEIGHT) -> None:
         """Add a connection between two nodes (two-directional).
 
         Arguments:
             - first_node: the IP of the first node of the connection.
             - second_node: the IP of the second node of the connection.
+            - weight: the latency of the connection in ms.
         """
         first_node = utils.device.NPv5Address(first_node)
         second_node = utils.device.NPv5Address(second_node)
+        if self._graph.has_edge(first_node, second_node):
+            if weight != self.weight(first_node, second_node):
+                self._set_weight(first_node, second_node, weight)
+                self.router.clear()
+            return
         self._graph.add_edge(first_node, second_node)
+        self._set_weight(first_node, second_node, weight)
+        self.router.added(first_node, second_node, weight)
+        self.components.added(first_node, second_node)
+
+    def remove_connection(self, first_node: utils.device.NPv5Address | str | int,
+                          second_node: utils.device.NPv5Address | str | int) -> bool:
+        """Remove the connection between two nodes.
+
+        Arguments:
+            - first_node: the IP of the first node of the connection.
+            - second_node: the IP of the second node of the connection.
+
+        Returns:
+            True if the connection existed, False otherwise.
+        """
+        first_node = utils.device.NPv5Address(first_node)
+        second_node = utils.device.NPv5Address(second_node)
+        if not self._graph.has_edge(first_node, second_node):
+            return False
+        self._graph.remove_edge(first_node, second_node)
+        self._set_weight(first_node, second_node, DEFAULT_WEIGHT)
+        self.router.removed(first_node, second_node)
+        self.components.removed()
+        return True
+
+    def _set_weight(self, first_node: int, second_node: int, weight: float) -> None:
+        """Set the weight of a connection."""
+        key: tuple[int, int] = (min(first_node, second_node), max(first_node, second_node))
+        if weight == DEFAULT_WEIGHT:
+            self._weights.pop(key, None)
+        else:
+            self._weights[key] = weight
+
+    def weight(self, first_node: int, second_node: int) -> float:
+        """Get the weight of the connection between two nodes.
+
+        Arguments:
+            - first_node: the first node of the connection.
+            - second_node: the second node of the connection.
+
+        Returns:
+            The latency of the connection in ms.
+        """
+        if not self._weights:
+            return DEFAULT_WEIGHT
+        return self._weights.get((min(first_node, second_node), max(first_node, second_node)),
+                                 DEFAULT_WEIGHT)
+
+    def route(self, target: utils.device.NPv5Address | str | int,
+              source: utils.device.NPv5Address | str | int | None = None) \
+            -> list[utils.device.NPv5Address] | None:
+        """Get the shortest route between two nodes by latency.
+
+        Arguments:
+            - target: address or domain name of the target.
+            - source: address or domain name of the source, the current node by default.
+
+        Returns:
+            The nodes of the route from source to target or None if there is none.
+        """
+        source = self._current if source is None else self.lookup(source)
+        target = self.lookup(target)
+        if source is None or target is None:
+            return None
+        path: list[int] | None = self.router.path(source, target)
+        return None if path is None else list(map(utils.device.NPv5Address, path))
 
     def scan(self) -> list[utils.device.NPv5Address]:
         """Get all nodes connected to the current node.
@@ -69,37 +512,139 @@ class Network:
         Returns:
             All connected nodes.
         """
-        return list(self._graph.neighbors(self._current))
+        return list(map(utils.device.NPv5Address, self._graph.neighbors(self._current)))
+
+    def reachable(self) -> list[utils.device.NPv5Address]:
+        """Get all nodes reachable from the current node.
+
+        Returns:
+            The reachable nodes (sorted, without the current node).
+        """
+        return [utils.device.NPv5Address(node)
+                for node in sorted(self.components.component(self._current))
+                if node != self._current]
+
+    @property
+    def resolver(self) -> Resolver:
+        """Get the resolver of the current computer."""
+        resolver: Resolver | None = self._resolvers.get(self._current)
+        if resolver is None:
+            resolver = self._resolvers[self._current] = Resolver(self.dns)
+        return resolver
+
+    def lookup(self, target: utils.device.NPv5Address | str | int) \
+            -> utils.device.NPv5Address | None:
+        """Get the address of a target given as address or domain name.
+
+        Arguments:
+            - target: the address or domain name.
+
+        Returns:
+            The address or None if the name doesn't resolve.
+        """
+        if isinstance(target, str) and not utils.device.NPv5Address.PATTERN.fullmatch(target):
+            answer: Answer | None = self.resolver.resolve(target)
+            return answer.record.net_address if answer is not None else None
+        try:
+            return utils.device.NPv5Address(target)
+        except TypeError:
+            return None
 
     def connect(self, net_address: utils.device.NPv5Address | str | int) -> bool:
-        """Connect to a node.
+        """Connect to a node reachable from the current node.
 
         Arguments:
-            - ip_address: IP of the node to connect to.
+            - net_address: address or domain name of the node to connect to.
 
         Returns:
             True if successful, False otherwise.
         """
-        net_address = utils.device.NPv5Address(net_address)
-        if net_address in self._nodes:
+        net_address = self.lookup(net_address)
+        if net_address is not None and net_address in self \
+                and self.components.connected(self._current, net_address):
+            self._leave()
             self._current = net_address
             return True
         return False
 
     def disconnect(self) -> None:
         """Disconnect from a node."""
+        self._leave()
         self._current = self._home
 
+    def _leave(self) -> None:
+        """Release generated content of the current node before leaving it (if in memory)."""
+        device: utils.device.Device | None = self._nodes.get(self._current)
+        if self._current != self._home and device is not None:
+            device.file_system.release()
+
     @classmethod
-    def _load(cls) -> "Network":
-        """Load network from (save?) file."""
-        return Network()
+    def load(cls, path: pathlib.Path | str = WORLD_PATH, backend: str = "networkx",
+             regions: utils.regions.RegionStore | None = None,
+             capacity: int = DEVICE_BUDGET) -> "Network":
+        """Load a network from a world file.
+
+        The file is streamed: only the address index, DNS and connections are built here, each
+        device is constructed from its record on first access and evicted again when it is
+        among the least recently used beyond the capacity.
+
+        Arguments:
+            - path: path of the world file.
+            - backend: the graph backend, "csr" keeps large worlds compact.
+            - regions: the store for evicted devices (shards in a temporary directory if None).
+            - capacity: number of constructed devices kept in memory.
+
+        Returns:
+            The network.
+        """
+        network = cls(path, backend, regions, capacity)
+        home: str | int = 0
+        with utils.world.WorldReader(path) as reader:
+            for section in reader.sections():
+                match section:
+                    case "home":
+                        home = reader.value()
+                    case "dns":
+                        dns: dict[str, typing.Any] = reader.value()
+                        network.dns.add_many(
+                            (name, record["address"], record.get("ttl", DEFAULT_TTL))
+                            if isinstance(record, dict) else (name, record, DEFAULT_TTL)
+                            for name, record in dns.items())
+                        del dns
+                    case "devices":
+                        for keys, offsets, lengths in reader.records():
+                            addresses = utils.device.NPv5Address.values_many(keys)
+                            network._graph.add_nodes_from(addresses)
+                            network.addresses.add_many(addresses)
+                            network._records.update(zip(addresses, zip(offsets, lengths)))
+                    case "edges":
+                        # small enough to be decoded at once, processed in batches
+                        for batch in itertools.batched(reader.value(), LOAD_BATCH):
+                            firsts = utils.device.NPv5Address.values_many(
+                                map(operator.itemgetter(0), batch))
+                            seconds = utils.device.NPv5Address.values_many(
+                                map(operator.itemgetter(1), batch))
+                            network._graph.add_edges_from(zip(firsts, seconds))
+                            # optional third value: latency
+                            for first_node, second_node, edge in itertools.compress(
+                                    zip(firsts, seconds, batch), map((2).__lt__, map(len, batch))):
+                                network._set_weight(first_node, second_node, edge[2])
+                    case _:
+                        reader.value()
+        network._home = network._current = utils.device.NPv5Address(home)
+        return network
 
     @classmethod
     def _store(cls) -> None:
         """Store network in (save?) file."""
 
 
-# TODO: load?; technically everything should go into the save file, but the network is not \
-# player dependent
-NETWORK = Network()
+def __getattr__(name: str) -> typing.Any:
+    """Load NETWORK from the world file on first use instead of on import."""
+    if name == "NETWORK":
+        # TODO: technically everything should go into the save file, but the network is not \
+        # player dependent
+        network: Network = Network.load()
+        globals()["NETWORK"] = network
+        return network
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
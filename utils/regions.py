@@ -0,0 +1,122 @@
+"""Region shards of devices on disk."""
+
+import collections
+import json
+import os
+import pathlib
+import tempfile
+import typing
+
+REGION_BITS: int = 16
+"""Host bits of an address in its region (a region is a /48 block)."""
+SHARD_CACHE: int = 8
+"""Number of parsed shards kept in memory."""
+
+
+def region_of(net_address: int) -> int:
+    """Get the region of an address.
+
+    Arguments:
+        - net_address: the address.
+
+    Returns:
+        The region (the address without its host bits).
+    """
+    return net_address >> REGION_BITS
+
+
+class RegionStore:
+    """Device records stored in one shard file per region.
+
+    The world file is never written: devices evicted from memory that differ from their world
+    record are stored in the shard of their region and read from there instead. A shard is
+    rewritten (atomically) once per eviction batch and the parsed shards of the most recently
+    used regions are cached.
+    """
+
+    def __init__(self, directory: pathlib.Path | str | None = None,
+                 cache: int = SHARD_CACHE) -> None:
+        """Initialize the store.
+
+        Arguments:
+            - directory: the directory of the shards (a temporary one for the session if None).
+            - cache: number of parsed shards kept in memory.
+        """
+        self._temporary: tempfile.TemporaryDirectory | None = None
+        self._directory: pathlib.Path | None = None
+        self._regions: set[int] = set()
+        """Regions with a shard file."""
+        if directory is not None:
+            self._directory = pathlib.Path(directory)
+            self._regions = {int(path.stem, 16) for path in self._directory.glob("*.json")}
+        self._cache: int = cache
+        self._shards: collections.OrderedDict[int, dict[int, dict]] = collections.OrderedDict()
+
+    def __contains__(self, net_address: int) -> bool:
+        """Check if a device is stored."""
+        return self.get(net_address) is not None
+
+    @property
+    def directory(self) -> pathlib.Path:
+        """Directory of the shards (created on first access)."""
+        if self._directory is None:
+            # removed when the store is garbage collected or at exit
+            self._temporary = tempfile.TemporaryDirectory(prefix="regions-")
+            self._directory = pathlib.Path(self._temporary.name)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        return self._directory
+
+    def _path(self, region: int) -> pathlib.Path:
+        """Get the path of the shard of a region."""
+        return self.directory / f"{region:012X}.json"
+
+    def _shard(self, region: int) -> dict[int, dict]:
+        """Get the parsed shard of a region (empty if there is no file)."""
+        shard: dict[int, dict] | None = self._shards.get(region)
+        if shard is not None:
+            self._shards.move_to_end(region)
+            return shard
+        shard = {}
+        if region in self._regions:
+            with self._path(region).open(encoding="utf-8") as file:
+                shard = {int(net_address): record
+                         for net_address, record in json.load(file).items()}
+        self._shards[region] = shard
+        if len(self._shards) > self._cache:
+            self._shards.popitem(last=False)
+        return shard
+
+    def get(self, net_address: int) -> dict[str, typing.Any] | None:
+        """Get the stored record of a device.
+
+        Arguments:
+            - net_address: the address of the device.
+
+        Returns:
+            The record or None if the device is not stored.
+        """
+        region: int = region_of(net_address)
+        if region not in self._regions:
+            return None
+        return self._shard(region).get(net_address)
+
+    def put_many(self, records: typing.Iterable[tuple[int, dict[str, typing.Any]]]) -> None:
+        """Store device records, every touched shard is written once.
+
+        Arguments:
+            - records: the addresses and records of the devices.
+        """
+        regions: dict[int, list[tuple[int, dict]]] = {}
+        for net_address, record in records:
+            regions.setdefault(region_of(net_address), []).append((net_address, record))
+        for region, items in regions.items():
+            shard: dict[int, dict] = self._shard(region)
+            shard.update(items)
+            path: pathlib.Path = self._path(region)
+            temporary: pathlib.Path = path.with_suffix(".tmp")
+            with temporary.open("w", encoding="utf-8") as file:
+                json.dump({str(net_address): record for net_address, record in shard.items()},
+                          file, separators=(",", ":"))
+            # readers never see a partly written shard
+            os.replace(temporary, path)
+            self._regions.add(region)
@@ -0,0 +1,167 @@
+"""Shortest routes through networks."""
+
+import collections
+import heapq
+import math
+import typing
+
+import utils.graph
+
+
+class _Search:
+    """Resumable Dijkstra search from one source.
+
+    Nodes are only settled until the asked target is, so later queries continue where the last
+    one stopped and queries for settled targets only walk back the path.
+    """
+    __slots__ = ("distances", "previous", "heap", "settled", "radius")
+
+    def __init__(self, source: int) -> None:
+        """Initialize the search.
+
+        Arguments:
+            - source: the source node.
+        """
+        self.distances: dict[int, float] = {source: 0}
+        self.previous: dict[int, int | None] = {source: None}
+        self.heap: list[tuple[float, int]] = [(0, source)]
+        self.settled: set[int] = set()
+        self.radius: float = 0
+        """Distance of the last settled node."""
+
+
+class Router:
+    """Shortest paths by link weight (hops if all weights are 1), cached per source.
+
+    The searches of the most recently used sources are kept. Adding a link only updates the
+    searches it shortens a path in: a shorter path to an unsettled node that is not shorter
+    than the settled ones is pushed like Dijkstra would have done, any other shorter path
+    drops the search.
+    """
+
+    def __init__(self, graph: utils.graph.Graph, weight: typing.Callable[[int, int], float],
+                 capacity: int = 16) -> None:
+        """Initialize the router.
+
+        Arguments:
+            - graph: the graph to route through.
+            - weight: function giving the weight of the link between two nodes.
+            - capacity: number of sources whose searches are kept.
+        """
+        self._graph: utils.graph.Graph = graph
+        self._weight: typing.Callable[[int, int], float] = weight
+        self._capacity: int = capacity
+        self._searches: collections.OrderedDict[int, _Search] = collections.OrderedDict()
+
+    def _search(self, source: int) -> _Search:
+        """Get the cached search of a source or start a new one."""
+        search: _Search | None = self._searches.get(source)
+        if search is None:
+            search = self._searches[source] = _Search(source)
+            if len(self._searches) > self._capacity:
+                self._searches.popitem(last=False)
+        else:
+            self._searches.move_to_end(source)
+        return search
+
+    def _settle(self, search: _Search, target: int) -> bool:
+        """Continue a search until the target is settled.
+
+        Returns:
+            True if the target is reachable, False otherwise.
+        """
+        distances, previous, heap, settled = \
+            search.distances, search.previous, search.heap, search.settled
+        while target not in settled:
+            if not heap:
+                return False
+            distance, node = heapq.heappop(heap)
+            if node in settled or distance > distances[node]:
+                continue
+            settled.add(node)
+            search.radius = distance
+            for neighbor in self._graph.neighbors(node):
+                candidate: float = distance + self._weight(node, neighbor)
+                if candidate < distances.get(neighbor, math.inf):
+                    distances[neighbor] = candidate
+                    previous[neighbor] = node
+                    heapq.heappush(heap, (candidate, neighbor))
+        return True
+
+    def path(self, source: int, target: int) -> list[int] | None:
+        """Get a shortest path between two nodes.
+
+        Arguments:
+            - source: the source node.
+            - target: the target node.
+
+        Returns:
+            The nodes of the path from source to target or None if there is none.
+        """
+        if source not in self._graph or target not in self._graph:
+            return None
+        search: _Search = self._search(source)
+        if not self._settle(search, target):
+            return None
+        path: list[int] = []
+        node: int | None = target
+        while node is not None:
+            path.append(node)
+            node = search.previous[node]
+        path.reverse()
+        return path
+
+    def distance(self, source: int, target: int) -> float | None:
+        """Get the shortest distance between two nodes.
+
+        Arguments:
+            - source: the source node.
+            - target: the target node.
+
+        Returns:
+            The sum of the link weights or None if there is no path.
+        """
+        if source not in self._graph or target not in self._graph:
+            return None
+        search: _Search = self._search(source)
+        return search.distances[target] if self._settle(search, target) else None
+
+    def added(self, first_node: int, second_node: int, weight: float) -> None:
+        """Update the cached searches for a new link.
+
+        Arguments:
+            - first_node: the first node of the link.
+            - second_node: the second node of the link.
+            - weight: the weight of the link.
+        """
+        for source, search in list(self._searches.items()):
+            for node, neighbor in ((first_node, second_node), (second_node, first_node)):
+                if node not in search.settled:
+                    continue
+                candidate: float = search.distances[node] + weight
+                if candidate >= search.distances.get(neighbor, math.inf):
+                    continue
+                if neighbor in search.settled or candidate < search.radius:
+                    del self._searches[source]
+                    break
+                search.distances[neighbor] = candidate
+                search.previous[neighbor] = node
+                heapq.heappush(search.heap, (candidate, neighbor))
+
+    def removed(self, first_node: int, second_node: int) -> None:
+        """Update the cached searches for a removed link.
+
+        Only searches that reached a node over the link are dropped, the others never used it.
+
+        Arguments:
+            - first_node: the first node of the link.
+            - second_node: the second node of the link.
+        """
+        for source, search in list(self._searches.items()):
+            if search.previous.get(first_node) == second_node \
+                    or search.previous.get(second_node) == first_node:
+                del self._searches[source]
+
+    def clear(self) -> None:
+        """Drop all cached searches."""
+        self._searches.clear()
@@ -1,11 +1,35 @@
 """Save stuff."""
 
 import datetime
+import json
+import os
 import pathlib
+import tempfile
+import threading
+import typing
 
 import pydantic
 
+import utils.save_file
+
 SAVES_PATH = pathlib.Path("saves")
+INDEX_PATH = SAVES_PATH / "index.json"
+"""Index of the newest save of each user."""
+TIME_FORMAT: str = "%Y-%m-%dT%H-%M-%S"
+"""Format of the time in save filenames."""
+SAVE_SUFFIX: str = ".save"
+"""Suffix of snapshots (sectioned binary files, see utils.save_file)."""
+SNAPSHOT_SUFFIXES: tuple[str, ...] = (SAVE_SUFFIX, ".json")
+"""Suffixes of snapshots, JSON snapshots are older or exported saves."""
+PROFILE_FIELDS: tuple[str, ...] = ("username", "password", "money")
+"""Fields in the profile section of a snapshot, every other field has a section of its own."""
+COMPACT_ENTRIES: int = 32
+"""Number of journal entries after which the next save writes a new snapshot."""
+KEEP_SNAPSHOTS: int = 3
+"""Number of snapshots of a user kept when old ones are pruned."""
+SAVES_LOCK: threading.RLock = threading.RLock()
+"""Lock of everything in the saves directory, saves are written by the UI and the autosave
+worker."""
 
 
 class Save(pydantic.BaseModel):
@@ -15,17 +39,71 @@ class Save(pydantic.BaseModel):
     money: int
     programs: list[str]
     files: list[str]
+    _saved: dict[str, typing.Any] | None = pydantic.PrivateAttr(default=None)
+    """State at the last save or load (None if never saved)."""
+    _entries: int = pydantic.PrivateAttr(default=0)
+    """Number of entries in the journal after the snapshot."""
 
     @pydantic.computed_field
     @property
     def filename(self) -> str:
         """Filename of the save."""
-        return f"{self.username}_{datetime.datetime.now().strftime('%Y-%m-%dT%H-%M-%S')}.json"
+        return f"{self.username}_{datetime.datetime.now().strftime(TIME_FORMAT)}{SAVE_SUFFIX}"
+
+    def _state(self) -> dict[str, typing.Any]:
+        """Get the saved fields."""
+        return self.model_dump(exclude={"filename"})
+
+    def sections(self) -> dict[str, bytes]:
+        """Get the sections of a snapshot (the profile and one per other field, as JSON).
+
+        Returns:
+            The sections by name.
+        """
+        state: dict[str, typing.Any] = self._state()
+        sections: dict[str, bytes] = {"profile": json.dumps(
+            {key: state.pop(key) for key in PROFILE_FIELDS}).encode()}
+        sections.update((key, json.dumps(value).encode()) for key, value in state.items())
+        return sections
 
     def save(self) -> None:
-        """Save the save as a file."""
-        pathlib.Path.joinpath(SAVES_PATH, self.filename).write_text(
-            data=self.model_dump_json(), encoding="utf-8")
+        """Save the changes since the last save or load.
+
+        The changes are appended to the journal of the user. The first save and every save
+        after COMPACT_ENTRIES journal entries write a new snapshot instead.
+        """
+        state: dict[str, typing.Any] = self._state()
+        if self._saved is None or self._entries >= COMPACT_ENTRIES:
+            self.snapshot()
+            return
+        changes: dict[str, dict[str, typing.Any]] = _diff(self._saved, state)
+        if changes:
+            with SAVES_LOCK, journal_path(self.username).open("a", encoding="utf-8") as file:
+                file.write(json.dumps(changes) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            self._entries += 1
+        self._saved = state
+
+    def snapshot(self) -> None:
+        """Save the whole save as a new snapshot and start a new journal (compaction).
+
+        The index is updated before the journal is replaced: after a crash the index either
+        points to the old snapshot with its journal or to the new one that contains it.
+        """
+        filename: str = self.filename
+        data: bytes = utils.save_file.encode(self.sections())
+        # the index is read, changed and written, nothing may write it in between
+        with SAVES_LOCK:
+            write_atomic(SAVES_PATH / filename, data)
+            index: dict[str, IndexEntry] = read_index()
+            index[self.username] = IndexEntry.of(filename)
+            _write_index(index)
+            write_atomic(journal_path(self.username),
+                         (json.dumps({"snapshot": filename}) + "\n").encode())
+            prune(self.username)
+        self._saved = self._state()
+        self._entries = 0
 
     @classmethod
     def create(cls, username: str, password: str) -> "Save":
@@ -41,17 +119,305 @@ class Save(pydantic.BaseModel):
         return Save(username=username, password=password, money=100, programs=[], files=[])
 
 
+class Profile(pydantic.BaseModel):
+    """Profile section of a save (all the login needs)."""
+    username: str
+    password: str
+    money: int
+
+
+class IndexEntry(pydantic.BaseModel):
+    """Newest save of a user in the index."""
+    filename: str
+    saved: datetime.datetime
+    """Time of the save."""
+
+    @classmethod
+    def of(cls, filename: str) -> "IndexEntry":
+        """Create the entry of a save file.
+
+        Arguments:
+            - filename: the filename of the save (username_time.save).
+
+        Returns:
+            The entry.
+        """
+        return cls(filename=filename, saved=datetime.datetime.strptime(
+            pathlib.Path(filename).stem.split("_", 1)[1], TIME_FORMAT))
+
+
+INDEX_ADAPTER: pydantic.TypeAdapter = pydantic.TypeAdapter(dict[str, IndexEntry])
+"""Validator of the index file."""
+
+
+def journal_path(username: str) -> pathlib.Path:
+    """Get the path of the journal of a user.
+
+    Arguments:
+        - username: the username.
+
+    Returns:
+        The path.
+    """
+    return SAVES_PATH / f"{username}.journal"
+
+
+def _diff(old: dict[str, typing.Any], new: dict[str, typing.Any]) \
+        -> dict[str, dict[str, typing.Any]]:
+    """Get the journal entry for the changes between two states.
+
+    Lists that only grew are stored as their new items (extend), other changes as the new value
+    (set).
+    """
+    changes: dict[str, dict[str, typing.Any]] = {}
+    for key, value in new.items():
+        if value == old.get(key):
+            continue
+        previous: typing.Any = old.get(key)
+        if isinstance(value, list) and isinstance(previous, list) \
+                and value[:len(previous)] == previous:
+            changes.setdefault("extend", {})[key] = value[len(previous):]
+        else:
+            changes.setdefault("set", {})[key] = value
+    return changes
+
+
+def _replay(state: dict[str, typing.Any], journal: pathlib.Path, snapshot: str) -> int | None:
+    """Apply the entries of a journal to the state of its snapshot.
+
+    Reading stops at a partly written last entry (after a crash), entries appended after it
+    would be lost, so the journal can't be continued.
+
+    Returns:
+        The number of applied entries or None if the journal doesn't belong to the snapshot or
+        can't be continued.
+    """
+    try:
+        with journal.open(encoding="utf-8") as file:
+            lines: list[str] = file.readlines()
+        if not lines or json.loads(lines[0]).get("snapshot") != snapshot:
+            return None
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    entries: int = 0
+    try:
+        for line in lines[1:]:
+            changes: dict[str, dict[str, typing.Any]] = json.loads(line)
+            state.update(changes.get("set", {}))
+            for key, items in changes.get("extend", {}).items():
+                # sections that were not read are skipped
+                if key in state:
+                    state[key] = state[key] + items
+            entries += 1
+    except json.JSONDecodeError:
+        return None
+    return entries
+
+
+def prune(username: str, keep: int = KEEP_SNAPSHOTS) -> list[pathlib.Path]:
+    """Delete old snapshots of a user (never the one in the index).
+
+    Arguments:
+        - username: the username.
+        - keep: the number of newest snapshots to keep.
+
+    Returns:
+        The deleted snapshots.
+    """
+    with SAVES_LOCK:
+        newest: IndexEntry | None = read_index().get(username)
+        snapshots: list[pathlib.Path] = sorted(_snapshots(f"{username}_*"), reverse=True)
+        deleted: list[pathlib.Path] = [snapshot for snapshot in snapshots[keep:]
+                                       if newest is None or snapshot.name != newest.filename]
+        for snapshot in deleted:
+            snapshot.unlink()
+    return deleted
+
+
+def _snapshots(pattern: str) -> list[pathlib.Path]:
+    """Get the snapshots whose filenames match a glob pattern."""
+    return [path for path in SAVES_PATH.glob(pattern) if path.suffix in SNAPSHOT_SUFFIXES]
+
+
+def write_atomic(path: pathlib.Path, data: bytes) -> None:
+    """Write a file atomically, a crash leaves the old or the new content.
+
+    The data is written to a temporary file that is synced to disk before it replaces the file,
+    the directory is synced as well so the rename is durable. Temporary files have unique
+    names, so writers of the same file never replace each other's.
+
+    Arguments:
+        - path: the path of the file.
+        - data: the content.
+    """
+    with tempfile.NamedTemporaryFile("wb", dir=path.parent, prefix=f"{path.name}.",
+                                     suffix=".tmp", delete=False) as file:
+        try:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        except BaseException:
+            file.close()
+            os.unlink(file.name)
+            raise
+    os.replace(file.name, path)
+    directory: int = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+
+def _write_index(index: dict[str, IndexEntry]) -> None:
+    """Write the index atomically."""
+    write_atomic(INDEX_PATH, INDEX_ADAPTER.dump_json(index))
+
+
+def rebuild_index() -> dict[str, IndexEntry]:
+    """Rebuild the index from the filenames of all saves (no save is parsed).
+
+    Returns:
+        The index.
+    """
+    newest: dict[str, str] = {}
+    with SAVES_LOCK:
+        # sorted by user, then time: the newest save of a user comes last
+        for file in sorted(_snapshots("*_*")):
+            newest[file.name.split("_")[0]] = file.name
+        index: dict[str, IndexEntry] = {user: IndexEntry.of(filename)
+                                        for user, filename in newest.items()}
+        _write_index(index)
+    return index
+
+
+def read_index() -> dict[str, IndexEntry]:
+    """Read the index, it is rebuilt if it is missing or invalid.
+
+    Returns:
+        The newest save of each user.
+    """
+    with SAVES_LOCK:
+        try:
+            return INDEX_ADAPTER.validate_json(INDEX_PATH.read_bytes())
+        except (FileNotFoundError, pydantic.ValidationError):
+            return rebuild_index()
+
+
+def get_users() -> list[str]:
+    """Get all users with a save.
+
+    Returns:
+        The usernames.
+    """
+    return list(read_index())
+
+
+def _read_snapshot(filename: str, profile_only: bool = False) -> dict[str, typing.Any]:
+    """Read the state in a snapshot.
+
+    Arguments:
+        - filename: the filename of the snapshot.
+        - profile_only: read only the profile section (JSON snapshots are read completely).
+
+    Returns:
+        The state.
+    """
+    path: pathlib.Path = SAVES_PATH / filename
+    if path.suffix == ".json":
+        state: dict[str, typing.Any] = json.loads(path.read_text(encoding="utf-8"))
+        state.pop("filename", None)
+        return state
+    with utils.save_file.SaveFile(path) as file:
+        state = json.loads(file.read("profile"))
+        if not profile_only:
+            for name in file.names:
+                if name != "profile":
+                    state[name] = json.loads(file.read(name))
+    return state
+
+
+def _load_state(username: str, profile_only: bool = False) \
+        -> tuple[dict[str, typing.Any], int | None] | None:
+    """Load the state of the newest snapshot of a user with its journal replayed.
+
+    Returns:
+        The state and the number of journal entries (see _replay) or None if the user has no
+        save.
+    """
+    # a snapshot written in between would replace the journal of the one being read
+    with SAVES_LOCK:
+        entry: IndexEntry | None = read_index().get(username)
+        if entry is None:
+            return None
+        try:
+            state: dict[str, typing.Any] = _read_snapshot(entry.filename, profile_only)
+        except FileNotFoundError:
+            # deleted by hand, fall back to an older snapshot if there is one
+            entry = rebuild_index().get(username)
+            if entry is None:
+                return None
+            state = _read_snapshot(entry.filename, profile_only)
+        return state, _replay(state, journal_path(username), entry.filename)
+
+
+def load_profile(username: str) -> Profile | None:
+    """Load the profile of a user, only the profile section of the newest snapshot is read.
+
+    Arguments:
+        - username: the username.
+
+    Returns:
+        The profile or None if the user has no save.
+    """
+    loaded: tuple[dict[str, typing.Any], int | None] | None = _load_state(username, True)
+    if loaded is None:
+        return None
+    return Profile.model_validate({key: loaded[0][key] for key in PROFILE_FIELDS})
+
+
+def load_save(username: str) -> Save | None:
+    """Load the newest save of a user (the newest snapshot with its journal replayed).
+
+    Arguments:
+        - username: the username.
+
+    Returns:
+        The save or None if the user has none.
+    """
+    loaded: tuple[dict[str, typing.Any], int | None] | None = _load_state(username)
+    if loaded is None:
+        return None
+    state, entries = loaded
+    save: Save = Save.model_validate(state)
+    # without a usable journal (e.g. older saves) the next save writes a snapshot
+    if entries is not None:
+        save._saved = save._state()  # pylint:disable=protected-access
+        save._entries = entries  # pylint:disable=protected-access
+    return save
+
+
+def export_json(username: str, path: pathlib.Path | str) -> bool:
+    """Export the newest save of a user as JSON (it can be loaded from the saves directory).
+
+    Arguments:
+        - username: the username.
+        - path: the path of the JSON file.
+
+    Returns:
+        True if the user has a save, False otherwise.
+    """
+    save: Save | None = load_save(username)
+    if save is None:
+        return False
+    pathlib.Path(path).write_text(save.model_dump_json(indent=4), encoding="utf-8")
+    return True
+
+
 def get_newest_saves() -> dict[str, Save]:
     """Get the newest save for each user.
 
     Returns:
         The newest save for each user.
     """
-    result: dict[str, Save] = {}
-    # should work; sorted alphabetically then reversed
-    for file in reversed(list(SAVES_PATH.iterdir())):
-        save = Save.model_validate_json(file.read_text(encoding="utf-8"))
-        user: str = file.name.split("_")[0]
-        if result.get(user) is None:
-            result[user] = save
-    return result
+    return {user: save for user in read_index()
+            if (save := load_save(user)) is not None}
@@ -0,0 +1,132 @@
+"""Sectioned binary save files.
+
+A save file is a header, a table of contents and the sections. Every section is compressed on
+its own, so a reader only reads and decompresses the sections it needs.
+"""
+
+import enum
+import pathlib
+import struct
+import typing
+import zlib
+
+MAGIC: bytes = b"ORSV"
+"""First bytes of a save file."""
+VERSION: int = 1
+"""Version of the format."""
+HEADER: struct.Struct = struct.Struct(">4sHH")
+"""Magic, version and number of sections."""
+ENTRY: struct.Struct = struct.Struct(">16sBQII")
+"""Name, codec, offset, stored length and length of a section in the table of contents."""
+COMPRESS_MIN: int = 128
+"""Sections smaller than this are stored uncompressed."""
+
+
+class Codec(enum.IntEnum):
+    """Encodings of sections."""
+    RAW = 0
+    ZLIB = 1
+
+
+class SaveFileError(Exception):
+    """Invalid save file."""
+
+
+def encode(sections: dict[str, bytes]) -> bytes:
+    """Build a save file.
+
+    Arguments:
+        - sections: the content of the sections by name (at most 16 bytes of UTF-8).
+
+    Returns:
+        The save file.
+    """
+    stored: list[tuple[str, Codec, bytes, int]] = []
+    for name, data in sections.items():
+        compressed: bytes = zlib.compress(data) if len(data) >= COMPRESS_MIN else data
+        if len(compressed) < len(data):
+            stored.append((name, Codec.ZLIB, compressed, len(data)))
+        else:
+            stored.append((name, Codec.RAW, data, len(data)))
+    offset: int = HEADER.size + ENTRY.size * len(stored)
+    parts: list[bytes] = [HEADER.pack(MAGIC, VERSION, len(stored))]
+    for name, codec, data, length in stored:
+        if len(name.encode()) > 16:
+            raise ValueError(f"Section name '{name}' is longer than 16 bytes.")
+        parts.append(ENTRY.pack(name.encode(), codec, offset, len(data), length))
+        offset += len(data)
+    parts.extend(data for _, _, data, _ in stored)
+    return b"".join(parts)
+
+
+class SaveFile:
+    """Reader of a save file.
+
+    Opening reads only the header and the table of contents, sections are read and
+    decompressed when asked for.
+    """
+
+    def __init__(self, path: pathlib.Path | str) -> None:
+        """Open a save file.
+
+        Arguments:
+            - path: the path of the save file.
+        """
+        self._file: typing.BinaryIO = pathlib.Path(path).open("rb")
+        try:
+            magic, version, count = HEADER.unpack(self._file.read(HEADER.size))
+            if magic != MAGIC or version > VERSION:
+                raise SaveFileError(f"'{path}' is not a save file of version {VERSION}.")
+            table: bytes = self._file.read(ENTRY.size * count)
+            self._sections: dict[str, tuple[Codec, int, int, int]] = {}
+            for name, codec, offset, stored, length in ENTRY.iter_unpack(table):
+                self._sections[name.rstrip(b"\0").decode()] = (Codec(codec), offset, stored,
+                                                               length)
+        except (struct.error, ValueError) as excp:
+            self._file.close()
+            raise SaveFileError(f"'{path}' is not a valid save file.") from excp
+        except SaveFileError:
+            self._file.close()
+            raise
+
+    def __enter__(self) -> "SaveFile":
+        """Enter the context."""
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Close the file."""
+        self.close()
+
+    def __contains__(self, name: str) -> bool:
+        """Check if a section exists."""
+        return name in self._sections
+
+    @property
+    def names(self) -> list[str]:
+        """Names of the sections."""
+        return list(self._sections)
+
+    def read(self, name: str) -> bytes:
+        """Read a section.
+
+        Arguments:
+            - name: the name of the section.
+
+        Returns:
+            The content.
+        """
+        codec, offset, stored, length = self._sections[name]
+        self._file.seek(offset)
+        data: bytes = self._file.read(stored)
+        if codec == Codec.ZLIB:
+            try:
+                data = zlib.decompress(data)
+            except zlib.error as excp:
+                raise SaveFileError(f"Section '{name}' is corrupt.") from excp
+        if len(data) != length:
+            raise SaveFileError(f"Section '{name}' is truncated.")
+        return data
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
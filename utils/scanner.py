@@ -0,0 +1,159 @@
+"""Concurrent host and port scanner."""
+
+import asyncio
+import dataclasses
+import itertools
+import typing
+
+import utils.address_index
+import utils.device
+import utils.network
+
+
+@dataclasses.dataclass(slots=True)
+class ScanResult:
+    """Result of scanning a host that is up."""
+    net_address: utils.device.NPv5Address
+    latency: float
+    """Round trip time in ms."""
+    ports: tuple[int, ...]
+    """Open ports among the scanned ones."""
+
+
+def parse_targets(spec: str, network: "utils.network.Network") -> range:
+    """Parse a target specification.
+
+    A target is a domain name or an address range specification (see
+    utils.address_index.address_range).
+
+    Arguments:
+        - spec: the specification.
+        - network: the network to resolve domain names in.
+
+    Returns:
+        The range of addresses.
+    """
+    try:
+        return utils.address_index.address_range(spec)
+    except ValueError:
+        net_address: utils.device.NPv5Address | None = network.lookup(spec)
+        if net_address is None:
+            # specs of only address characters are reported as invalid ranges
+            if not spec.strip(utils.address_index.HEX_DIGITS + ".*-/"):
+                raise
+            raise ValueError(f"Could not resolve '{spec}'.") from None
+        return range(net_address, net_address + 1)
+
+
+def parse_ports(spec: str) -> list[int]:
+    """Parse a port specification (e.g. 22,80,100-200).
+
+    Arguments:
+        - spec: the specification.
+
+    Returns:
+        The sorted ports.
+    """
+    ports: set[int] = set()
+    for part in spec.split(","):
+        first, separator, last = part.partition("-")
+        if not first.isdigit() or (separator and not last.isdigit()):
+            raise ValueError(f"Invalid port '{part}'.")
+        start, stop = int(first), int(last or first)
+        # checked before building the set, huge ranges would take forever
+        if stop > utils.device.MAX_PORT:
+            raise ValueError(
+                f"Invalid port '{part}', ports go up to {utils.device.MAX_PORT}.")
+        if start > stop:
+            raise ValueError(f"Invalid port range '{part}', the first port is larger.")
+        ports.update(range(start, stop + 1))
+    return sorted(ports)
+
+
+class Scanner:
+    """Scanner probing hosts of a network concurrently.
+
+    Only addresses of devices in the network's address index are probed, the others are down.
+    A fixed number of workers take addresses one by one, so any number of addresses can be
+    scanned with bounded concurrency. Probing a host takes the latency of its route (scaled by
+    time_scale), hosts that are not reachable are down without waiting.
+    """
+
+    def __init__(self, network: "utils.network.Network", concurrency: int = 256,
+                 time_scale: float = 0.001) -> None:
+        """Initialize the scanner.
+
+        Arguments:
+            - network: the network to scan.
+            - concurrency: maximum number of hosts probed at once.
+            - time_scale: simulated seconds per ms of latency.
+        """
+        self._network: utils.network.Network = network
+        self._concurrency: int = concurrency
+        self._time_scale: float = time_scale
+        self.scanned: int = 0
+        """Number of addresses probed by the last scan."""
+
+    async def _probe(self, net_address: int, ports: typing.Sequence[int]) -> ScanResult | None:
+        """Probe a host and its ports.
+
+        Returns:
+            The result or None if the host is down.
+        """
+        latency: float | None = self._network.distance(net_address)
+        if latency is None:
+            return None
+        # all ports are probed at once, so the host takes one round trip
+        await asyncio.sleep(2 * latency * self._time_scale)
+        open_ports: set[int] = set(self._network.ports(net_address))
+        return ScanResult(utils.device.NPv5Address(net_address), 2 * latency,
+                          tuple(port for port in ports if port in open_ports))
+
+    async def scan(self, ranges: typing.Iterable[range], ports: typing.Sequence[int]) \
+            -> typing.AsyncIterator[ScanResult]:
+        """Scan hosts and ports, results are yielded as they arrive.
+
+        Closing or cancelling the iteration cancels all probes.
+
+        Arguments:
+            - ranges: the address ranges to scan.
+            - ports: the ports to scan on every host.
+
+        Returns:
+            The results of hosts that are up.
+        """
+        iterator: typing.Iterator[int] = itertools.chain.from_iterable(
+            self._network.addresses.query(addresses) for addresses in ranges)
+        results: asyncio.Queue[ScanResult | None] = asyncio.Queue()
+        self.scanned = 0
+
+        async def worker() -> None:
+            """Probe addresses until none are left."""
+            try:
+                for net_address in iterator:
+                    self.scanned += 1
+                    result: ScanResult | None = await self._probe(net_address, ports)
+                    if result is not None:
+                        results.put_nowait(result)
+                    elif self.scanned % 256 == 0:
+                        # down hosts don't wait, let others run
+                        await asyncio.sleep(0)
+            finally:
+                results.put_nowait(None)
+
+        workers: list[asyncio.Task] = [asyncio.create_task(worker())
+                                       for _ in range(self._concurrency)]
+        try:
+            running: int = len(workers)
+            while running:
+                result: ScanResult | None = await results.get()
+                if result is None:
+                    running -= 1
+                else:
+                    yield result
+            for task in workers:
+                # re-raise errors of workers
+                task.result()
+        finally:
+            for task in workers:
+                task.cancel()
@@ -14,7 +14,6 @@ class SharedValues:
     def __init__(self) -> None:
         """Initialise the shared values."""
         self._commands: dict[str, click.Command] = utils.command.get_commands()
-        self._network: utils.network.Network = utils.network.Network()
         self._terminal: widgets.terminal.Terminal
 
     def _notify(self) -> None:
@@ -27,8 +26,8 @@ class SharedValues:
 
     @property
     def network(self) -> utils.network.Network:
-        """The network."""
-        return self._network
+        """The network (loaded on first use)."""
+        return utils.network.NETWORK
 
     @property
     def terminal(self) -> widgets.terminal.Terminal:
@@ -0,0 +1,260 @@
+"""Streaming reader for world files (network.json)."""
+
+import itertools
+import json
+import operator
+import pathlib
+import re
+import types
+import typing
+
+CHUNK_SIZE: int = 1 << 20
+"""Number of bytes read from a world file at once."""
+WHITESPACE: str = " \t\n\r"
+"""JSON whitespace."""
+
+MEMBERS: re.Pattern = re.compile(
+    r'(\s*"([^"\\]*+(?:\\.[^"\\]*+)*+)"\s*:\s*)'
+    r'(\{[^{}"]*+(?:"[^"\\]*+(?:\\.[^"\\]*+)*+"[^{}"]*+)*+\})(\s*[,}])|([\s\S]+)')
+"""Members of an object whose values are objects without nested objects (most device records):
+the text before the value, the key, the value and the separator after it, or the rest of the
+text from the first member that is not like that."""
+
+_DECODER = json.JSONDecoder()
+
+
+def _text(value: typing.Any) -> typing.Any:
+    """Decode strings of a value read as latin-1 back to the UTF-8 text of the file."""
+    if isinstance(value, str):
+        return value if value.isascii() else value.encode("latin-1").decode()
+    if isinstance(value, list):
+        return [element if type(element) is str and element.isascii() else _text(element)
+                for element in value]
+    if isinstance(value, dict):
+        return {_text(key): _text(element) for key, element in value.items()}
+    return value
+
+
+class WorldReader:
+    """Streaming reader for world files.
+
+    The file is read in chunks and only the values asked for are kept, the records of a world
+    file of any size are indexed with constant memory. Bytes are decoded as latin-1, so
+    positions in the buffer are byte offsets in the file and records can be read later with
+    read_record.
+
+    The reader walks the top-level object with sections; every section's value has to be
+    consumed with exactly one of value or records.
+    """
+
+    def __init__(self, path: pathlib.Path | str, chunk_size: int = CHUNK_SIZE) -> None:
+        """Initialize the reader.
+
+        Arguments:
+            - path: path of the world file.
+            - chunk_size: number of bytes read at once.
+        """
+        self.path: pathlib.Path = pathlib.Path(path)
+        self._chunk_size: int = chunk_size
+        self._file: typing.BinaryIO | None = None
+        self._buffer: str = ""
+        self._position: int = 0
+        self._offset: int = 0
+        """File offset of the start of the buffer."""
+        self._eof: bool = False
+
+    def __enter__(self) -> "WorldReader":
+        """Open the file."""
+        self._file = self.path.open("rb")
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None,
+                 traceback: types.TracebackType | None) -> None:
+        """Close the file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _fill(self, size: int | None = None) -> bool:
+        """Read the next chunk, dropping the consumed part of the buffer.
+
+        Arguments:
+            - size: number of bytes to read (the chunk size if None).
+
+        Returns:
+            False at the end of the file.
+        """
+        if self._eof or self._file is None:
+            return False
+        data: bytes = self._file.read(size or self._chunk_size)
+        if not data:
+            self._eof = True
+            return False
+        self._offset += self._position
+        self._buffer = self._buffer[self._position:] + data.decode("latin-1")
+        self._position = 0
+        return True
+
+    def _peek(self) -> str:
+        """Skip whitespace and get the next character (empty at the end of the file)."""
+        while True:
+            while self._position < len(self._buffer) \
+                    and self._buffer[self._position] in WHITESPACE:
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars: str) -> str:
+        """Consume the next character, which has to be one of chars."""
+        char: str = self._peek()
+        if not char or char not in chars:
+            raise ValueError(f"{self.path}: expected {chars!r} at byte "
+                             f"{self._offset + self._position}, got {char!r}")
+        self._position += 1
+        return char
+
+    def _decode(self) -> tuple[typing.Any, int, int]:
+        """Decode the next value, reading more of the file until it is complete.
+
+        Returns:
+            The value (with strings as read, see _text) and its start and end offset in the
+            file.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                # grow the buffer geometrically, a large value is decoded a few times at most
+                if not self._fill(max(self._chunk_size,
+                                      3 * (len(self._buffer) - self._position))):
+                    raise
+                continue
+            # a number can end with the buffer while the file goes on
+            if end == len(self._buffer) and self._fill():
+                continue
+            start: int = self._offset + self._position
+            self._position = end
+            return value, start, self._offset + end
+
+    def _decode_text(self) -> typing.Any:
+        """Decode the next value with its strings as in the file.
+
+        Values without non-ASCII bytes (almost all) are taken as decoded, so large sections
+        are decoded by the json module alone.
+        """
+        value, start, end = self._decode()
+        ascii_: bool = self._buffer[start - self._offset:end - self._offset].isascii()
+        return value if ascii_ else _text(value)
+
+    def _members(self) -> typing.Iterator[str]:
+        """Iterate over the keys of an object, the caller consumes each value."""
+        self._expect("{")
+        if self._peek() == "}":
+            self._position += 1
+            return
+        while True:
+            key: str = self._decode_text()
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def sections(self) -> typing.Iterator[str]:
+        """Iterate over the keys of the top-level object.
+
+        Returns:
+            The keys, the value of each has to be consumed before the next one.
+        """
+        return self._members()
+
+    def value(self) -> typing.Any:
+        """Read a whole value at once (for small sections like dns and edges).
+
+        Returns:
+            The value.
+        """
+        return self._decode_text()
+
+    def records(self) -> typing.Iterator[tuple[list[str], list[int], list[int]]]:
+        """Iterate over the members of an object in batches without decoding their values.
+
+        The spans of values that are objects without nested objects are found for the whole
+        buffer with one regex (see MEMBERS) and their offsets are summed up from the lengths
+        of the matches. Other values and members cut by the end of the buffer are decoded.
+
+        Returns:
+            Batches of keys with the offsets and lengths of their values in the file.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            self._position += 1
+            return
+        while True:
+            members: list[tuple[str, str, str, str, str]] = MEMBERS.findall(self._buffer,
+                                                                            self._position)
+            if members and members[-1][4]:
+                members.pop()
+            last: int = "".join(separator[-1] for _, _, _, separator, _ in members).find("}")
+            if last >= 0:
+                del members[last + 1:]
+            if members:
+                before: list[int] = list(map(len, map(operator.itemgetter(0), members)))
+                keys: list[str] = list(map(operator.itemgetter(1), members))
+                lengths: list[int] = list(map(len, map(operator.itemgetter(2), members)))
+                ends: list[int] = list(itertools.accumulate(
+                    map(operator.add, map(operator.add, before, lengths),
+                        map(len, map(operator.itemgetter(3), members))),
+                    initial=self._offset + self._position))
+                joined: str = "".join(keys)
+                if "\\" in joined or not joined.isascii():
+                    keys = [_text(_DECODER.decode(f'"{key}"')) for key in keys]
+                self._position = ends[-1] - self._offset
+                yield keys, list(map(operator.add, ends, before)), lengths
+                if last >= 0:
+                    return
+            key: str = self._decode_text()
+            self._expect(":")
+            _, start, end = self._decode()
+            yield [key], [start], [end - start]
+            if self._expect(",}") == "}":
+                return
+
+
+def read_record(path: pathlib.Path | str, offset: int, length: int) -> typing.Any:
+    """Read a single value of a world file (e.g. a record from WorldReader.records).
+
+    Arguments:
+        - path: path of the world file.
+        - offset: offset of the value in the file.
+        - length: length of the value in bytes.
+
+    Returns:
+        The value.
+    """
+    with pathlib.Path(path).open("rb") as file:
+        file.seek(offset)
+        return json.loads(file.read(length))
+
+
+def read_records(path: pathlib.Path | str, spans: typing.Iterable[tuple[int, int]]) \
+        -> list[typing.Any]:
+    """Read values of a world file with one open file, in file order.
+
+    Arguments:
+        - path: path of the world file.
+        - spans: the offsets and lengths of the values.
+
+    Returns:
+        The values in the order of the spans.
+    """
+    spans = list(spans)
+    values: list[typing.Any] = [None] * len(spans)
+    with pathlib.Path(path).open("rb") as file:
+        for index in sorted(range(len(spans)), key=spans.__getitem__):
+            offset, length = spans[index]
+            file.seek(offset)
+            values[index] = json.loads(file.read(length))
+    return values
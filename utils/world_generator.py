@@ -0,0 +1,227 @@
+"""Seeded procedural world generation."""
+
+import atexit
+import concurrent.futures
+import itertools
+import json
+import pathlib
+import random
+import shutil
+import tempfile
+import typing
+
+import utils.device
+import utils.network
+import utils.regions
+
+SUBNET_SIZE: int = 256
+"""Average number of devices in a subnet."""
+SHARD_SUBNETS: int = 64
+"""Number of subnets generated by one task of the process pool."""
+BACKBONE_LINKS: int = 2
+"""Links of every gateway to earlier gateways."""
+LAN_LINK_CHANCE: float = 0.1
+"""Chance of a host being linked to another host of its subnet."""
+EXTRA_PORT_CHANCE: float = 0.05
+"""Chance of a device having an open port besides the default ones of its type."""
+DEVICE_TYPES: dict[utils.device.DeviceType, float] = {
+    utils.device.DeviceType.TERMINAL: 60,
+    utils.device.DeviceType.CYBERDECK: 20,
+    utils.device.DeviceType.SERVER: 10,
+    utils.device.DeviceType.IMPLANT: 5,
+    utils.device.DeviceType.VEHICLE: 5,
+}
+"""Relative frequency of device types (gateways are servers)."""
+MANUFACTURERS: dict[utils.device.Manufacturer, float] = {
+    utils.device.Manufacturer.ACRON: 40,
+    utils.device.Manufacturer.OUTEL: 30,
+    utils.device.Manufacturer.BMD: 20,
+    utils.device.Manufacturer.CYCLOPS: 10,
+}
+"""Relative frequency of manufacturers."""
+HOST_PREFIXES: dict[utils.device.DeviceType, str] = {
+    utils.device.DeviceType.TERMINAL: "ws",
+    utils.device.DeviceType.CYBERDECK: "deck",
+    utils.device.DeviceType.SERVER: "srv",
+    utils.device.DeviceType.IMPLANT: "imp",
+    utils.device.DeviceType.VEHICLE: "car",
+}
+"""Start of the device names by type."""
+DOMAIN_WORDS: tuple[str, ...] = ("acme", "nova", "zenith", "orbit", "vertex", "pulse", "echo",
+                                 "ion", "helix", "quasar", "nexus", "flux")
+"""Words domain names of subnets are made of."""
+TOP_LEVEL_DOMAINS: tuple[str, ...] = ("zer0", "net", "corp", "io")
+"""Top level domains of subnets."""
+
+
+def _subnet(seed: int, index: int, prefix: int, size: int) \
+        -> tuple[list[str], list[str], list[str]]:
+    """Generate the devices, DNS names and links of a subnet.
+
+    The subnet has its own random generator, so the world doesn't depend on how the subnets are
+    split into tasks. Host 1 is the gateway, every other host is linked to it.
+
+    Returns:
+        The members of the devices, DNS and edges sections (JSON).
+    """
+    rng = random.Random(f"{seed}:{index}")
+    base: int = prefix << utils.regions.REGION_BITS
+    hosts: list[int] = [1, *rng.sample(range(2, 1 << utils.regions.REGION_BITS), size - 1)]
+    # canonical addresses need no escaping
+    addresses: list[str] = [f'"{address}"' for address in
+                            utils.device.NPv5Address.format_many(base | host for host in hosts)]
+    # plain values, enum members are slower to serialize
+    types: list[str] = [utils.device.DeviceType.SERVER.value, *rng.choices(
+        [type_.value for type_ in DEVICE_TYPES], list(DEVICE_TYPES.values()), k=size - 1)]
+    manufacturers: list[str] = rng.choices(
+        [manufacturer.value for manufacturer in MANUFACTURERS], list(MANUFACTURERS.values()),
+        k=size)
+    domain: str = f"{rng.choice(DOMAIN_WORDS)}{index:x}.{rng.choice(TOP_LEVEL_DOMAINS)}"
+    devices: list[str] = []
+    dns: list[str] = []
+    edges: list[str] = []
+    gateway: str = addresses[0]
+    for host, address, type_, manufacturer in zip(hosts, addresses, types, manufacturers):
+        name: str = "gw" if host == 1 else f"{HOST_PREFIXES[type_]}-{host:04x}"
+        record: dict[str, typing.Any] = {"name": f"{name}.{domain}", "type": type_,
+                                         "manufacturer": manufacturer}
+        if type_ == utils.device.DeviceType.SERVER:
+            record["template"] = "server"
+            dns.append(f"{json.dumps(f'{name}.{domain}')}:{address}")
+        if rng.random() < EXTRA_PORT_CHANCE:
+            record["ports"] = sorted({*utils.device.DEFAULT_PORTS[type_],
+                                      rng.choice(list(utils.device.Port))})
+        devices.append(f"{address}:{json.dumps(record)}")
+        if host != 1:
+            edges.append(f"[{address},{gateway}]")
+            if size > 2 and rng.random() < LAN_LINK_CHANCE:
+                peer: str = rng.choice(addresses[1:])
+                if peer != address:
+                    edges.append(f"[{address},{peer}]")
+    return devices, dns, edges
+
+
+def _shard(seed: int, subnets: list[tuple[int, int, int]]) -> tuple[str, str, str]:
+    """Generate a shard of subnets (a task of the process pool).
+
+    Arguments:
+        - seed: the seed of the world.
+        - subnets: the index, region prefix and size of every subnet.
+
+    Returns:
+        The devices, DNS and edges sections of the shard (members joined by commas).
+    """
+    devices: list[str] = []
+    dns: list[str] = []
+    edges: list[str] = []
+    for index, prefix, size in subnets:
+        subnet_devices, subnet_dns, subnet_edges = _subnet(seed, index, prefix, size)
+        devices.extend(subnet_devices)
+        dns.extend(subnet_dns)
+        edges.extend(subnet_edges)
+    return ",\n".join(devices), ",\n".join(dns), ",\n".join(edges)
+
+
+def _backbone(rng: random.Random, gateways: int) -> typing.Iterator[tuple[int, int]]:
+    """Link gateways by preferential attachment (Barabasi-Albert), degrees follow a power law.
+
+    Arguments:
+        - rng: the random generator.
+        - gateways: the number of gateways.
+
+    Returns:
+        The links as pairs of gateway indexes.
+    """
+    # every gateway once per link end, so choices are proportional to the degree
+    ends: list[int] = []
+    for gateway in range(1, gateways):
+        targets: set[int] = set()
+        while len(targets) < min(BACKBONE_LINKS, gateway):
+            targets.add(rng.choice(ends) if ends else 0)
+        for target in targets:
+            ends.extend((gateway, target))
+            yield gateway, target
+
+
+def generate(path: pathlib.Path | str, devices: int, seed: int = 0,
+             workers: int | None = None) -> None:
+    """Generate a world file.
+
+    The world has subnets of SUBNET_SIZE devices on average in their own regions, with a
+    gateway that every host is linked to, some links between hosts and a backbone between the
+    gateways. Servers get DNS names in the domain of their subnet. The same seed always gives
+    the same world, whatever the number of workers.
+
+    Arguments:
+        - path: path of the world file.
+        - devices: the number of generated devices (the home device is added), at least 1 for
+          the gateway of the first subnet.
+        - seed: the seed of the world.
+        - workers: number of processes generating subnets (one per CPU if None, in this
+          process if 1).
+    """
+    if devices < 1:
+        raise ValueError(f"A world needs at least 1 generated device (the gateway of the "
+                         f"first subnet), got {devices}.")
+    rng = random.Random(seed)
+    count: int = max(1, devices // SUBNET_SIZE)
+    # cut points give sizes that vary like real subnets
+    cuts: list[int] = sorted(rng.sample(range(1, devices), count - 1))
+    sizes: list[int] = [last - first for first, last in zip([0, *cuts], [*cuts, devices])]
+    prefixes: list[int] = rng.sample(range(1, 1 << 32), count)
+    subnets: list[tuple[int, int, int]] = list(zip(range(count), prefixes, sizes))
+    shards: list[list[tuple[int, int, int]]] = [
+        list(shard) for shard in itertools.batched(subnets, SHARD_SUBNETS)]
+    gateways: list[str] = [f'"{address}"' for address in utils.device.NPv5Address.format_many(
+        prefix << utils.regions.REGION_BITS | 1 for prefix in prefixes)]
+    home: str = json.dumps(str(utils.device.NPv5Address(prefixes[0] << utils.regions.REGION_BITS)))
+    oracle: dict[str, typing.Any] = utils.device.Device.oracle().to_record()
+    # defaults for the rest
+    del oracle["file_system"], oracle["ports"]
+    with pathlib.Path(path).open("w", encoding="utf-8") as file, \
+            tempfile.TemporaryFile("w+", encoding="utf-8") as dns, \
+            tempfile.TemporaryFile("w+", encoding="utf-8") as edges:
+        file.write(f'{{\n"home": {home},\n"devices": {{\n{home}:{json.dumps(oracle)}')
+        edges.write(f"[{home},{gateways[0]}]")
+        separator: str = ""
+        with concurrent.futures.ProcessPoolExecutor(workers) if workers != 1 else \
+                concurrent.futures.ThreadPoolExecutor(1) as pool:
+            for shard_devices, shard_dns, shard_edges in pool.map(
+                    _shard, itertools.repeat(seed), shards):
+                file.write(f",\n{shard_devices}")
+                if shard_dns:
+                    dns.write(f"{separator}{shard_dns}")
+                    separator = ",\n"
+                edges.write(f",\n{shard_edges}" if shard_edges else "")
+        for first, second in _backbone(rng, count):
+            edges.write(f",\n[{gateways[first]},{gateways[second]},{rng.randint(5, 40)}]")
+        file.write('\n},\n"dns": {\n')
+        dns.seek(0)
+        shutil.copyfileobj(dns, file)
+        file.write('\n},\n"edges": [\n')
+        edges.seek(0)
+        shutil.copyfileobj(edges, file)
+        file.write("\n]\n}\n")
+
+
+def network(devices: int, seed: int = 0, workers: int | None = None,
+            backend: str = "csr") -> utils.network.Network:
+    """Generate a world and load it as a network.
+
+    The world file is written to a temporary directory that is removed at exit, devices are
+    constructed from it on first access like from any world file.
+
+    Arguments:
+        - devices: the number of generated devices (the home device is added, see generate).
+        - seed: the seed of the world.
+        - workers: number of processes generating subnets (see generate).
+        - backend: the graph backend (see utils.graph.GRAPH_BACKENDS).
+
+    Returns:
+        The network.
+    """
+    directory: str = tempfile.mkdtemp(prefix="world-")
+    atexit.register(shutil.rmtree, directory, True)
+    path: pathlib.Path = pathlib.Path(directory) / "world.json"
+    generate(path, devices, seed, workers)
+    return utils.network.Network.load(path, backend)
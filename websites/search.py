@@ -1,14 +1,11 @@
 """Search website."""
 
-import typing
-
 import textual.app
 import textual.containers
 import textual.events
 import textual.widget
 import textual.widgets
 
-import screens.desktop
 import widgets.website
 
 
@@ -37,7 +34,7 @@ class SearchWebsite(widgets.website.Website):
                        textual.widgets.Input).value = search_term
         # actually do the search
         results: list[str] = []
-        for website in typing.cast(screens.desktop.DesktopScreen, self.app.screen).websites:
+        for website in widgets.website.REGISTRY.entries.values():
             if not set(search_term.split()).isdisjoint(set(website.keywords)):
                 results.append(f"[@click=app.link('{website.id_}')]{website.title}[/]\n"
                                f"{website.description}\n")
@@ -1,7 +1,6 @@
 """Custom terminal widget."""
 
 import asyncio
-import copy
 import dataclasses
 import re
 
@@ -22,7 +21,6 @@ import utils.network
 import utils.values
 
 # TODO: pause terminal input while executing command to prevent entering additional text
-# TODO: improve performance (by only rerendering relevant cache parts)
 # TODO: ctrl+left and ctrl+right
 
 
@@ -72,7 +70,9 @@ class Terminal(textual.scroll_view.ScrollView, can_focus=True):
         textual.binding.Binding("backspace", "delete_left",
                                 "delete left", show=False),
         textual.binding.Binding("delete", "delete_right",
-                                "delete right", show=False)
+                                "delete right", show=False),
+        textual.binding.Binding("ctrl+c", "cancel",
+                                "cancel command", show=False)
     ]
 
     value = textual.reactive.reactive("", always_update=True)
@@ -98,18 +98,27 @@ class Terminal(textual.scroll_view.ScrollView, can_focus=True):
         self._lines: list[str] = []
         # cache of rendered lines: rendered Strip, line index, type?
         self._lines_cache: list[textual.strip.Strip] = []
+        # number of cached strips per line, to rerender only the changed (last) lines
+        self._lines_heights: list[int] = []
         self._history: list[str] = []
         # variables for command input handling
         self._input_event: asyncio.Event = asyncio.Event()
         self._input_event.set()
         self._input: str = ""
+        # task of the running command (to cancel it)
+        self._command: asyncio.Task | None = None
         # reference to self for commands
         Terminal.TERMINAL = self
 
-    def _replace_variables(self, text: str) -> str:
+    def _variables(self) -> dict[str, str | None]:
+        """Get game and theme variables (expensive, get them once per render)."""
+        return self.app.get_css_variables() | utils.values.VALUES.as_dict()
+
+    def _replace_variables(self, text: str,
+                           variables: dict[str, str | None] | None = None) -> str:
         """Replace variables with values, both game and theme variables (e.g. $primary)."""
         return re.sub(r"\[\$([a-zA-Z\-]+)\]", r"[{\1}]", text).format_map(
-            self.app.get_css_variables() | utils.values.VALUES.as_dict())
+            self._variables() if variables is None else variables)
 
     def _update_cache_line(self, y: int) -> None:
         """Update specified cache line.
@@ -118,23 +127,45 @@ class Terminal(textual.scroll_view.ScrollView, can_focus=True):
             - y: index of line.
         """
 
+    def _render_text(self, line_text: str,
+                     variables: dict[str, str | None]) -> list[textual.strip.Strip]:
+        """Render one line of text (can be multiple strips if it's wrapped)."""
+        line_text = self._replace_variables(line_text, variables)
+        text: rich.text.Text = self._render_console.render_str(line_text)
+        return [textual.strip.Strip(line.render(self._render_console))
+                for line in text.divide(range(self._render_console.width, text.cell_len,
+                                              self._render_console.width))]
+
+    def _cache_in_sync(self, lines: int) -> bool:
+        """Check if the cache matches the first lines of text."""
+        return self.cache_valid and len(self._lines_heights) == lines
+
+    def _update_cache_tail(self, start: int) -> None:
+        """Rerender lines from start to the end (the last line with the input value).
+
+        Arguments:
+            - start: index of the first line to rerender.
+        """
+        removed: int = sum(self._lines_heights[start:])
+        if removed:
+            del self._lines_cache[-removed:]
+        del self._lines_heights[start:]
+        variables: dict[str, str | None] = self._variables()
+        for index in range(start, len(self._lines)):
+            line_text: str = self._lines[index]
+            if index == len(self._lines) - 1:
+                line_text += self.value
+            strips: list[textual.strip.Strip] = self._render_text(line_text, variables)
+            self._lines_cache.extend(strips)
+            self._lines_heights.append(len(strips))
+        self.virtual_size = textual.geometry.Size(self.size.width,
+                                                  len(self._lines_cache))
+
     def _update_cache(self) -> None:
         """Update cache of rendered lines."""
         self._lines_cache.clear()
-        lines: list[str] = copy.copy(self._lines)
-        if len(lines) > 0:
-            lines[-1] += self.value
-            # if self.cursor_visible and self.has_focus:
-            #     lines[-1] += "[black on white]*[/]"
-        for line_text in lines:
-            line_text = self._replace_variables(line_text)
-            text: rich.text.Text = self._render_console.render_str(line_text)
-            for line in text.divide(range(self._render_console.width, text.cell_len,
-                                    self._render_console.width)):
-                self._lines_cache.append(textual.strip.Strip(
-                    line.render(self._render_console)))
-        self.virtual_size = textual.geometry.Size(self.size.width,
-                                                  len(self._lines_cache))
+        self._lines_heights.clear()
+        self._update_cache_tail(0)
 
     def _on_focus(self, event: textual.events.Focus) -> None:
         """Do stuff on focus."""
@@ -169,7 +200,12 @@ class Terminal(textual.scroll_view.ScrollView, can_focus=True):
 
     def watch_value(self, value: str) -> None:
         """Watch the value."""
-        self.cache_valid = False
+        # only the input line changed
+        if self._lines and self._cache_in_sync(len(self._lines)):
+            self._update_cache_tail(len(self._lines) - 1)
+            self.refresh()
+        else:
+            self.cache_valid = False
         self.scroll_end(animate=False, immediate=True, force=True)
         if self.cursor_position <= 0:
             self.cursor_position = 0
@@ -224,11 +260,10 @@ class Terminal(textual.scroll_view.ScrollView, can_focus=True):
 
     def action_complete(self) -> None:
         """Handle complete action."""
-        for cmd_name in sorted(utils.command.get_commands()):
-            if cmd_name.startswith(self.value):
-                self.value = cmd_name
-                self.cursor_position = 1_000_000
-                break
+        completed: str = utils.command.complete(self.value)
+        if completed != self.value:
+            self.value = completed
+            self.cursor_position = 1_000_000
 
     def action_submit(self) -> None:
         """Handle submit action."""
@@ -249,6 +284,13 @@ class Terminal(textual.scroll_view.ScrollView, can_focus=True):
         self.value = self.value[:self.cursor_position] + \
             self.value[self.cursor_position + 1:]
 
+    def action_cancel(self) -> None:
+        """Handle cancel action (cancels the running command)."""
+        if self._command is not None and not self._command.done():
+            self._command.cancel()
+            # stop waiting for input of the command
+            self._input_event.set()
+
     def toggle_cursor(self) -> None:
         """Toggle visibility of cursor."""
         self.cursor_visible = not self.cursor_visible
@@ -271,7 +313,7 @@ class Terminal(textual.scroll_view.ScrollView, can_focus=True):
             self.history_value = -1
             if event.value:
                 self._history.insert(0, event.value)
-                asyncio.create_task(utils.command.parse(event.value))
+                self._command = asyncio.create_task(utils.command.parse(event.value))
             else:
                 self.write_lines(utils.network.NETWORK.computer.prompt)
         # command input
@@ -280,15 +322,21 @@ class Terminal(textual.scroll_view.ScrollView, can_focus=True):
             self._input = event.value
         # add input to last line
         self._lines[-1] += event.value
+        if self._cache_in_sync(len(self._lines)):
+            self._update_cache_tail(len(self._lines) - 1)
+        else:
+            self.cache_valid = False
 
     def write_lines(self, text: str) -> None:
-        """Write lines to the terminal."""
-        for line_text in text.split("\n"):
-            self._lines.append(line_text)
-            line_text = self._replace_variables(line_text)
-        self.cache_valid = False
-        self.virtual_size = textual.geometry.Size(self.size.width,
-                                                  len(self._lines_cache))
+        """Write lines to the terminal. Only the new lines (and the previous last line) are
+        rendered."""
+        previous: int = len(self._lines)
+        self._lines.extend(text.split("\n"))
+        if self._cache_in_sync(previous):
+            self._update_cache_tail(max(previous - 1, 0))
+            self.refresh()
+        else:
+            self.cache_valid = False
         self.scroll_end(animate=False, immediate=True, force=True)
 
     async def get_input(self, prompt: str) -> str:
@@ -302,6 +350,8 @@ class Terminal(textual.scroll_view.ScrollView, can_focus=True):
     def clear(self):
         """Clear the terminal."""
         self._lines.clear()
+        self._lines_cache.clear()
+        self._lines_heights.clear()
         self.cache_valid = False
 
     def render_line(self, y: int) -> textual.strip.Strip:
@@ -1,38 +1,269 @@
-"""Website base class and some helper functions."""
+"""Website base class and the website registry."""
 
-import importlib.abc
-import importlib.machinery
-import importlib.util
+import ast
+import collections
+import dataclasses
+import importlib
 import inspect
+import json
+import logging
+import os
 import pathlib
+import sys
 import typing
 
 import textual.app
 import textual.containers
+import textual.css.query
 import textual.widget
 import textual.widgets
 
+WEBSITES_PACKAGE: str = "websites"
+"""Package the websites are found in."""
+MANIFEST_PATH: pathlib.Path = pathlib.Path(WEBSITES_PACKAGE) / "manifest.json"
+"""Cached metadata of the websites, rebuilt for changed files."""
+MANIFEST_VERSION: int = 1
+"""Version of the manifest format, manifests of other versions are scanned again."""
+MOUNTED_WEBSITES: int = 4
+"""Maximum number of websites mounted in the browser at once."""
+WEBSITE_ARGUMENTS: tuple[str, ...] = ("id_", "title", "keywords", "description", "tld")
+"""Arguments of Website.__init__ that are kept in the manifest."""
+LOGGER: logging.Logger = logging.getLogger(__name__)
+"""Logger of websites that can't be registered."""
 
-def get_websites() -> list["Website"]:
-    """Get all websites.
+
+@dataclasses.dataclass(slots=True)
+class WebsiteEntry:
+    """Metadata of a website in the manifest, everything known without creating it."""
+    id_: str
+    title: str
+    keywords: list[str]
+    description: str
+    tld: str
+    module: str
+    """Module in the websites package."""
+    class_name: str
+
+    @property
+    def domain(self) -> str:
+        """Domain of the website."""
+        return f"{self.id_}.{self.tld}"
+
+
+def _literal_arguments(node: ast.ClassDef) -> dict[str, typing.Any] | None:
+    """Get the literal arguments a website class passes to Website.__init__.
+
+    Arguments:
+        - node: the class definition.
 
     Returns:
-        All websites found.
+        The arguments or None if they are not literals.
+    """
+    for function in node.body:
+        if not isinstance(function, ast.FunctionDef) or function.name != "__init__":
+            continue
+        for call in ast.walk(function):
+            if isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute) \
+                    and call.func.attr == "__init__" and isinstance(call.func.value, ast.Call) \
+                    and isinstance(call.func.value.func, ast.Name) \
+                    and call.func.value.func.id == "super":
+                try:
+                    arguments: dict[str, typing.Any] = dict(zip(
+                        WEBSITE_ARGUMENTS, map(ast.literal_eval, call.args)))
+                    for keyword in call.keywords:
+                        if keyword.arg is None:
+                            return None
+                        arguments[keyword.arg] = ast.literal_eval(keyword.value)
+                except ValueError:
+                    return None
+                return arguments
+    return None
+
+
+def _scan(file: pathlib.Path) -> list[dict[str, typing.Any]]:
+    """Get the manifest entries of a website module.
+
+    The metadata is read from the source, a module is only imported if a website passes
+    anything but literals to Website.__init__. Websites that can't be created are skipped.
+
+    Arguments:
+        - file: the module.
+
+    Returns:
+        The entries (fields of WebsiteEntry).
+    """
+    module: str = file.name.removesuffix(".py")
+    defaults: dict[str, typing.Any] = {
+        name: parameter.default
+        for name, parameter in inspect.signature(Website.__init__).parameters.items()
+        if parameter.default is not inspect.Parameter.empty}
+    entries: list[dict[str, typing.Any]] = []
+    try:
+        tree: ast.Module = ast.parse(file.read_bytes(), file)
+    except (SyntaxError, ValueError) as excp:
+        LOGGER.warning("Skipping websites in %s: %s", file, excp)
+        return entries
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef) or not any(
+                ast.unparse(base).split(".")[-1] == "Website" for base in node.bases):
+            continue
+        arguments: dict[str, typing.Any] | None = _literal_arguments(node)
+        if arguments is None:
+            try:
+                importlib.import_module(f"{WEBSITES_PACKAGE}.{module}")
+                website: Website = getattr(sys.modules[f"{WEBSITES_PACKAGE}.{module}"],
+                                           node.name)()
+            except Exception as excp:  # pylint:disable=broad-exception-caught
+                LOGGER.warning("Skipping website %s.%s: %r", module, node.name, excp)
+                continue
+            arguments = {"id_": website.id_, "title": website.title,
+                         "keywords": website.keywords, "description": website.description,
+                         "tld": website.domain.removeprefix(f"{website.id_}.")}
+        entries.append({**defaults, **arguments, "module": module, "class_name": node.name})
+    return entries
+
+
+class WebsiteRegistry:
+    """Registry of the websites in the websites package.
+
+    Websites are found through a manifest cached in MANIFEST_PATH, only files that changed
+    since it was written are scanned again, so searching the web imports no website. A
+    website's module is imported when the website is created.
+    """
+
+    def __init__(self, manifest: pathlib.Path = MANIFEST_PATH) -> None:
+        """Initialize the registry (the manifest is read on first access).
+
+        Arguments:
+            - manifest: the path of the cached manifest.
+        """
+        self._manifest: pathlib.Path = manifest
+        self._entries: dict[str, WebsiteEntry] | None = None
+
+    @property
+    def entries(self) -> dict[str, WebsiteEntry]:
+        """Websites by id."""
+        if self._entries is None:
+            self._entries = self._load()
+        return self._entries
+
+    def _load(self) -> dict[str, WebsiteEntry]:
+        """Read the manifest, scan changed files and write it if anything changed.
+
+        Entries that don't fit WebsiteEntry are skipped.
+
+        Returns:
+            The websites by id.
+        """
+        try:
+            manifest: typing.Any = json.loads(self._manifest.read_bytes())
+        except (OSError, ValueError):
+            manifest = None
+        cached: dict[str, typing.Any] = manifest["files"] if isinstance(manifest, dict) \
+            and manifest.get("version") == MANIFEST_VERSION \
+            and isinstance(manifest.get("files"), dict) else {}
+        files: dict[str, typing.Any] = {}
+        for file in sorted(self._manifest.parent.glob("*.py")):
+            stat: os.stat_result = file.stat()
+            entry: typing.Any = cached.get(file.name)
+            if not isinstance(entry, dict) or entry.get("mtime_ns") != stat.st_mtime_ns \
+                    or entry.get("size") != stat.st_size \
+                    or not isinstance(entry.get("websites"), list):
+                entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                         "websites": _scan(file)}
+            files[file.name] = entry
+        if files != cached:
+            try:
+                temporary: pathlib.Path = self._manifest.with_suffix(".tmp")
+                temporary.write_text(json.dumps({"version": MANIFEST_VERSION, "files": files},
+                                                indent=1), encoding="utf-8")
+                os.replace(temporary, self._manifest)
+            except OSError:
+                # only a cache, scanned again next time
+                pass
+        entries: dict[str, WebsiteEntry] = {}
+        for name, entry in files.items():
+            for website in entry["websites"]:
+                try:
+                    website_entry: WebsiteEntry = WebsiteEntry(**website)
+                except TypeError as excp:
+                    LOGGER.warning("Skipping website in %s: %s", name, excp)
+                    continue
+                entries[website_entry.id_] = website_entry
+        return entries
+
+    def create(self, id_: str) -> "Website":
+        """Create a website (imports its module on first use).
+
+        Arguments:
+            - id_: the id of the website.
+
+        Returns:
+            The website.
+        """
+        entry: WebsiteEntry = self.entries[id_]
+        name: str = f"{WEBSITES_PACKAGE}.{entry.module}"
+        importlib.import_module(name)
+        return getattr(sys.modules[name], entry.class_name)()
+
+
+class WebsiteSwitcher(textual.widgets.ContentSwitcher):
+    """Content switcher of the display that mounts websites on first navigation.
+
+    Websites are unmounted (and their state lost) when more than a limit of them are
+    mounted, the least recently shown first. The current website is never unmounted. Other
+    children are switched to like in any content switcher.
     """
-    websites: list[Website] = []
-    for file in pathlib.Path("websites").iterdir():
-        if file.is_file() and file.name.endswith(".py"):
-            spec = typing.cast(importlib.machinery.ModuleSpec,
-                               importlib.util.spec_from_file_location(
-                                   file.name.removesuffix(".py"), file))
-            module = importlib.util.module_from_spec(spec)
-            typing.cast(importlib.abc.Loader, spec.loader).exec_module(module)
-            for _, obj in inspect.getmembers(module):
-                if inspect.isclass(obj) and issubclass(obj, Website):
-                    # necessary to avoid error
-                    websites.append(
-                        obj.__call__())  # pylint:disable=unnecessary-dunder-call
-    return websites
+
+    def __init__(self, *children: textual.widget.Widget, limit: int = MOUNTED_WEBSITES,
+                 **kwargs: typing.Any) -> None:
+        """Initialize the switcher.
+
+        Arguments:
+            - children: the children.
+            - limit: the maximum number of mounted websites.
+            - kwargs: the arguments of textual.widgets.ContentSwitcher.
+        """
+        super().__init__(*children, **kwargs)
+        self.limit: int = limit
+        self._websites: collections.OrderedDict[str, Website] = collections.OrderedDict()
+        """Mounted websites by id, least recently shown first."""
+
+    def on_mount(self) -> None:
+        """Track the composed websites."""
+        for child in self.children:
+            if isinstance(child, Website):
+                self._websites[child.id_] = child
+        self._unmount_websites()
+
+    def switch(self, id_: str) -> None:
+        """Show a child, a website is mounted if it isn't.
+
+        Arguments:
+            - id_: the id of the child or website.
+        """
+        if id_ in REGISTRY.entries:
+            website: Website | None = self._websites.get(id_)
+            if website is None:
+                website = self._websites[id_] = REGISTRY.create(id_)
+                website.display = False
+                self.mount(website)
+            self._websites.move_to_end(id_)
+        self.current = id_
+        self._unmount_websites()
+
+    def _unmount_websites(self) -> None:
+        """Unmount the least recently shown websites beyond the limit."""
+        for id_ in list(self._websites):
+            if len(self._websites) <= self.limit:
+                break
+            if id_ != self.current:
+                self._websites.pop(id_).remove()
+
+    @property
+    def mounted(self) -> list[str]:
+        """Ids of the mounted websites, least recently shown first."""
+        return list(self._websites)
 
 
 class Website(textual.widget.Widget):
@@ -78,13 +309,21 @@ class Website(textual.widget.Widget):
     def pressed_website_button(self, event: textual.widgets.Button.Pressed) -> None:
         """Handle button pressed event for website_button."""
         event.stop()
-        search_switcher = self.app.screen.query_one(
-            "#search_switcher", textual.widgets.ContentSwitcher)
         if len(Website.web_history) > 0:
             last: str = Website.web_history.pop()
-            self.app.screen.query_one("#display_inner",
-                               textual.widgets.ContentSwitcher).current = last
+            self.app.screen.query_one("#display_inner", WebsiteSwitcher).switch(last)
             Website.website = last
-        elif search_switcher.current == "search_page":
+            return
+        try:
+            search_switcher = self.app.screen.query_one(
+                "#search_switcher", textual.widgets.ContentSwitcher)
+        except textual.css.query.NoMatches:
+            # search is not mounted
+            return
+        if search_switcher.current == "search_page":
             self.query_one("#search_main_input", textual.widgets.Input).clear()
             search_switcher.current = "search_main"
+
+
+REGISTRY = WebsiteRegistry()
+"""Registry of the websites."""